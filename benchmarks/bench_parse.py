@@ -0,0 +1,58 @@
+"""
+Micro-benchmark del análisis de texto (find_name / find_date / parse_text).
+
+Uso:
+    python benchmarks/bench_parse.py [--repeat N]
+
+Mide el tiempo por documento sobre textos sintéticos: una constancia corta,
+una constancia sin palabra clave y un PDF nativo largo (cientos de páginas).
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from organizer.extraction import find_date, find_name, parse_text
+
+SHORT = (
+    "UNIVERSIDAD AUTONOMA DE AGUASCALIENTES Certifica a: Juan Perez Lopez "
+    "Por su asistencia al curso de actualización docente. "
+    "Aguascalientes, Ags, a 15 de Enero de 2024."
+)
+NO_KEYWORD = (
+    "CONGRESO NACIONAL DE INVESTIGACION Maria Fernanda Ruiz Participó como ponente "
+    "en la mesa de trabajo de ingeniería. Noviembre 2023"
+)
+FILLER = (
+    "En esta sección se presentan los resultados del análisis experimental realizado "
+    "durante el periodo de estudio, con una discusión de los métodos empleados. "
+)
+LONG = " ".join([FILLER * 20] * 300) + " " + SHORT
+
+DOCUMENTS = {
+    'constancia_corta': SHORT,
+    'sin_palabra_clave': NO_KEYWORD,
+    'pdf_largo_300_paginas': LONG,
+}
+
+
+def bench(func, text, repeat):
+    number = max(1, 20000 // max(1, len(text) // 100))
+    best = min(timeit.repeat(lambda: func(text), number=number, repeat=repeat))
+    return best / number * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'documento':<24}{'chars':>10}{'find_name':>14}{'find_date':>14}{'parse_text':>14}")
+    for label, text in DOCUMENTS.items():
+        row = [bench(func, text, args.repeat) for func in (find_name, find_date, parse_text)]
+        print(f"{label:<24}{len(text):>10}" + "".join(f"{us:>11.1f} us" for us in row))
+
+
+if __name__ == "__main__":
+    main()
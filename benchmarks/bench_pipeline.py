@@ -0,0 +1,204 @@
+"""
+Benchmark del pipeline completo sobre un corpus sintético (sin red).
+
+Uso:
+    python benchmarks/bench_pipeline.py [--native N] [--scanned N] [--images N]
+                                        [--workers 1,2,4] [--dpi 200] [--ocr-mode gray]
+                                        [--corpus DIR] [--out resultados.json]
+
+1. Genera (o reutiliza) un corpus con benchmarks/corpus.py.
+2. Mide cada etapa por archivo en un solo proceso: open, text, rasterize,
+   ocr, parse y copy, con p50/p95 por etapa y por tipo de archivo, y el
+   porcentaje de nombres/años correctos.
+3. Ejecuta el pipeline de punta a punta (BatchProcessor, sin caché) con
+   cada número de procesos y reporta el rendimiento en archivos/s.
+
+El resultado se imprime como JSON. Si Tesseract no está instalado, la etapa
+de OCR se omite y se indica en "ocr_available".
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from corpus import generate_corpus
+from organizer.deps import configure_dependencies
+from organizer.engine import BatchProcessor, list_source_files
+from organizer.extraction import ExtractionSettings, parse_text, read_pdf_text
+from organizer.ocr import ocr_image
+from organizer.raster import RasterSettings, pdf_ocr_image, prepare_image
+from organizer.timing import percentile
+
+STAGES = ('open', 'text', 'rasterize', 'ocr', 'parse', 'copy')
+
+
+def summarize(samples):
+    """samples: lista de segundos -> dict con conteo, total y p50/p95 en ms."""
+    return {
+        'count': len(samples),
+        'total_s': round(sum(samples), 4),
+        'p50_ms': _ms(percentile(samples, 50)),
+        'p95_ms': _ms(percentile(samples, 95)),
+    }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+class StageTimer:
+    def __init__(self):
+        self.stages = {}
+
+    def __call__(self, stage, func, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.stages[stage] = self.stages.get(stage, 0.0) + time.perf_counter() - start
+
+
+def _open_pdf(path):
+    with fitz.open(path) as doc:
+        return doc.page_count
+
+
+def _open_image(path):
+    image = Image.open(path)
+    image.load()
+    return image
+
+
+def time_file(path, settings, copy_dir, ocr_available):
+    """Mide las etapas de un archivo y retorna (tiempos_por_etapa, info)."""
+    timer = StageTimer()
+    text = ""
+    if path.lower().endswith('.pdf'):
+        timer('open', _open_pdf, path)
+        text = timer('text', read_pdf_text, path, settings.max_pages)
+        if len(text.strip()) < 50:
+            # Igual que el pipeline: imagen incrustada, render o nada (ver classify_page)
+            _, image = timer('rasterize', pdf_ocr_image, path, settings.raster)
+            if ocr_available and image is not None:
+                text = timer('ocr', ocr_image, image, backend=settings.ocr_backend,
+                             lang=settings.ocr_lang)
+    else:
+        original = timer('open', _open_image, path)
+        image = timer('rasterize', prepare_image, original, settings.raster)
+        if ocr_available:
+            text = timer('ocr', ocr_image, image, backend=settings.ocr_backend,
+                         lang=settings.ocr_lang)
+        original.close()
+
+    info = timer('parse', parse_text, text.replace('\n', ' ').strip())
+    timer('copy', shutil.copy2, path, os.path.join(copy_dir, os.path.basename(path)))
+    return timer.stages, info
+
+
+def run_stage_benchmark(corpus_dir, expected, settings, ocr_available):
+    per_stage = {stage: [] for stage in STAGES}
+    per_kind = {}
+    correct = {'name': 0, 'year': 0}
+    with tempfile.TemporaryDirectory() as copy_dir:
+        for path in list_source_files(corpus_dir):
+            meta = expected[os.path.basename(path)]
+            stages, info = time_file(path, settings, copy_dir, ocr_available)
+            for stage, seconds in stages.items():
+                per_stage[stage].append(seconds)
+            per_kind.setdefault(meta['kind'], []).append(sum(stages.values()))
+            correct['name'] += info['name'].lower() == meta['name'].lower()
+            correct['year'] += info['year'] == meta['year']
+
+    total = sum(len(v) for v in per_kind.values())
+    return {
+        'stages': {stage: summarize(samples) for stage, samples in per_stage.items()},
+        'per_kind': {kind: summarize(samples) for kind, samples in per_kind.items()},
+        'accuracy': {key: round(value / total, 4) if total else None
+                     for key, value in correct.items()},
+    }
+
+
+def run_end_to_end(corpus_dir, settings, workers_list):
+    files = list_source_files(corpus_dir)
+    results = []
+    for workers in workers_list:
+        with tempfile.TemporaryDirectory() as dest:
+            processor = BatchProcessor(dest, workers=workers, settings=settings)
+            start = time.perf_counter()
+            stats = processor.run(files)
+            elapsed = time.perf_counter() - start
+        results.append({
+            'workers': workers,
+            'files': len(files),
+            'seconds': round(elapsed, 4),
+            'files_per_s': round(len(files) / elapsed, 2) if elapsed else None,
+            'errors': stats['errors'],
+        })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--native", type=int, default=20)
+    parser.add_argument("--scanned", type=int, default=10)
+    parser.add_argument("--images", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus", help="Carpeta de corpus a reutilizar (o donde generarlo)")
+    parser.add_argument("--workers", default="1", help="Lista de procesos a comparar, ej. 1,2,4")
+    parser.add_argument("--dpi", type=int, default=200)
+    parser.add_argument("--ocr-mode", default='gray')
+    parser.add_argument("--max-pages", type=int, default=10)
+    parser.add_argument("--out", help="Archivo JSON de salida (default: stdout)")
+    args = parser.parse_args(argv)
+
+    status = configure_dependencies()
+    settings = ExtractionSettings(
+        max_pages=args.max_pages or None,
+        raster=RasterSettings(dpi=args.dpi, mode=args.ocr_mode),
+        ocr_lang=status['ocr_lang'],
+    )
+    workers_list = [int(w) for w in args.workers.split(",") if w.strip()]
+
+    temp_corpus = None
+    corpus_dir = args.corpus
+    if corpus_dir is None:
+        temp_corpus = tempfile.TemporaryDirectory()
+        corpus_dir = temp_corpus.name
+    try:
+        expected_path = os.path.join(corpus_dir, "expected.json")
+        if os.path.exists(expected_path):
+            with open(expected_path, encoding="utf-8") as f:
+                expected = json.load(f)
+        else:
+            expected = generate_corpus(corpus_dir, args.native, args.scanned, args.images, args.seed)
+
+        report = {
+            'corpus': {'dir': corpus_dir if temp_corpus is None else None, 'files': len(expected)},
+            'settings': {'key': settings.key(), 'workers': workers_list},
+            'ocr_available': status['tesseract'],
+        }
+        report.update(run_stage_benchmark(corpus_dir, expected, settings, status['tesseract']))
+        report['end_to_end'] = run_end_to_end(corpus_dir, settings, workers_list)
+    finally:
+        if temp_corpus is not None:
+            temp_corpus.cleanup()
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
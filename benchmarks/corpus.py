@@ -0,0 +1,144 @@
+"""
+Generador de corpus sintético de constancias para benchmarks (sin red).
+
+Uso:
+    python benchmarks/corpus.py DESTINO [--native N] [--scanned N] [--images N] [--seed S]
+
+Crea N PDFs con texto nativo, N PDFs escaneados (solo imagen) y N imágenes
+JPG/PNG con plantillas variadas en español e inglés. Devuelve también el
+nombre y año esperados de cada archivo en DESTINO/expected.json.
+"""
+import argparse
+import io
+import json
+import os
+import random
+
+import fitz  # PyMuPDF
+from PIL import Image, ImageDraw, ImageFont
+
+FIRST_NAMES = [
+    "Juan", "María", "José", "Ana", "Luis", "Fernanda", "Carlos", "Lucía",
+    "Miguel", "Sofía", "John", "Emily", "Robert", "Laura",
+]
+LAST_NAMES = [
+    "Pérez", "López", "García", "Hernández", "Martínez", "Ruiz", "Esparza",
+    "Villalpando", "Torres", "Smith", "Johnson", "Doe",
+]
+MONTHS = [
+    "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio", "Julio", "Agosto",
+    "Septiembre", "Octubre", "Noviembre", "Diciembre",
+]
+TEMPLATES = [
+    (
+        "UNIVERSIDAD AUTONOMA\n\nCertifica a:\n{name}\n\n"
+        "Por su asistencia al curso de {topic}.\n"
+        "Aguascalientes, Ags, a {day} de {month} de {year}."
+    ),
+    (
+        "Diploma\n\nSe otorga el presente reconocimiento a\n{upper}\n\n"
+        "Por su brillante participacion en el {topic}.\n{month} {year}"
+    ),
+    (
+        "CONGRESO NACIONAL DE INVESTIGACION\n\nOtorga la presente constancia a\n{name}\n\n"
+        "por su participación como ponente.\n{day} de {month} del {year}"
+    ),
+    (
+        "Reviewer Certificate\n\nThis certificate is awarded to\n{upper}\n\n"
+        "For reviewing papers for the {topic}.\nDate: {day} {month} {year}"
+    ),
+    (
+        "International Conference\n\nThe Organizing Committee certifies that\n{name}\n"
+        "presented the work entitled \"{topic}\".\n{month} {year}"
+    ),
+]
+TOPICS = [
+    "Actualización Docente", "Ingeniería de Software", "Congreso de Química",
+    "Simposio de Biología", "International Workshop on Data",
+]
+
+
+def random_certificate(rng):
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}"
+    year = str(rng.randint(2015, 2025))
+    text = rng.choice(TEMPLATES).format(
+        name=name, upper=name.upper(), topic=rng.choice(TOPICS),
+        day=rng.randint(1, 28), month=rng.choice(MONTHS), year=year,
+    )
+    return text, name, year
+
+
+def _font(size):
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow < 10.1 no acepta tamaño
+        return ImageFont.load_default()
+
+
+def render_certificate_image(text, width=1240, height=1754):
+    """Página A4 a ~150 DPI con el texto dibujado, como un escaneo limpio."""
+    image = Image.new("L", (width, height), color=255)
+    draw = ImageDraw.Draw(image)
+    draw.multiline_text((120, 300), text, fill=0, font=_font(36), spacing=18)
+    return image
+
+
+def write_native_pdf(path, text):
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((60, 120), text, fontsize=14)
+    doc.save(path)
+    doc.close()
+
+
+def write_scanned_pdf(path, text):
+    # Los escáneres suelen incrustar la página como JPEG
+    buffer = io.BytesIO()
+    render_certificate_image(text).save(buffer, format="JPEG", quality=85)
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_image(page.rect, stream=buffer.getvalue())
+    doc.save(path, deflate=True)
+    doc.close()
+
+
+def write_image(path, text):
+    render_certificate_image(text).save(path)
+
+
+def generate_corpus(dest, native=10, scanned=10, images=10, seed=0):
+    """Genera el corpus y retorna {nombre_de_archivo: {'kind', 'name', 'year'}}."""
+    rng = random.Random(seed)
+    os.makedirs(dest, exist_ok=True)
+    expected = {}
+    plan = (
+        [('native', '.pdf', write_native_pdf)] * native
+        + [('scanned', '.pdf', write_scanned_pdf)] * scanned
+        + [('image', rng.choice(('.png', '.jpg')), write_image) for _ in range(images)]
+    )
+    for index, (kind, ext, writer) in enumerate(plan):
+        text, name, year = random_certificate(rng)
+        filename = f"{kind}_{index:05d}{ext}"
+        writer(os.path.join(dest, filename), text)
+        expected[filename] = {'kind': kind, 'name': name, 'year': year}
+
+    with open(os.path.join(dest, "expected.json"), "w", encoding="utf-8") as f:
+        json.dump(expected, f, ensure_ascii=False, indent=2)
+    return expected
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("dest")
+    parser.add_argument("--native", type=int, default=10)
+    parser.add_argument("--scanned", type=int, default=10)
+    parser.add_argument("--images", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    expected = generate_corpus(args.dest, args.native, args.scanned, args.images, args.seed)
+    print(f"{len(expected)} archivos generados en {args.dest}")
+
+
+if __name__ == "__main__":
+    main()
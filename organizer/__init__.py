@@ -0,0 +1,6 @@
+"""
+Núcleo del Organizador de Constancias.
+
+Contiene la lógica de extracción y ubicación de archivos sin depender de la
+interfaz gráfica, de modo que pueda ejecutarse en procesos de trabajo.
+"""
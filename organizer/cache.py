@@ -0,0 +1,171 @@
+"""
+Caché persistente de extracción (SQLite) guardada en la carpeta destino.
+
+Las entradas se indexan por el hash SHA-256 del contenido del archivo y la
+versión del pipeline de extracción de texto (incluida la configuración de
+páginas leídas y rasterizado para OCR). Se guarda el texto extraído junto
+con el nombre/año obtenidos y la huella de las reglas (RULES_VERSION): si las
+palabras clave o stop-words cambian, el nombre/año se recalculan a partir del
+texto guardado sin volver a ejecutar OCR.
+"""
+import hashlib
+import os
+import sqlite3
+import time
+
+from .extraction import RULES_VERSION, ExtractionSettings
+
+# Incrementar cuando cambie la forma de obtener texto (OCR, rasterizado, etc.).
+# 2: límite de píxeles antes del OCR, reutilización de la imagen incrustada
+# de los escaneos y clasificación de páginas (raster.pdf_ocr_image)
+# 3: texto nativo sobre una imagen de fondo se renderiza (ver classify_page)
+PIPELINE_VERSION = "3"
+
+CACHE_FILENAME = ".organizer_cache.sqlite"
+DEFAULT_MAX_ENTRIES = 200000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS extractions (
+    hash TEXT NOT NULL,
+    pipeline TEXT NOT NULL,
+    rules TEXT NOT NULL,
+    text TEXT NOT NULL,
+    name TEXT NOT NULL,
+    year TEXT NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (hash, pipeline)
+);
+CREATE INDEX IF NOT EXISTS extractions_last_used ON extractions (last_used);
+"""
+
+
+def pipeline_key(settings=None):
+    """Versión del pipeline más la configuración de extracción (páginas, OCR)."""
+    return f"{PIPELINE_VERSION}|{(settings or ExtractionSettings()).key()}"
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def default_cache_path(dest_root):
+    return os.path.join(dest_root, CACHE_FILENAME)
+
+
+class ExtractionCache:
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES, readonly=False, pipeline=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.readonly = readonly
+        self.pipeline = pipeline or pipeline_key()
+        self._pending = 0
+
+        if readonly:
+            self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.conn = sqlite3.connect(path)
+            # WAL permite que los procesos de trabajo lean mientras el escritor guarda
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(_SCHEMA)
+            self.conn.commit()
+
+    def get(self, digest):
+        """Retorna dict con text/name/year/rules o None si no hay entrada."""
+        row = self.conn.execute(
+            "SELECT text, name, year, rules FROM extractions WHERE hash = ? AND pipeline = ?",
+            (digest, self.pipeline),
+        ).fetchone()
+        if row is None:
+            return None
+        return {'text': row[0], 'name': row[1], 'year': row[2], 'rules': row[3]}
+
+    def put(self, digest, text, name, year):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO extractions (hash, pipeline, rules, text, name, year, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (digest, self.pipeline, RULES_VERSION, text, name, year, time.time()),
+        )
+        self._maybe_commit()
+
+    def touch(self, digest):
+        self.conn.execute(
+            "UPDATE extractions SET last_used = ? WHERE hash = ? AND pipeline = ?",
+            (time.time(), digest, self.pipeline),
+        )
+        self._maybe_commit()
+
+    def _maybe_commit(self):
+        self._pending += 1
+        if self._pending >= 100:
+            self.commit()
+
+    def commit(self):
+        self.conn.commit()
+        self._pending = 0
+
+    def prune(self):
+        """Elimina las entradas menos usadas si se supera max_entries."""
+        count = self.conn.execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
+        excess = count - self.max_entries
+        if excess <= 0:
+            return 0
+        self.conn.execute(
+            "DELETE FROM extractions WHERE rowid IN "
+            "(SELECT rowid FROM extractions ORDER BY last_used LIMIT ?)",
+            (excess,),
+        )
+        self.commit()
+        return excess
+
+    def invalidate(self, stale_only=False):
+        """
+        Borra entradas. Con stale_only=True solo las de otra versión de
+        pipeline o de reglas; si no, vacía la caché completa.
+        """
+        if stale_only:
+            cursor = self.conn.execute(
+                "DELETE FROM extractions WHERE pipeline != ? OR rules != ?",
+                (self.pipeline, RULES_VERSION),
+            )
+        else:
+            cursor = self.conn.execute("DELETE FROM extractions")
+        self.commit()
+        return cursor.rowcount
+
+    def stats(self):
+        total, stale = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(pipeline != ? OR rules != ?), 0) FROM extractions",
+            (self.pipeline, RULES_VERSION),
+        ).fetchone()
+        return {'entries': total, 'stale': stale, 'max_entries': self.max_entries}
+
+    def close(self):
+        if not self.readonly:
+            self.commit()
+        self.conn.close()
+
+
+# Conexiones de solo lectura por proceso de trabajo
+_readers = {}
+
+
+def reader(path, pipeline=None):
+    """Conexión de solo lectura reutilizada dentro de un proceso; None si no existe."""
+    key = (path, pipeline)
+    if key not in _readers:
+        try:
+            _readers[key] = ExtractionCache(path, readonly=True, pipeline=pipeline)
+        except sqlite3.Error:
+            return None
+    return _readers[key]
+
+
+def close_readers():
+    for cache in _readers.values():
+        cache.close()
+    _readers.clear()
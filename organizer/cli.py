@@ -0,0 +1,464 @@
+"""
+Modo de línea de comandos (sin interfaz gráfica).
+
+Uso:
+    python -m organizer organize ORIGEN DESTINO [--workers N] [--dry-run | --plan RUTA] [--recursive] [--timings RUTA]
+    python -m organizer apply PLAN DESTINO [--placement MODO] [--placement-threads N]
+    python -m organizer watch ORIGEN DESTINO [--workers N] [--settle S] [--recursive]
+    python -m organizer cache DESTINO [--clear | --purge-stale]
+"""
+import argparse
+import os
+
+from .cache import (
+    CACHE_FILENAME, DEFAULT_MAX_ENTRIES, ExtractionCache, default_cache_path, pipeline_key,
+)
+from .dedup import DEDUP_MODES
+from .deps import configure_dependencies
+from .engine import DEFAULT_MEMORY_BUDGET, DEFAULT_PLACEMENT_THREADS, BatchProcessor, default_workers
+from .extraction import DEFAULT_MAX_PAGES, ExtractionSettings
+from .journal import JOURNAL_FILENAME, default_journal_path
+from .manifest import CONFIDENCE_LEVELS, ManifestWriter, apply_manifest
+from .ocr import BACKENDS
+from .placement import PLACEMENT_MODES
+from .raster import COLOR_MODES, DEFAULT_MAX_PIXELS, RENDERERS, RasterSettings, parse_region
+from .scanner import SYMLINK_POLICIES, ScanOptions, parse_date, parse_size, scan_source
+from .timing import TimingReport
+from .watch import FolderWatcher
+
+
+def log(message):
+    print(message, flush=True)
+
+
+def cmd_organize(args):
+    if not os.path.isdir(args.source):
+        log(f"[X] La carpeta de origen no existe: {args.source}")
+        return 2
+
+    status = _configure(args)
+
+    manifest = ManifestWriter(args.plan) if args.plan else None
+    if manifest:
+        log("Iniciando proceso... (plan, no se copian archivos)")
+    else:
+        log("Iniciando proceso..." + (" (simulación, no se copian archivos)" if args.dry_run else ""))
+    processor = _build_processor(args, status, dry_run=args.dry_run or manifest is not None,
+                                 manifest=manifest)
+    if args.preserve_structure:
+        processor.relative_root = args.source
+    # Los archivos se procesan a medida que se encuentran
+    files = scan_source(args.source, _scan_options(args), exclude_dirs=[args.dest], log=log)
+    try:
+        stats = processor.run(files)
+    finally:
+        processor.timings.close()
+        if manifest:
+            manifest.close()
+
+    log("--- Proceso Finalizado ---")
+    log(f"Procesados: {stats['processed']}")
+    log(f"Errores/No identificados: {stats['errors']}")
+    log(f"Tomados de caché: {stats['cache_hits']}")
+    if stats['duplicates']:
+        log(f"Duplicados omitidos: {stats['duplicates']}")
+    if manifest:
+        counts = ", ".join(f"{level}: {manifest.confidence_counts[level]}"
+                           for level in CONFIDENCE_LEVELS if level in manifest.confidence_counts)
+        log(f"Plan guardado en: {args.plan} ({manifest.rows} entradas; confianza: {counts or '-'})")
+    _log_timings(args, processor.timings)
+    return 1 if stats['errors'] else 0
+
+
+def cmd_apply(args):
+    if not os.path.isfile(args.manifest):
+        log(f"[X] El plan no existe: {args.manifest}")
+        return 2
+
+    log("Aplicando plan...")
+    stats = apply_manifest(args.manifest, args.dest, args.placement, args.placement_threads, log)
+    log("--- Plan Aplicado ---")
+    log(f"Ubicados: {stats['placed']}")
+    log(f"Ya ubicados antes: {stats['skipped']}")
+    log(f"Errores: {stats['errors']}")
+    return 1 if stats['errors'] else 0
+
+
+def cmd_watch(args):
+    if not os.path.isdir(args.source):
+        log(f"[X] La carpeta de origen no existe: {args.source}")
+        return 2
+
+    status = _configure(args)
+    processor = _build_processor(args, status)
+    if args.preserve_structure:
+        processor.relative_root = args.source
+
+    def on_batch(files):
+        stats = processor.run(files)
+        log(f"--- Lote: {stats['processed']} procesados, {stats['errors']} errores, "
+            f"{stats['duplicates']} duplicados ---")
+
+    watcher = FolderWatcher(
+        args.source, on_batch, settle=args.settle, poll_interval=args.poll,
+        process_existing=args.existing, use_polling=args.polling, log=log,
+        options=_scan_options(args), exclude_dirs=[args.dest],
+    )
+    try:
+        with processor:
+            watcher.run()
+    except KeyboardInterrupt:
+        log("Vigilancia detenida.")
+    finally:
+        processor.timings.close()
+    _log_timings(args, processor.timings)
+    return 0
+
+
+def cmd_cache(args):
+    path = args.cache or default_cache_path(args.dest)
+    if not os.path.exists(path):
+        log(f"No hay caché en: {path}")
+        return 0
+
+    status = configure_dependencies(ocr_backend=args.ocr_backend)
+    cache = ExtractionCache(
+        path, max_entries=args.cache_max_entries,
+        pipeline=pipeline_key(_extraction_settings(args, status)),
+    )
+    try:
+        if args.clear:
+            log(f"Entradas eliminadas: {cache.invalidate()}")
+        elif args.purge_stale:
+            log(f"Entradas obsoletas eliminadas: {cache.invalidate(stale_only=True)}")
+        stats = cache.stats()
+        log(f"Caché: {path}")
+        log(f"Entradas: {stats['entries']} (obsoletas: {stats['stale']}, máximo: {stats['max_entries']})")
+    finally:
+        cache.close()
+    return 0
+
+
+def _cache_path(args):
+    if args.no_cache:
+        return None
+    return args.cache or default_cache_path(args.dest)
+
+
+def _region_arg(value):
+    try:
+        region = parse_region(value)
+        RasterSettings(region=region)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return region
+
+
+def _arg_type(parse):
+    def convert(value):
+        try:
+            return parse(value)
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e))
+    return convert
+
+
+def _depth(value):
+    depth = int(value)
+    if depth < 0:
+        raise ValueError(f"Profundidad inválida: {value}")
+    return depth
+
+
+def _megapixels(value):
+    megapixels = float(value)
+    if megapixels < 0:
+        raise ValueError(f"Megapíxeles inválidos: {value}")
+    return megapixels
+
+
+def _scan_options(args):
+    max_depth = args.max_depth if args.recursive else 0
+    return ScanOptions(
+        include=args.include, exclude=args.exclude, max_depth=max_depth,
+        min_size=args.min_size, max_size=args.max_size,
+        newer_than=args.newer_than, older_than=args.older_than, symlinks=args.symlinks,
+    )
+
+
+def _configure(args):
+    status = configure_dependencies(log, args.ocr_backend)
+    if not status['tesseract']:
+        log("[!] No se detectó Tesseract-OCR. La lectura de archivos escaneados fallará.")
+    return status
+
+
+def _extraction_settings(args, status):
+    raster = RasterSettings(
+        dpi=args.dpi, mode=args.ocr_mode, region=args.ocr_region, renderer=args.renderer,
+        threshold=args.threshold, max_pixels=int(args.max_megapixels * 1_000_000) or None,
+    )
+    return ExtractionSettings(
+        max_pages=args.max_pages or None, raster=raster, ocr_backend=args.ocr_backend,
+        ocr_lang=args.ocr_lang or status['ocr_lang'],
+    )
+
+
+def _build_processor(args, status, dry_run=False, manifest=None):
+    slowest = args.profile_slowest or 5
+    return BatchProcessor(
+        args.dest, workers=args.workers, log=log, dry_run=dry_run,
+        cache_path=_cache_path(args), cache_max_entries=args.cache_max_entries,
+        settings=_extraction_settings(args, status),
+        timings=TimingReport(args.timings, slowest=slowest),
+        profile_dir=args.profile_dir if args.profile_slowest else None,
+        placement=args.placement,
+        placement_threads=args.placement_threads,
+        dedup=args.dedup,
+        split_pages=args.split_pages,
+        journal_path=None if args.no_journal else default_journal_path(args.dest),
+        memory_budget=args.memory_budget,
+        manifest=manifest,
+    )
+
+
+def _log_timings(args, timings):
+    for line in timings.summary_lines():
+        log(line)
+    if args.timings:
+        log(f"Tiempos por archivo guardados en: {args.timings}")
+
+
+def _add_cache_options(parser):
+    parser.add_argument(
+        "--cache", metavar="RUTA",
+        help=f"Archivo de caché de extracción (default: DESTINO/{CACHE_FILENAME})",
+    )
+    parser.add_argument(
+        "--cache-max-entries", type=int, default=DEFAULT_MAX_ENTRIES,
+        help="Máximo de entradas antes de descartar las menos usadas",
+    )
+
+
+def _add_extraction_options(parser):
+    parser.add_argument(
+        "--max-pages", type=int, default=DEFAULT_MAX_PAGES,
+        help=f"Máximo de páginas de PDF a leer; 0 = todas (default: {DEFAULT_MAX_PAGES})",
+    )
+    group = parser.add_argument_group("OCR")
+    group.add_argument(
+        "--ocr-backend", choices=BACKENDS, default='auto',
+        help="Motor de OCR: tesserocr (motores persistentes en memoria), pytesseract "
+             "(un proceso por imagen) o auto (default: auto)",
+    )
+    group.add_argument(
+        "--ocr-lang", metavar="IDIOMAS",
+        help="Idiomas de Tesseract, ej. spa+eng (default: detectar al iniciar)",
+    )
+    group.add_argument(
+        "--dpi", type=int, default=200,
+        help="Resolución para rasterizar PDFs escaneados (default: 200)",
+    )
+    group.add_argument(
+        "--ocr-mode", choices=COLOR_MODES, default='gray',
+        help="Color de la imagen enviada a Tesseract (default: gray)",
+    )
+    group.add_argument(
+        "--threshold", type=int, default=160,
+        help="Umbral 0-255 para --ocr-mode binary (default: 160)",
+    )
+    group.add_argument(
+        "--ocr-region", metavar="IZQ,ARR,DER,ABA", type=_region_arg,
+        help="Región de interés en fracciones de la página, ej. 0,0.2,1,0.8",
+    )
+    group.add_argument(
+        "--renderer", choices=RENDERERS, default='pymupdf',
+        help="Renderizador de PDFs: pymupdf (directo) o poppler (default: pymupdf)",
+    )
+    group.add_argument(
+        "--max-megapixels", type=_arg_type(_megapixels), default=DEFAULT_MAX_PIXELS / 1_000_000,
+        metavar="MP",
+        help="Tamaño máximo de la imagen enviada a Tesseract; las páginas e imágenes más "
+             f"grandes se reducen al cargarlas; 0 = sin límite (default: {DEFAULT_MAX_PIXELS / 1_000_000:g})",
+    )
+
+
+def _add_scan_options(parser):
+    group = parser.add_argument_group("Búsqueda de archivos")
+    group.add_argument(
+        "-r", "--recursive", action="store_true",
+        help="Buscar también en las subcarpetas del origen",
+    )
+    group.add_argument(
+        "--max-depth", type=_arg_type(_depth), metavar="N",
+        help="Con --recursive, niveles de subcarpetas a recorrer (default: todos)",
+    )
+    group.add_argument(
+        "--include", action="append", default=[], metavar="GLOB",
+        help="Procesar solo archivos que coincidan (ej. '*.pdf', 'ventas/*'); repetible",
+    )
+    group.add_argument(
+        "--exclude", action="append", default=[], metavar="GLOB",
+        help="Omitir archivos o carpetas que coincidan (ej. 'borrador*'); repetible",
+    )
+    group.add_argument("--min-size", type=_arg_type(parse_size), metavar="TAM", help="Tamaño mínimo, ej. 10K")
+    group.add_argument("--max-size", type=_arg_type(parse_size), metavar="TAM", help="Tamaño máximo, ej. 50M")
+    group.add_argument(
+        "--newer-than", type=_arg_type(parse_date), metavar="FECHA",
+        help="Solo archivos modificados desde FECHA (AAAA-MM-DD)",
+    )
+    group.add_argument(
+        "--older-than", type=_arg_type(parse_date), metavar="FECHA",
+        help="Solo archivos modificados hasta FECHA (AAAA-MM-DD)",
+    )
+    group.add_argument(
+        "--symlinks", choices=SYMLINK_POLICIES, default='files',
+        help="Enlaces simbólicos: skip (ignorar), files (seguir solo a archivos) "
+             "o follow (seguir también carpetas) (default: files)",
+    )
+    group.add_argument(
+        "--preserve-structure", action="store_true",
+        help="Conservar las subcarpetas del origen: DESTINO/{subcarpeta}/{Año}/{Nombre}/",
+    )
+
+
+def _add_processing_options(parser):
+    parser.add_argument(
+        "--workers", type=int, default=default_workers(),
+        help="Número de procesos de extracción (default: núcleos de CPU)",
+    )
+    parser.add_argument(
+        "--placement", choices=PLACEMENT_MODES, default='copy',
+        help="Cómo ubicar cada archivo: copy (copia), move (mover), hardlink (enlace duro) "
+             "o reflink (clon copy-on-write); hardlink/reflink copian si no son posibles "
+             "(default: copy)",
+    )
+    parser.add_argument(
+        "--placement-threads", type=int, default=None, metavar="N",
+        help="Hilos que escriben en el destino mientras se analizan los siguientes archivos, "
+             "con reintentos ante errores de red; 0 = escribir uno a uno "
+             "(default: 4 con varios procesos, 0 con --workers 1)",
+    )
+    parser.add_argument(
+        "--split-pages", action="store_true",
+        help="Tratar cada página de un PDF/TIFF multipágina como una constancia distinta "
+             "y escribirla como archivo propio",
+    )
+    parser.add_argument(
+        "--dedup", choices=DEDUP_MODES, default='off',
+        help="Omitir duplicados: exact (mismo contenido, sin extraerlo) o perceptual "
+             "(además reescaneos con el mismo año y nombre) (default: off)",
+    )
+    parser.add_argument(
+        "--memory-budget", type=_arg_type(parse_size), default=DEFAULT_MEMORY_BUDGET, metavar="TAM",
+        help="Memoria máxima estimada para imágenes en proceso (render y OCR) entre todos los "
+             "procesos; al alcanzarla se espera antes de leer más archivos; 0 = sin límite "
+             "(default: 1G)",
+    )
+    parser.add_argument(
+        "--no-journal", action="store_true",
+        help=f"No llevar la bitácora DESTINO/{JOURNAL_FILENAME} para reanudar corridas interrumpidas",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="No leer ni guardar resultados en la caché de extracción",
+    )
+    _add_cache_options(parser)
+    _add_extraction_options(parser)
+    _add_timing_options(parser)
+
+
+def _add_timing_options(parser):
+    group = parser.add_argument_group("Tiempos y perfilado")
+    group.add_argument(
+        "--timings", metavar="RUTA",
+        help="Guardar los tiempos por archivo y etapa en RUTA (.jsonl o .csv)",
+    )
+    group.add_argument(
+        "--profile-slowest", metavar="N", type=int, default=0,
+        help="Perfilar la extracción con cProfile y conservar los perfiles de los N archivos más lentos",
+    )
+    group.add_argument(
+        "--profile-dir", metavar="CARPETA", default="organizer_profiles",
+        help="Carpeta para los perfiles .prof (default: organizer_profiles)",
+    )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m organizer",
+        description="Organiza constancias PDF/imagen en Destino/{Año}/{Nombre}/.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    organize = subparsers.add_parser("organize", help="Procesa una carpeta de origen")
+    organize.add_argument("source", help="Carpeta de origen")
+    organize.add_argument("dest", help="Carpeta de destino")
+    mode = organize.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--dry-run", action="store_true",
+        help="Solo muestra dónde iría cada archivo, sin copiar nada",
+    )
+    mode.add_argument(
+        "--plan", metavar="RUTA",
+        help="No copiar nada: guardar en RUTA (.csv o .jsonl) el destino de cada archivo, con "
+             "método y confianza, para revisarlo y luego ubicarlo con 'apply'",
+    )
+    _add_scan_options(organize)
+    _add_processing_options(organize)
+    organize.set_defaults(func=cmd_organize)
+
+    watch = subparsers.add_parser("watch", help="Procesa continuamente los archivos nuevos del origen")
+    watch.add_argument("source", help="Carpeta de origen a vigilar")
+    watch.add_argument("dest", help="Carpeta de destino")
+    watch.add_argument(
+        "--settle", type=float, default=2.0,
+        help="Segundos sin cambios antes de considerar un archivo completo (default: 2)",
+    )
+    watch.add_argument(
+        "--poll", type=float, default=1.0,
+        help="Intervalo de sondeo en segundos (default: 1)",
+    )
+    watch.add_argument(
+        "--existing", action="store_true",
+        help="Procesar también los archivos que ya están en el origen al iniciar",
+    )
+    watch.add_argument(
+        "--polling", action="store_true",
+        help="Forzar sondeo aunque watchdog esté instalado (p. ej. en carpetas de red)",
+    )
+    _add_scan_options(watch)
+    _add_processing_options(watch)
+    watch.set_defaults(func=cmd_watch)
+
+    apply = subparsers.add_parser("apply", help="Ubica los archivos de un plan hecho con organize --plan")
+    apply.add_argument("manifest", help="Plan (.csv o .jsonl)")
+    apply.add_argument("dest", help="Carpeta de destino (la misma del plan)")
+    apply.add_argument(
+        "--placement", choices=PLACEMENT_MODES, default='copy',
+        help="Cómo ubicar cada archivo (ver organize --placement) (default: copy)",
+    )
+    apply.add_argument(
+        "--placement-threads", type=int, default=DEFAULT_PLACEMENT_THREADS, metavar="N",
+        help=f"Hilos que escriben en el destino; 0 = uno a uno (default: {DEFAULT_PLACEMENT_THREADS})",
+    )
+    apply.set_defaults(func=cmd_apply)
+
+    cache = subparsers.add_parser("cache", help="Consulta o invalida la caché de extracción")
+    cache.add_argument("dest", help="Carpeta de destino que contiene la caché")
+    _add_cache_options(cache)
+    _add_extraction_options(cache)
+    group = cache.add_mutually_exclusive_group()
+    group.add_argument("--clear", action="store_true", help="Vaciar la caché completa")
+    group.add_argument(
+        "--purge-stale", action="store_true",
+        help="Eliminar entradas de otra versión del pipeline, de la configuración o de las reglas",
+    )
+    cache.set_defaults(func=cmd_cache)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
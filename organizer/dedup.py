@@ -0,0 +1,149 @@
+"""
+Detección de constancias duplicadas.
+
+- Exacta: hash SHA-256 del contenido (leído por bloques) calculado antes de
+  la extracción; un archivo idéntico a uno ya ubicado no se extrae ni se copia.
+- Perceptual (opcional): dHash de 64 bits del render de la primera página,
+  para reescaneos o reexportaciones del mismo documento. Como las constancias
+  de una misma plantilla se ven casi iguales a baja resolución, solo se
+  considera duplicado si además coinciden el año y el nombre extraídos.
+
+El índice persiste en DESTINO/.organizer_dedup.sqlite para que la detección
+funcione entre corridas.
+"""
+import os
+import sqlite3
+
+from .extraction import IMAGE_EXTENSIONS
+from .lazy import lazy_import
+from .raster import RasterSettings, render_pdf_page
+
+Image = lazy_import('PIL.Image')
+
+DEDUP_MODES = ('off', 'exact', 'perceptual')
+DEDUP_FILENAME = ".organizer_dedup.sqlite"
+
+# Bits distintos tolerados entre dos dHash para considerarlos la misma imagen
+DEFAULT_MAX_DISTANCE = 4
+
+# Render mínimo: el dHash reduce la página a 9x8 píxeles
+_HASH_RASTER = RasterSettings(dpi=24, mode='gray')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS placed (
+    hash TEXT PRIMARY KEY,
+    phash TEXT,
+    year TEXT NOT NULL,
+    name TEXT NOT NULL,
+    target TEXT NOT NULL
+);
+"""
+
+
+def default_dedup_path(dest_root):
+    return os.path.join(dest_root, DEDUP_FILENAME)
+
+
+def perceptual_hash(file_path):
+    """dHash de la primera página/imagen como entero de 64 bits, o None si no se pudo leer."""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == '.pdf':
+        image = render_pdf_page(file_path, _HASH_RASTER)
+        if image is None:
+            return None
+    elif ext in IMAGE_EXTENSIONS:
+        with Image.open(file_path) as original:
+            # draft permite a JPEG decodificar directamente a una fracción del tamaño
+            original.draft('L', (64, 64))
+            image = original.convert('L')
+    else:
+        return None
+    pixels = image.resize((9, 8), Image.LANCZOS).tobytes()
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class DedupIndex:
+    """
+    Archivos ya ubicados en el destino, por hash de contenido y (opcionalmente)
+    hash perceptual. Se carga completo en memoria al abrir; las altas se
+    guardan en SQLite.
+    readonly: no crea ni modifica el archivo (simulación).
+    """
+
+    def __init__(self, path, readonly=False, max_distance=DEFAULT_MAX_DISTANCE):
+        self.path = path
+        self.readonly = readonly
+        self.max_distance = max_distance
+        self._targets = {}  # hash -> ruta relativa al destino
+        self._similar = {}  # (año, nombre) -> [(phash, ruta relativa)]
+        self.conn = None
+
+        if readonly:
+            if os.path.exists(path):
+                self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.conn = sqlite3.connect(path)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(_SCHEMA)
+            self.conn.commit()
+        if self.conn:
+            for digest, phash, year, name, target in self.conn.execute(
+                "SELECT hash, phash, year, name, target FROM placed"
+            ):
+                self._remember(digest, phash and int(phash, 16), year, name, target)
+
+    def _remember(self, digest, phash, year, name, target):
+        self._targets[digest] = target
+        if phash is not None:
+            self._similar.setdefault((year, name), []).append((phash, target))
+
+    def exact(self, digest):
+        """Ruta relativa del archivo idéntico ya ubicado, o None."""
+        return self._targets.get(digest)
+
+    def similar(self, phash, year, name):
+        """Ruta relativa de un archivo ya ubicado visualmente igual y con el mismo año/nombre."""
+        if phash is None:
+            return None
+        for other, target in self._similar.get((year, name), ()):
+            if hamming(phash, other) <= self.max_distance:
+                return target
+        return None
+
+    def forget(self, digest):
+        target = self._targets.pop(digest, None)
+        if target is None:
+            return
+        for key, entries in self._similar.items():
+            self._similar[key] = [e for e in entries if e[1] != target]
+        if self.conn and not self.readonly:
+            self.conn.execute("DELETE FROM placed WHERE hash = ?", (digest,))
+
+    def add(self, digest, phash, year, name, target):
+        self._remember(digest, phash, year, name, target)
+        if self.conn and not self.readonly:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO placed (hash, phash, year, name, target) VALUES (?, ?, ?, ?, ?)",
+                (digest, None if phash is None else f"{phash:016x}", year, name, target),
+            )
+
+    def commit(self):
+        if self.conn and not self.readonly:
+            self.conn.commit()
+
+    def close(self):
+        if self.conn:
+            self.commit()
+            self.conn.close()
+            self.conn = None
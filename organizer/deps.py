@@ -0,0 +1,192 @@
+import json
+import os
+import shutil
+import sys
+import time
+
+from .lazy import lazy_import, missing_modules
+from .ocr import choose_language, probe_languages
+
+pytesseract = lazy_import('pytesseract')
+
+TESSERACT_WINDOWS_PATH = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+
+# Resultado del sondeo de dependencias guardado entre ejecuciones: consultar
+# Tesseract lanza procesos (versión + idiomas) y tarda cientos de ms en cada
+# arranque. Se reutiliza mientras no cambien el binario de Tesseract, su
+# carpeta tessdata, la carpeta de trabajo (Poppler portable) ni el backend, y
+# como mucho DEPS_CACHE_MAX_AGE segundos (idiomas instalados en otra carpeta).
+DEPS_CACHE_FILENAME = "deps.json"
+DEPS_CACHE_VERSION = 1
+DEPS_CACHE_MAX_AGE = 7 * 24 * 3600
+
+# Librerías de Python sin las que no se puede procesar ningún archivo
+REQUIRED_MODULES = ('fitz', 'PIL', 'pytesseract', 'pdf2image')
+
+
+def _noop(message):
+    pass
+
+
+def find_local_poppler(cwd=None):
+    """
+    Busca un Poppler portable junto al programa.
+    Look for the directory structure "poppler-XX/Library/bin" or "poppler-XX/bin"
+    """
+    cwd = cwd or os.getcwd()
+    possible_patterns = [
+        os.path.join(cwd, "poppler-25.12.0", "Library", "bin"),
+        os.path.join(cwd, "poppler-25.12.0", "bin"),
+    ]
+
+    # Also check generalized pattern in case version changes
+    for item in os.listdir(cwd):
+        if "poppler" in item.lower() and os.path.isdir(os.path.join(cwd, item)):
+            possible_patterns.append(os.path.join(cwd, item, "Library", "bin"))
+            possible_patterns.append(os.path.join(cwd, item, "bin"))
+
+    for path in possible_patterns:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def missing_libraries():
+    """Librerías de REQUIRED_MODULES que no están instaladas (sin cargarlas)."""
+    return missing_modules(REQUIRED_MODULES)
+
+
+def default_deps_cache_path():
+    """Archivo de caché del sondeo en la carpeta de caché del usuario."""
+    if sys.platform.startswith('win'):
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "pdf_organizer", DEPS_CACHE_FILENAME)
+
+
+def configure_dependencies(log=_noop, ocr_backend='auto', cache_path=None, use_cache=True):
+    """
+    Configura Poppler y Tesseract para este proceso y detecta una sola vez los
+    idiomas de OCR instalados. El resultado se guarda en `cache_path` (por
+    defecto default_deps_cache_path()) y se reutiliza en los siguientes
+    arranques sin volver a ejecutar Tesseract (ver DEPS_CACHE_MAX_AGE).
+    Retorna dict: {'poppler': ruta local o None, 'tesseract': bool,
+                   'languages': tupla o None, 'ocr_lang': ej. 'spa+eng' o None}
+    """
+    cwd = os.getcwd()
+    cache_path = cache_path or default_deps_cache_path()
+    fingerprint = _fingerprint(cwd, ocr_backend)
+    cached = _load_cache(cache_path, fingerprint) if use_cache else None
+
+    # 0. Check for Local Poppler
+    poppler_path = cached['poppler'] if cached else find_local_poppler(cwd)
+    if poppler_path:
+        log(f"  [i] Poppler local detectado: {poppler_path}")
+        os.environ["PATH"] += os.pathsep + poppler_path
+
+    if cached:
+        if cached['tesseract_cmd']:
+            pytesseract.pytesseract.tesseract_cmd = cached['tesseract_cmd']
+        tesseract_ok = cached['tesseract']
+        languages = tuple(cached['languages']) if cached['languages'] is not None else None
+    else:
+        # 1. Check Tesseract
+        tesseract_ok = True
+        if os.path.exists(TESSERACT_WINDOWS_PATH):
+            pytesseract.pytesseract.tesseract_cmd = TESSERACT_WINDOWS_PATH
+        else:
+            # Check if it's in PATH by running a blind command
+            try:
+                pytesseract.get_tesseract_version()
+            except Exception:
+                tesseract_ok = False
+
+        # 2. Idiomas de OCR: se eligen una vez para toda la sesión
+        languages = probe_languages(ocr_backend) if tesseract_ok else None
+        if use_cache:
+            _save_cache(cache_path, {
+                'version': DEPS_CACHE_VERSION,
+                'created': time.time(),
+                'fingerprint': fingerprint,
+                'poppler': poppler_path,
+                'tesseract_cmd': (TESSERACT_WINDOWS_PATH
+                                  if os.path.exists(TESSERACT_WINDOWS_PATH) else None),
+                'tesseract': tesseract_ok,
+                'languages': list(languages) if languages is not None else None,
+            })
+
+    ocr_lang = choose_language(languages)
+    if languages is not None:
+        log(f"  [i] Idiomas de OCR: {ocr_lang or 'ninguno'}")
+        if 'spa' not in languages:
+            log("  [!] Pack de idioma Español ('spa') no instalado en Tesseract; se usará "
+                f"'{ocr_lang}'.")
+
+    return {'poppler': poppler_path, 'tesseract': tesseract_ok,
+            'languages': languages, 'ocr_lang': ocr_lang}
+
+
+def _stat_key(path):
+    """(ruta, tamaño, mtime) de `path`, o None si no existe."""
+    try:
+        st = os.stat(path)
+    except (OSError, TypeError, ValueError):
+        return None
+    return [path, st.st_size, st.st_mtime_ns]
+
+
+def _fingerprint(cwd, ocr_backend):
+    """
+    Datos baratos de obtener (sin lanzar procesos) que, si cambian, invalidan
+    el sondeo guardado.
+    """
+    if os.path.exists(TESSERACT_WINDOWS_PATH):
+        tesseract = TESSERACT_WINDOWS_PATH
+    else:
+        tesseract = shutil.which("tesseract")
+    tessdata = None
+    if tesseract:
+        tessdata = os.path.join(os.path.dirname(os.path.realpath(tesseract)), "tessdata")
+    return {
+        'cwd': _stat_key(cwd),  # el mtime cambia al agregar/quitar una carpeta de Poppler
+        'tesseract': _stat_key(tesseract),
+        'tessdata': _stat_key(tessdata),
+        'tessdata_prefix': _stat_key(os.environ.get("TESSDATA_PREFIX")),
+        'backend': ocr_backend,
+        'tesserocr': not missing_modules(['tesserocr']),
+    }
+
+
+def _load_cache(path, fingerprint):
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get('version') != DEPS_CACHE_VERSION:
+        return None
+    if data.get('fingerprint') != fingerprint:
+        return None
+    if not 0 <= time.time() - data.get('created', 0) <= DEPS_CACHE_MAX_AGE:
+        return None
+    if data.get('poppler') and not os.path.isdir(data['poppler']):
+        return None
+    return data
+
+
+def _save_cache(path, data):
+    # Escritura atómica; si la carpeta no es escribible simplemente no hay caché
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
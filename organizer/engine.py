@@ -0,0 +1,903 @@
+import cProfile
+import filecmp
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from . import timing
+from .cache import DEFAULT_MAX_ENTRIES, ExtractionCache, close_readers, file_hash, pipeline_key, reader
+from .dedup import DEDUP_MODES, DedupIndex, default_dedup_path, perceptual_hash
+from .extraction import (
+    RULES_VERSION, ExtractionSettings, extract_page_text, extract_text, find_date_with_strategy,
+    find_name, name_from_filename, page_count, parse_text, pdf_layout_name,
+)
+from .journal import WHOLE_FILE, JobJournal
+from .lazy import lazy_import
+from .pages import PageWriter, page_filename, page_message, place_page
+from .placement import (
+    PLACEMENT_MODES, DestinationIndex, move_file, partial_paths, place_file_retrying,
+    placed_message, reserve_target, safe_dir_name, write_bytes_retrying,
+)
+from .raster import estimate_image_bytes
+from .scanner import scan_source
+
+pytesseract = lazy_import('pytesseract')
+
+# Memoria máxima estimada de imágenes (render/decodificación para OCR) de los
+# trabajos enviados al pool y aún no escritos
+DEFAULT_MEMORY_BUDGET = 1024 ** 3
+
+# Hilos de la etapa de ubicación (copias al destino) cuando hay pool de procesos
+DEFAULT_PLACEMENT_THREADS = 4
+
+
+def _noop(message):
+    pass
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def _init_worker(tesseract_cmd):
+    # Los procesos hijos no heredan la configuración de pytesseract en Windows (spawn)
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+
+def _empty_result(messages):
+    return {'info': None, 'error': None, 'log': messages, 'hash': None,
+            'text': None, 'cache': None, 'parsed_name': None, 'timing': None,
+            'profile': None, 'phash': None, 'duplicate': None, 'page': None,
+            'resumed': None, 'target': None, 'strategy': None}
+
+
+def _extract_job(filepath, cache_path=None, settings=None, profile_path=None,
+                 content_hash=None, perceptual=False, page=None, strategies=False):
+    """
+    Unidad de trabajo ejecutada en un proceso del pool.
+    Retorna dict con 'info', 'error', los mensajes de log generados, los
+    tiempos por etapa ('timing') y, si hay caché, el hash del archivo y el
+    texto extraído para guardarlo. Con profile_path, la extracción corre bajo
+    cProfile y las estadísticas se vuelcan a ese archivo.
+    content_hash: hash ya calculado por el proceso principal (no se relee).
+    perceptual: calcular también el hash perceptual ('phash') para dedup.
+    page: (índice, total) para analizar solo esa página del archivo.
+    strategies: anotar en 'strategy' cómo se encontraron nombre y año (--plan).
+    """
+    record = timing.FileTiming(filepath)
+    profiler = cProfile.Profile() if profile_path else None
+    with timing.recording(record):
+        if profiler:
+            profiler.enable()
+        try:
+            result = _extract(filepath, cache_path, settings, content_hash, perceptual, page,
+                              strategies)
+        finally:
+            if profiler:
+                profiler.disable()
+                profiler.dump_stats(profile_path)
+    result['timing'] = record.as_dict()
+    result['profile'] = profile_path
+    return result
+
+
+def _extract(filepath, cache_path, settings, content_hash=None, perceptual=False, page=None,
+             strategies=False):
+    messages = []
+    filename = os.path.basename(filepath)
+    result = _empty_result(messages)
+    result['hash'] = content_hash
+    result['page'] = page
+    try:
+        info = None
+        text = None
+        if perceptual:
+            with timing.stage('phash'):
+                result['phash'] = _perceptual_hash(filepath, messages)
+        if (cache_path or strategies) and result['hash'] is None:
+            # Al planear, el hash va al manifiesto (apply reconoce con él lo ya movido)
+            with timing.stage('hash'):
+                result['hash'] = file_hash(filepath)
+        if cache_path:
+            with timing.stage('cache'):
+                info, text = _cached_info(cache_path, pipeline_key(settings), result)
+            if info:
+                timing.note('method', 'cache')
+                messages.append("  [i] Resultado tomado de la caché")
+
+        if info is None:
+            if page is None:
+                text = extract_text(filepath, messages.append, settings)
+            else:
+                text = extract_page_text(filepath, page[0], messages.append, settings)
+            if text is not None:
+                with timing.stage('parse'):
+                    info = parse_text(text)
+                result['text'] = text
+
+        strategy = 'keyword' if info and info.get('name') != "Desconocido" else 'none'
+        if (info and info.get('name', 'Desconocido') == "Desconocido" and _is_pdf(filepath)
+                and result['cache'] != 'hit'):
+            # Sin palabra clave: el texto más grande de la página (ver organizer.layout).
+            # En la caché ya se guarda el resultado de este paso
+            name = _layout_name(filepath, page, messages)
+            if name:
+                info['name'] = name
+                strategy = 'layout'
+                messages.append(f"  [i] Nombre por diseño de página: {name}")
+        if info:
+            result['parsed_name'] = info['name']
+        # En modo por página el nombre del archivo es el de la exportación completa
+        if info and info.get('name', 'Desconocido') == "Desconocido" and page is None:
+            # Fallback: Si el nombre es Desconocido, intentar extraerlo del nombre del archivo
+            name = name_from_filename(filename)
+            if name:
+                info['name'] = name
+                strategy = 'filename'
+                messages.append(f"  [i] Nombre extraído del archivo: {name}")
+        if info and result['cache'] != 'hit':
+            timing.note('name_strategy', strategy)
+        if info and strategies:
+            result['strategy'] = _strategies(info, strategy, text, result['cache'])
+        result['info'] = info
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+def _is_pdf(filepath):
+    return filepath.lower().endswith('.pdf')
+
+
+def _layout_name(filepath, page, messages):
+    try:
+        return pdf_layout_name(filepath, page[0] if page else 0)
+    except Exception as e:
+        messages.append(f"  [!] No se pudo analizar el diseño de página: {e}")
+        return None
+
+
+def _cached_info(cache_path, pipeline, result):
+    """(nombre/año de la caché o None, texto guardado)."""
+    cache = reader(cache_path, pipeline)
+    entry = cache.get(_cache_key(result)) if cache else None
+    if entry is None:
+        return None, None
+    if entry['rules'] == RULES_VERSION:
+        result['cache'] = 'hit'
+        return {'name': entry['name'], 'year': entry['year']}, entry['text']
+    # Las reglas cambiaron: re-analizar el texto guardado sin repetir OCR
+    result['cache'] = 'reparsed'
+    result['text'] = entry['text']
+    return parse_text(entry['text']), entry['text']
+
+
+def _strategies(info, name_strategy, text, cache):
+    """(estrategia del nombre, estrategia del año) para el manifiesto de --plan."""
+    if cache == 'hit' and name_strategy == 'keyword' and find_name(text) != info['name']:
+        # La caché guarda también los nombres encontrados por diseño de página
+        name_strategy = 'layout'
+    date_strategy = find_date_with_strategy(text)[1] if text else 'none'
+    return name_strategy, date_strategy
+
+
+def _cache_key(result):
+    # Cada página de un archivo separado tiene su propia entrada
+    if result['page'] is None:
+        return result['hash']
+    return f"{result['hash']}#p{result['page'][0]}"
+
+
+def _perceptual_hash(filepath, messages):
+    try:
+        return perceptual_hash(filepath)
+    except Exception as e:
+        messages.append(f"  [!] No se pudo calcular el hash perceptual: {e}")
+        return None
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    value = func(*args)
+    return value, time.perf_counter() - start
+
+
+def _done(result):
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def _page_key(page):
+    return WHOLE_FILE if page is None else page[0]
+
+
+def _add_stage(record, name, seconds):
+    if record is not None:
+        record['stages'][name] = record['stages'].get(name, 0.0) + seconds
+        record['total'] += seconds
+
+
+def _future_result(future):
+    try:
+        return future.result()
+    except Exception as e:
+        # Ej. BrokenProcessPool para los trabajos en vuelo cuando un proceso hijo murió
+        result = _empty_result([])
+        result['error'] = str(e)
+        return result
+
+
+class BatchProcessor:
+    """
+    Ejecuta extract_info en paralelo sobre un pool de procesos y ubica los
+    archivos en un único paso escritor que respeta el orden de entrada, de modo
+    que el manejo de colisiones de move_file sea determinista.
+
+    placement: modo de ubicación de move_file ('copy', 'move', 'hardlink', 'reflink').
+    placement_threads: hilos que escriben en el destino en paralelo con la
+    extracción, con reintentos (ver placement.place_file_retrying); el nombre
+    final se sigue eligiendo en orden. 0 = ubicar en el paso escritor. Por
+    defecto DEFAULT_PLACEMENT_THREADS con pool de procesos, 0 con workers=1.
+    split_pages: analizar cada página de los PDF/TIFF con varias páginas por
+    separado (en paralelo) y escribir cada una como archivo propio.
+    relative_root: si se indica, se conserva la estructura de carpetas del
+    origen: un archivo en relative_root/a/b/ va a DESTINO/a/b/{Año}/{Nombre}/.
+    dedup: 'off', 'exact' (se omiten archivos idénticos a uno ya ubicado, sin
+    extraerlos) o 'perceptual' (además, reescaneos del mismo documento con el
+    mismo año y nombre). El índice persiste en dedup_path (default: DESTINO/.organizer_dedup.sqlite).
+    journal_path: bitácora para reanudar corridas interrumpidas (ver organizer.journal).
+    memory_budget: bytes de imágenes en vuelo (ver raster.estimate_image_bytes:
+    un costo fijo por PDF, sin abrirlo, que subestima las páginas más grandes
+    que carta/A4, y el tamaño del encabezado en las imágenes) que puede sumar
+    el pool; mientras se exceda no se envían más trabajos ni se buscan más
+    archivos. Un archivo que por sí solo lo supera se procesa cuando no hay
+    otros en vuelo. None = sin límite.
+    manifest: con dry_run, ManifestWriter que recibe cada ubicación planeada
+    con su destino exacto (ver organizer.manifest); la caché de extracción sí
+    se actualiza, para que volver a planear sea rápido.
+    timings: TimingReport que recibe los tiempos por archivo y etapa (opcional).
+    profile_dir: si se indica, cada archivo se perfila con cProfile y
+    `timings` conserva ahí solo los perfiles de los más lentos.
+    """
+
+    def __init__(self, dest, workers=None, log=_noop, dry_run=False, cache_path=None,
+                 cache_max_entries=DEFAULT_MAX_ENTRIES, settings=None, timings=None,
+                 profile_dir=None, placement='copy', dedup='off', dedup_path=None,
+                 relative_root=None, split_pages=False, journal_path=None,
+                 memory_budget=DEFAULT_MEMORY_BUDGET, placement_threads=None, manifest=None):
+        if placement not in PLACEMENT_MODES:
+            raise ValueError(f"Modo de ubicación inválido: {placement}")
+        if dedup not in DEDUP_MODES:
+            raise ValueError(f"Modo de duplicados inválido: {dedup}")
+        self.dest = dest
+        self.placement = placement
+        self.relative_root = relative_root
+        self.split_pages = split_pages
+        self.journal_path = journal_path
+        self.journal = None
+        self._resume_pending = 0
+        self.memory_budget = memory_budget or None
+        self.peak_image_bytes = 0
+        self._page_writer = PageWriter()
+        self.dedup_mode = dedup
+        self.dedup_path = dedup_path or default_dedup_path(dest)
+        self.dedup = None
+        self._run_hashes = {}
+        self.settings = settings or ExtractionSettings()
+        self.dry_run = dry_run
+        self.manifest = manifest if dry_run else None
+        self.cache_path = cache_path
+        self.cache_max_entries = cache_max_entries
+        self.workers = max(1, workers or default_workers())
+        if placement_threads is None:
+            placement_threads = DEFAULT_PLACEMENT_THREADS if self.workers > 1 else 0
+        self.placement_threads = max(0, placement_threads)
+        self._placer = None
+        self._placing = deque()  # ubicaciones en curso, en orden de envío
+        self.log = log
+        self.profile_dir = profile_dir
+        self.timings = timings
+        if profile_dir and timings is None:
+            self.timings = timing.TimingReport()
+        self._profile_seq = 0
+        self._indexes = {}
+        self.files_processed = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.duplicates = 0
+        self.cache = None
+        self._job_cache_path = None
+        self._pool = None
+        self._opened = False
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def open(self):
+        """
+        Abre la caché y el pool de procesos. Dentro de un bloque with, varias
+        llamadas a run() reutilizan el mismo pool (p. ej. en modo vigilancia).
+        """
+        if self._opened:
+            return
+        # El destino se indexa una vez mientras esté abierto (todas las corridas
+        # de un bloque with, p. ej. los lotes del modo vigilancia)
+        self._indexes = {}
+        if self.cache_path and (not self.dry_run or self.manifest is not None):
+            self.cache = ExtractionCache(
+                self.cache_path, self.cache_max_entries, pipeline=pipeline_key(self.settings)
+            )
+        # En simulación (salvo al planear) la caché solo se lee si existe; no se crea en destino
+        if self.cache_path and os.path.exists(self.cache_path):
+            self._job_cache_path = self.cache_path
+        if self.profile_dir:
+            os.makedirs(self.profile_dir, exist_ok=True)
+        if self.dedup_mode != 'off':
+            self.dedup = DedupIndex(self.dedup_path, readonly=self.dry_run)
+        if self.journal_path and not self.dry_run:
+            self.journal = JobJournal(self.journal_path)
+            self._resume_pending = 0
+        if self.workers > 1:
+            self._pool = self._new_pool()
+        if self.placement_threads and not self.dry_run:
+            self._placer = ThreadPoolExecutor(max_workers=self.placement_threads,
+                                              thread_name_prefix="organizer-place")
+        self._opened = True
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(pytesseract.pytesseract.tesseract_cmd,),
+        )
+
+    def _restart_pool(self):
+        """
+        Reemplaza el pool tras la muerte de un proceso hijo (p. ej. un fallo de
+        PyMuPDF/Tesseract o el OOM killer con un escaneo dañado): los trabajos
+        en vuelo ya se reportaron como error y la corrida sigue con el resto.
+        """
+        self.log("  [!] Un proceso de extracción terminó inesperadamente; se reinicia el pool")
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = self._new_pool()
+
+    def close(self):
+        if not self._opened:
+            return
+        if self._pool:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        if self._placer:
+            self._placer.shutdown(wait=True)
+            self._placer = None
+        close_readers()
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+        if self.dedup:
+            self.dedup.close()
+            self.dedup = None
+        if self.cache:
+            self.cache.prune()
+            self.cache.close()
+            self.cache = None
+        self._opened = False
+
+    def run(self, files):
+        self.files_processed = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.duplicates = 0
+        self.peak_image_bytes = 0
+        self._run_hashes = {}
+        owns_resources = not self._opened
+        self.open()
+        completed = False
+        try:
+            if self.journal:
+                self.journal.start_run()
+                pending = self.journal.pending()
+                # En modo vigilancia cada lote es una corrida: avisar solo si cambió
+                if pending and pending != self._resume_pending:
+                    self.log(f"[i] Reanudando corrida interrumpida ({pending} entradas en la bitácora)")
+                self._resume_pending = pending
+            self._run(files)
+            completed = not self._cancelled.is_set()
+        finally:
+            self._page_writer.close()
+            if self.journal:
+                if completed:
+                    self.journal.finish_run()
+                else:
+                    self.journal.commit()
+            if owns_resources:
+                self.close()
+            else:
+                if self.cache:
+                    self.cache.commit()
+                if self.dedup:
+                    self.dedup.commit()
+
+        return {'processed': self.files_processed, 'errors': self.errors,
+                'cache_hits': self.cache_hits, 'duplicates': self.duplicates}
+
+    def _run(self, files):
+        if self._pool is None:
+            # Sin pool: útil para depurar y para pruebas con mocks
+            results = (
+                (filepath, resolved or _extract_job(*self._job_args(filepath, digest, page)))
+                for filepath, page, digest, resolved in self._units(files)
+            )
+        else:
+            results = self._ordered_results(files)
+        try:
+            for filepath, result in results:
+                self._write(filepath, result)
+                if self._cancelled.is_set():
+                    break
+        finally:
+            # Las copias ya enviadas terminan también al cancelar
+            self._collect_placements(wait_all=True)
+
+    def _ordered_results(self, files):
+        # Ventana acotada de trabajos en vuelo; los resultados se entregan en orden de envío
+        window = self.workers * 4
+        pending = deque()  # (archivo, future, costo, pool que lo ejecuta)
+        in_flight = 0  # bytes de imagen estimados de los trabajos en `pending`
+        try:
+            for filepath, page, digest, resolved in self._units(files):
+                if self._cancelled.is_set():
+                    break
+                cost = 0 if resolved else self._image_bytes(filepath, page)
+                # Contrapresión: esperar resultados antes de enviar (y de seguir buscando archivos)
+                while pending and (len(pending) >= window or
+                                   (self.memory_budget and in_flight + cost > self.memory_budget)):
+                    entry = pending.popleft()
+                    in_flight -= entry[2]
+                    yield entry[0], self._pool_result(*entry[1:])
+                if resolved:
+                    future, pool = _done(resolved), None
+                else:
+                    args = self._job_args(filepath, digest, page)
+                    try:
+                        future, pool = self._pool.submit(_extract_job, *args), self._pool
+                    except BrokenProcessPool:
+                        # El pool se rompió antes de ver el resultado de sus trabajos:
+                        # los que estaban en vuelo fallan y este se reenvía al pool nuevo
+                        broken = self._pool
+                        while pending:
+                            entry = pending.popleft()
+                            yield entry[0], self._pool_result(*entry[1:])
+                        in_flight = 0
+                        if self._pool is broken:
+                            self._restart_pool()
+                        future, pool = self._pool.submit(_extract_job, *args), self._pool
+                pending.append((filepath, future, cost, pool))
+                in_flight += cost
+                self.peak_image_bytes = max(self.peak_image_bytes, in_flight)
+            while pending:
+                entry = pending.popleft()
+                yield entry[0], self._pool_result(*entry[1:])
+        finally:
+            # Al cancelar, descartar los trabajos que aún no empiezan
+            for _, future, _, _ in pending:
+                future.cancel()
+
+    def _pool_result(self, future, cost, pool):
+        """Resultado de un trabajo; si su proceso murió, el pool se reemplaza para los siguientes."""
+        result = _future_result(future)
+        if (pool is not None and pool is self._pool and not future.cancelled()
+                and isinstance(future.exception(), BrokenProcessPool)):
+            self._restart_pool()
+        return result
+
+    def _image_bytes(self, filepath, page):
+        if not self.memory_budget:
+            return 0
+        return estimate_image_bytes(filepath, self.settings.raster, page[0] if page else 0)
+
+    def _units(self, files):
+        """
+        Genera las unidades de trabajo (archivo, página, hash, resuelto):
+        página es None salvo al separar archivos multipágina, donde cada
+        página es una unidad (índice, total); resuelto es el resultado ya
+        conocido si no hace falta extraer (duplicado o retomado de la bitácora).
+        """
+        for filepath in files:
+            if self.journal and self.journal.lookup_any(filepath):
+                # Archivo de una corrida interrumpida: no es duplicado de sí mismo
+                digest, duplicate = None, None
+            else:
+                digest, duplicate = self._check_duplicate(filepath)
+            pages = self._page_count(filepath) if self.split_pages and not duplicate else 1
+            if pages <= 1:
+                units = [None]
+            else:
+                units = [(index, pages) for index in range(pages)]
+                if digest is None and self._job_cache_path:
+                    # Un solo hash del archivo para las claves de caché de todas sus páginas
+                    digest = file_hash(filepath)
+            for page in units:
+                resolved = duplicate or self._resumed_result(filepath, page)
+                if resolved is None and self.journal:
+                    self.journal.discovered(filepath, _page_key(page))
+                yield filepath, page, digest, resolved
+
+    def _resumed_result(self, filepath, page):
+        """Resultado tomado de la bitácora, o None si hay que extraer."""
+        if not self.journal:
+            return None
+        entry = self.journal.lookup(filepath, _page_key(page))
+        if entry is None or entry['state'] == 'discovered':
+            return None
+        messages = []
+        result = _empty_result(messages)
+        result['page'] = page
+        try:
+            state = self._resumed_state(filepath, page, entry['state'], entry['target'], messages)
+        except OSError as e:
+            # Temporal bloqueado o sin permisos: la entrada queda para otra corrida
+            result['error'] = f"no se pudo limpiar la copia interrumpida: {e}"
+            return result
+        self.journal.resume(filepath, _page_key(page))
+        result['info'] = {'year': entry['year'], 'name': entry['name']}
+        result['resumed'] = state
+        result['target'] = entry['target']
+        return result
+
+    def _resumed_state(self, filepath, page, state, target, messages):
+        """
+        Estado real de una entrada 'placing'/'placed' de la bitácora. Las
+        escrituras pasan por un temporal que se renombra al terminar (ver
+        placement.place_file), así que un archivo con el nombre final está
+        completo; aun así, antes de darlo por ubicado sin registro (o de borrar
+        el original al mover) se compara su contenido con el del origen.
+        """
+        if state not in ('placing', 'placed'):
+            return state
+        if not target:
+            return 'extracted'
+        for partial in partial_paths(target):
+            os.remove(partial)  # Temporal de una copia interrumpida
+        if not os.path.exists(target):
+            return 'extracted'
+        if state == 'placed' and (self.placement != 'move' or page is not None):
+            return 'placed'
+        if self._same_content(filepath, page, target):
+            return 'placed'
+        # No es la copia de este archivo: no se toca y se ubica con otro nombre
+        relative = os.path.relpath(target, self.dest).replace(os.sep, '/')
+        messages.append(f"  [!] {relative} no coincide con el original; se ubica de nuevo")
+        return 'extracted'
+
+    def _same_content(self, filepath, page, target):
+        try:
+            if page is not None:
+                with open(target, 'rb') as f:
+                    return f.read() == self._page_writer.render(filepath, page[0])
+            return os.path.samefile(filepath, target) or filecmp.cmp(filepath, target, shallow=False)
+        except Exception:
+            return False
+
+    def _page_count(self, filepath):
+        try:
+            return page_count(filepath)
+        except Exception:
+            # El error se reporta al extraer
+            return 1
+
+    def _job_args(self, filepath, digest, page=None):
+        perceptual = self.dedup_mode == 'perceptual' and page is None
+        return (filepath, self._job_cache_path, self.settings, self._profile_path(filepath),
+                digest, perceptual, page, self.manifest is not None)
+
+    def _check_duplicate(self, filepath):
+        """
+        Con dedup activo, calcula el hash del contenido antes de extraer.
+        Retorna (hash, resultado): resultado no es None si el archivo es un
+        duplicado exacto (de uno ya ubicado o de uno anterior en esta corrida).
+        """
+        if self.dedup is None:
+            return None, None
+        try:
+            digest = file_hash(filepath)
+        except OSError:
+            # El error se reporta al extraer
+            return None, None
+        original = self._run_hashes.get(digest)
+        if original is None:
+            target = self.dedup.exact(digest)
+            if target and not os.path.exists(os.path.join(self.dest, target)):
+                # El archivo ubicado ya no está: se vuelve a procesar
+                self.dedup.forget(digest)
+                target = None
+            if target is None:
+                self._run_hashes[digest] = filepath
+                return digest, None
+        result = _empty_result([])
+        result['hash'] = digest
+        result['duplicate'] = original or target
+        return digest, result
+
+    def _profile_path(self, filepath):
+        if not self.profile_dir:
+            return None
+        self._profile_seq += 1
+        filename = os.path.basename(filepath)
+        return os.path.join(self.profile_dir, f"{self._profile_seq:06d}_{filename}.prof")
+
+    def _write(self, filepath, result):
+        deferred = False
+        try:
+            deferred = self._place(filepath, result)
+        finally:
+            if not deferred:
+                self._add_timing(result)
+        self._collect_placements()
+
+    def _add_timing(self, result):
+        if self.timings is not None and result['timing'] is not None:
+            self.timings.add(result['timing'], result['profile'])
+
+    def _place(self, filepath, result):
+        """Ubica un resultado; retorna True si la escritura quedó en curso en la etapa asíncrona."""
+        filename = os.path.basename(filepath)
+        page = result['page']
+        if page is None:
+            self.log(f"Analizando: {filename}...")
+        else:
+            self.log(f"Analizando: {filename} (página {page[0] + 1}/{page[1]})...")
+        for message in result['log']:
+            self.log(message)
+        if result['duplicate']:
+            self._skip_duplicate(filepath, result)
+            return
+        if result['resumed'] == 'placed':
+            self._finish_resumed(filepath, result)
+            return
+        if result['resumed']:
+            self.log("  [i] Datos tomados de la bitácora de la corrida interrumpida")
+        self._update_cache(result)
+
+        if result['error'] is not None:
+            self.log(f"  [X] Error procesando {filename}: {result['error']}")
+            self.errors += 1
+            self._plan(filepath, result, 'error')
+            return
+
+        info = result['info']
+        if not info:
+            self.log(f"  [!] No se pudo extraer información de {filename}")
+            self.errors += 1
+            self._plan(filepath, result, 'error')
+            return
+
+        year = info.get('year', 'Desconocido')
+        name = info.get('name', 'Desconocido')
+        if self.journal:
+            self.journal.extracted(filepath, _page_key(page), year, name)
+        if self.dedup:
+            similar = self.dedup.similar(result['phash'], year, name)
+            if similar:
+                self.log(f"  [=] Duplicado visual de {similar}, se omite")
+                self.duplicates += 1
+                self._plan(filepath, result, 'duplicate', similar, year, name)
+                return
+        subdir = self._relative_dir(filepath)
+        if self.dry_run:
+            relative = os.path.join(subdir, year, safe_dir_name(name))
+            self.log(f"  -> Se copiaría a: {relative.replace(os.sep, '/')}/")
+            if page is not None:
+                filename = page_filename(filename, *page)
+            target = os.path.join(relative, filename)
+            if self.manifest is not None:
+                # Nombre libre exacto, como al ubicar (el índice solo lee el destino)
+                index, dest_root = self._index(subdir)
+                target = os.path.relpath(
+                    reserve_target(filename, dest_root, year, name, index, create=False), self.dest)
+                self._plan(filepath, result, 'place', target, year, name)
+            self._remember_placed(result, year, name, target)
+            self.files_processed += 1
+            return
+        try:
+            start = time.perf_counter()
+            index, dest_root = self._index(subdir)
+            on_target = self._on_target(filepath, page)
+            if self._placer:
+                self._place_async(filepath, result, year, name, dest_root, index, on_target, start)
+                return True
+            target = self._place_now(filepath, page, subdir, year, name)
+            if self.journal:
+                self.journal.placed(filepath, _page_key(page))
+            _add_stage(result['timing'], 'place', time.perf_counter() - start)
+            self._remember_placed(result, year, name, os.path.relpath(target, self.dest))
+            self.files_processed += 1
+        except Exception as e:
+            self.log(f"  [X] Error procesando {filename}: {e}")
+            self.errors += 1
+
+    def _on_target(self, filepath, page):
+        if not self.journal:
+            return None
+
+        def on_target(path):
+            self.journal.placing(filepath, _page_key(page), path)
+        return on_target
+
+    def _place_now(self, filepath, page, subdir, year, name):
+        """Ubica en el paso escritor; retorna la ruta final."""
+        for attempt in range(2):
+            index, dest_root = self._index(subdir)
+            try:
+                if page is None:
+                    return move_file(filepath, dest_root, year, name, self.log, self.placement,
+                                     index, self._on_target(filepath, page))
+                return place_page(filepath, page, dest_root, year, name, index, self._page_writer,
+                                  self.log, self._on_target(filepath, page))
+            except FileExistsError:
+                if attempt:
+                    raise
+                # Otro proceso escribió en el destino: el índice ya no es fiable
+                self._indexes.pop(subdir, None)
+
+    def _index(self, subdir):
+        """(DestinationIndex, carpeta) de DESTINO/subdir, creado una vez mientras esté abierto."""
+        dest_root = os.path.join(self.dest, subdir)
+        index = self._indexes.get(subdir)
+        if index is None:
+            index = self._indexes[subdir] = DestinationIndex(dest_root)
+        return index, dest_root
+
+    def _plan(self, filepath, result, status, target=None, year=None, name=None):
+        if self.manifest is None:
+            return
+        page = result['page']
+        method = result['timing'].get('method') if result['timing'] else None
+        self.manifest.add(filepath, status, page[0] if page else None, target, year, name,
+                          method, result['strategy'], result['hash'])
+
+    def _place_async(self, filepath, result, year, name, dest_root, index, on_target, start):
+        """
+        Elige el destino en orden (índice en memoria, sin tocar el disco) y
+        envía la escritura a la etapa de ubicación; _collect_placements la
+        completa. El escritor sigue con el siguiente resultado mientras tanto.
+        """
+        page = result['page']
+        filename = os.path.basename(filepath)
+        if page is not None:
+            filename = page_filename(filename, *page)
+        target = reserve_target(filename, dest_root, year, name, index, create=False)
+        if on_target:
+            on_target(target)
+        create_dir = index.missing_dir(target)
+        if page is None:
+            future = self._placer.submit(_timed, place_file_retrying, filepath, target,
+                                         self.placement, self.log, create_dir)
+        else:
+            data = self._page_writer.render(filepath, page[0])
+            future = self._placer.submit(_timed, write_bytes_retrying, data, target, create_dir)
+        # Se registra ya para que los duplicados visuales siguientes lo vean
+        self._remember_placed(result, year, name, os.path.relpath(target, self.dest))
+        self._placing.append((filepath, result, year, name, target, start, future))
+
+    def _collect_placements(self, wait_all=False):
+        """
+        Completa, en orden de envío, las ubicaciones terminadas. Si hay más de
+        2 por hilo en curso (o wait_all) espera a las más antiguas: así el
+        escritor no se adelanta demasiado a un destino lento.
+        """
+        limit = 0 if wait_all else self.placement_threads * 2
+        while self._placing and (len(self._placing) > limit or self._placing[0][-1].done()):
+            self._finish_placement(*self._placing.popleft())
+
+    def _finish_placement(self, filepath, result, year, name, target, start, future):
+        page = result['page']
+        filename = os.path.basename(filepath)
+        try:
+            try:
+                used, seconds = future.result()
+            except FileExistsError:
+                # El nombre reservado apareció ocupado: se relee el destino y se ubica aquí
+                subdir = self._relative_dir(filepath)
+                self._indexes.pop(subdir, None)
+                retry_start = time.perf_counter()
+                target = self._place_now(filepath, page, subdir, year, name)
+                used, seconds = None, time.perf_counter() - retry_start
+                self._remember_placed(result, year, name, os.path.relpath(target, self.dest))
+        except Exception as e:
+            self.log(f"  [X] Error ubicando {filename}: {e}")
+            self.errors += 1
+            if self.dedup and result['hash'] and (page is None or page[0] == 0):
+                self.dedup.forget(result['hash'])
+        else:
+            index = self._indexes.get(self._relative_dir(filepath))
+            if index is not None:
+                # Las escrituras siguientes en esa carpeta ya no llaman a makedirs
+                index.dir_created(target)
+            if used is not None:  # Si no, _place_now ya lo anotó
+                message = placed_message(used, year, name) if page is None else page_message(page, year, name)
+                self.log(f"{message} ({filename})")
+            if self.journal:
+                self.journal.placed(filepath, _page_key(page))
+            _add_stage(result['timing'], 'place', seconds)
+            self.files_processed += 1
+        self._add_timing(result)
+
+    def _finish_resumed(self, filepath, result):
+        # Ubicado antes de la interrupción; en modo mover falta borrar el original
+        if self.placement == 'move' and result['page'] is None:
+            try:
+                os.remove(filepath)
+            except OSError as e:
+                self.log(f"  [X] Error ubicando {os.path.basename(filepath)}: "
+                         f"no se pudo borrar el original: {e}")
+                self.errors += 1
+                # La copia ya está completa: la próxima corrida solo intenta borrar el original
+                self.journal.release(filepath)
+                return
+        self.journal.placed(filepath, _page_key(result['page']))
+        relative = os.path.relpath(result['target'], self.dest).replace(os.sep, '/')
+        self.log(f"  [i] Ya ubicado antes de la interrupción: {relative}")
+        self.files_processed += 1
+
+    def _relative_dir(self, filepath):
+        """Subcarpeta del origen a conservar en el destino ('' si no aplica)."""
+        if not self.relative_root:
+            return ""
+        relative = os.path.relpath(os.path.dirname(os.path.abspath(filepath)),
+                                   os.path.abspath(self.relative_root))
+        if relative == os.curdir or relative.startswith(os.pardir):
+            return ""
+        return relative
+
+    def _skip_duplicate(self, filepath, result):
+        target = self.dedup.exact(result['hash'])
+        if target is None:
+            # El original de esta corrida no pudo ubicarse (el contenido es el mismo)
+            self.log(f"  [!] Duplicado de {os.path.basename(result['duplicate'])}, que no se pudo ubicar")
+            self.errors += 1
+            self._plan(filepath, result, 'error')
+            return
+        self.log(f"  [=] Duplicado exacto de {target}, se omite")
+        self.duplicates += 1
+        self._plan(filepath, result, 'duplicate', target)
+
+    def _remember_placed(self, result, year, name, target):
+        # De un archivo separado se registra su primera página
+        if result['page'] is not None and result['page'][0] != 0:
+            return
+        if self.dedup and result['hash']:
+            self.dedup.add(result['hash'], result['phash'], year, name, target)
+
+    def _update_cache(self, result):
+        if result['cache'] == 'hit':
+            self.cache_hits += 1
+        if not self.cache or not result['hash'] or not result['info']:
+            return
+        info = result['info']
+        if result['cache'] == 'hit':
+            self.cache.touch(_cache_key(result))
+        elif result['text']:
+            # Se guarda el nombre analizado del texto (antes del fallback por nombre de archivo)
+            self.cache.put(_cache_key(result), result['text'], result['parsed_name'], info['year'])
+
+
+def list_source_files(source):
+    """Archivos soportados directamente en `source` (sin subcarpetas), por nombre."""
+    return list(scan_source(source))
@@ -0,0 +1,446 @@
+import hashlib
+import os
+import re
+
+from . import timing
+from .layout import CONNECTORS, LAYOUT_VERSION, TITLE_WORDS, layout_name
+from .lazy import lazy_import
+from .ocr import BACKENDS, ocr_image
+from .raster import RasterSettings, pdf_ocr_image, prepare_image
+
+fitz = lazy_import('fitz')  # PyMuPDF
+Image = lazy_import('PIL.Image')
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff')
+VALID_EXTENSIONS = ('.pdf',) + IMAGE_EXTENSIONS
+
+# Palabras clave que preceden al nombre (Spanish + English)
+KEYWORDS = [
+    "otorga a", "otorga el presente", "certifica a", "certifica que",
+    "reconocimiento a", "presente a", "favor de", "constancia a",
+    "presente diploma a", "se hace constar que", "certificamos a",
+    "certifies that", "presented to", "awarded to", "reviewer certificate",
+    "thank you", "recognition of"
+]
+
+# Palabras que marcan el FIN del nombre (Stopwords)
+STOP_WORDS = {
+    "por", "en", "con", "el", "la", "los", "las", "se", "ha", "haber",
+    "asistencia", "participación", "participacion", "curso", "taller",
+    "fecha", "dado", "expide", "aguascalientes", "enero", "febrero",
+    "marzo", "abril", "mayo", "junio", "julio", "agosto", "septiembre",
+    "octubre", "noviembre", "diciembre",
+    "for", "of", "and", "in", "to", "date", "given"
+}
+
+
+# Las constancias tienen los datos en las primeras páginas
+DEFAULT_MAX_PAGES = 10
+
+# Caracteres del final de la página anterior que read_pdf_text revisa con la siguiente
+PAGE_OVERLAP = 200
+
+# Huella de las reglas de find_name/find_date: cambia si se editan las listas
+# o se incrementa PARSER_VERSION, invalidando los resultados guardados en caché
+PARSER_VERSION = "2"
+RULES_VERSION = hashlib.sha1(
+    repr((PARSER_VERSION, KEYWORDS, sorted(STOP_WORDS),
+          LAYOUT_VERSION, sorted(CONNECTORS), sorted(TITLE_WORDS))).encode("utf-8")
+).hexdigest()[:12]
+
+
+def _noop(message):
+    pass
+
+
+class ExtractionSettings:
+    """
+    Opciones del pipeline de extracción (viajan a los procesos de trabajo).
+    max_pages: máximo de páginas de PDF a leer (None = todas).
+    raster: RasterSettings para el OCR.
+    ocr_backend: 'auto', 'tesserocr' o 'pytesseract' (ver organizer.ocr).
+    ocr_lang: idiomas de Tesseract (ej. 'spa+eng'); None = detectar en cada proceso.
+    """
+
+    def __init__(self, max_pages=DEFAULT_MAX_PAGES, raster=None, ocr_backend='auto',
+                 ocr_lang=None):
+        if max_pages is not None and max_pages < 1:
+            raise ValueError(f"max_pages inválido: {max_pages}")
+        if ocr_backend not in BACKENDS:
+            raise ValueError(f"Backend de OCR inválido: {ocr_backend}")
+        self.max_pages = max_pages
+        self.raster = raster or RasterSettings()
+        self.ocr_backend = ocr_backend
+        self.ocr_lang = ocr_lang
+
+    def key(self):
+        """Identificador estable de la configuración (forma parte de la clave de caché)."""
+        return f"p{self.max_pages or 'all'}|{self.raster.key()}|{self.ocr_lang or 'auto'}"
+
+
+def extract_info(file_path, log=_noop, settings=None):
+    """
+    Extracts Name and Date/Year from PDF or Image.
+    Returns dict: {'name': str, 'year': str} or None if failed.
+    """
+    text = extract_text(file_path, log, settings)
+    if text is None:
+        return None
+    return parse_text(text)
+
+
+def extract_text(file_path, log=_noop, settings=None):
+    """
+    Obtiene el texto (nativo u OCR) de un PDF o imagen, ya limpio.
+    `settings` (ExtractionSettings) controla páginas leídas y el OCR.
+    Retorna None si no se pudo leer o no se obtuvo texto.
+    """
+    settings = settings or ExtractionSettings()
+    text = ""
+    ext = os.path.splitext(file_path)[1].lower()
+
+    # A. Handle PDF
+    if ext == '.pdf':
+        timing.note('method', 'native')
+        # 1. Try PyMuPDF (Text based)
+        try:
+            with timing.stage('text'):
+                text = read_pdf_text(file_path, settings.max_pages)
+        except Exception as e:
+            log(f"  Error leyendo PDF: {e}")
+            return None
+
+        # 2. If Text is empty, try OCR (Image based)
+        if not text or (len(text.strip()) < 50 and not _settled_by_layout(file_path, 0, text, log)):
+            ocr_text = _ocr_pdf_page(file_path, 0, log, settings)
+            if ocr_text is not None:
+                text = ocr_text
+
+    # B. Handle Images
+    elif ext in IMAGE_EXTENSIONS:
+        log("  Imagen detectada, ejecutando OCR...")
+        try:
+            text = _ocr_image_file(file_path, 0, log, settings)
+        except Exception as e:
+            log(f"  Fallo al leer imagen: {e}")
+            return None
+
+    return _clean(text)
+
+
+def extract_page_text(file_path, page_index, log=_noop, settings=None):
+    """
+    Como extract_text, pero solo para una página de un PDF o un cuadro de una
+    imagen multipágina (TIFF). Se usa al separar archivos con varias constancias.
+    """
+    settings = settings or ExtractionSettings()
+    text = ""
+    ext = os.path.splitext(file_path)[1].lower()
+
+    if ext == '.pdf':
+        timing.note('method', 'native')
+        try:
+            with timing.stage('text'):
+                with fitz.open(file_path) as doc:
+                    text = doc[page_index].get_text()
+        except Exception as e:
+            log(f"  Error leyendo PDF: {e}")
+            return None
+        if not text or (len(text.strip()) < 50 and
+                         not _settled_by_layout(file_path, page_index, text, log)):
+            ocr_text = _ocr_pdf_page(file_path, page_index, log, settings)
+            if ocr_text is not None:
+                text = ocr_text
+
+    elif ext in IMAGE_EXTENSIONS:
+        try:
+            text = _ocr_image_file(file_path, page_index, log, settings)
+        except Exception as e:
+            log(f"  Fallo al leer imagen: {e}")
+            return None
+
+    return _clean(text)
+
+
+def _settled_by_layout(file_path, page_index, text, log):
+    """
+    True si el poco texto nativo ya trae año y nombre (por palabra clave o por
+    diseño de página): el OCR no agregaría nada y cuesta segundos.
+    """
+    if not text.strip() or find_date_with_strategy(text)[1] == 'none':
+        return False
+    if find_name(text) == "Desconocido" and not pdf_layout_name(file_path, page_index):
+        return False
+    log("  [i] Nombre y año presentes en el texto nativo; se omite el OCR")
+    return True
+
+
+def pdf_layout_name(file_path, page_index=0):
+    """Nombre por tamaño de letra y posición en una página de PDF (ver organizer.layout), o None."""
+    with timing.stage('layout'):
+        with fitz.open(file_path) as doc:
+            if page_index >= doc.page_count:
+                return None
+            page_dict = doc[page_index].get_text("dict", flags=fitz.TEXTFLAGS_TEXT)
+        return layout_name(page_dict, STOP_WORDS)
+
+
+def _ocr_pdf_page(file_path, page_index, log, settings):
+    """
+    Texto OCR de la página; None si la página no necesita OCR (ver
+    raster.classify_page) o no se pudo obtener la imagen (se conserva el texto nativo).
+    """
+    try:
+        with timing.stage('rasterize'):
+            kind, image = pdf_ocr_image(file_path, settings.raster, page_index)
+        if kind:
+            timing.note('page_kind', kind)
+        if image is None:
+            return None
+        if kind == 'image':
+            log("  Texto insuficiente en PDF, OCR de la imagen escaneada...")
+        else:
+            log("  Texto insuficiente en PDF, intentando OCR...")
+        timing.note('method', 'ocr')
+        with timing.stage('ocr'):
+            return ocr_image(image, log, settings.ocr_backend, settings.ocr_lang)
+    except Exception as e:
+        if "poppler" in str(e).lower() or "page count" in str(e).lower():
+            log("  [X] Error Crítico: Poppler no está instalado o en el PATH.")
+            log("      Se requiere Poppler para procesar PDFs escaneados.")
+        else:
+            log(f"  Fallo en OCR de PDF: {e}")
+    return None
+
+
+def _ocr_image_file(file_path, frame, log, settings):
+    timing.note('method', 'image')
+    with Image.open(file_path) as original:
+        if frame:
+            original.seek(frame)
+        with timing.stage('rasterize'):
+            image = prepare_image(original, settings.raster)
+        with timing.stage('ocr'):
+            return ocr_image(image, log, settings.ocr_backend, settings.ocr_lang)
+
+
+def _clean(text):
+    if not text:
+        return None
+    return text.replace('\n', ' ').strip()
+
+
+def page_count(file_path):
+    """Páginas de un PDF o cuadros de una imagen (1 para imágenes simples)."""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == '.pdf':
+        with fitz.open(file_path) as doc:
+            return doc.page_count
+    with Image.open(file_path) as image:
+        return getattr(image, 'n_frames', 1)
+
+
+def read_pdf_text(file_path, max_pages=DEFAULT_MAX_PAGES):
+    """
+    Lee el texto nativo página por página y se detiene en cuanto el nombre y
+    una fecha explícita ya aparecen en lo leído, o al llegar a max_pages.
+    Cada página se revisa solo junto con el final de la anterior (un nombre o
+    fecha partidos entre páginas), así el costo crece linealmente con las páginas.
+    """
+    parts = []
+    length = 0
+    has_date = has_name = False
+    tail = ""
+    with fitz.open(file_path) as doc:
+        for index, page in enumerate(doc):
+            if max_pages is not None and index >= max_pages:
+                break
+            page_text = page.get_text()
+            if not page_text.strip():
+                continue
+            parts.append(page_text)
+            length += len(page_text.strip())
+            window = (tail + page_text).replace('\n', ' ')
+            # Una fecha "de Mes de Año" o "Mes Año" no cambia al leer más páginas
+            # (es la primera coincidencia); el año suelto sí, así que no basta.
+            has_date = has_date or find_date_with_strategy(window)[1] in ('date', 'month_year')
+            has_name = has_name or find_name(window) != "Desconocido"
+            if length >= 50 and has_date and has_name:
+                break
+            tail = page_text[-PAGE_OVERLAP:]
+    return "".join(parts)
+
+
+def parse_text(text):
+    """Aplica las reglas de nombre y fecha sobre texto ya extraído."""
+    # El texto se normaliza una sola vez para ambas búsquedas
+    clean_text = _normalize_spaces(text)
+    text_lower = clean_text.lower()
+    name = _find_name_clean(clean_text, text_lower)
+    year = _find_date(clean_text, text_lower)[0]
+
+    return {'name': name, 'year': year}
+
+
+def find_date(text):
+    return find_date_with_strategy(text)[0]
+
+
+# Patrones precompilados (antes se construían con f-strings en cada llamada)
+_MONTH_NAMES = (
+    "enero", "febrero", "marzo", "abril", "mayo", "junio", "julio", "agosto",
+    "septiembre", "octubre", "noviembre", "diciembre",
+)
+_MONTHS = f"({'|'.join(_MONTH_NAMES)})"
+# Pattern: 12 de Enero de 2024 / 12 de Enero del 2024
+_DATE_RE = re.compile(f"\\b\\d{{1,2}}\\s+de\\s+{_MONTHS}\\s+de(l)?\\s+(20[0-3][0-9])\\b")
+# Pattern: Enero de 2024 / Enero 2024
+_MONTH_YEAR_RE = re.compile(f"{_MONTHS}\\s+(?:de(l)?\\s+)?(20[0-3][0-9])\\b")
+_YEAR_RE = re.compile(r'\b(20[0-3][0-9])\b')
+_WORD_RE = re.compile(r'[^ ]+')
+
+
+def find_date_with_strategy(text):
+    """
+    Retorna (año, estrategia) donde estrategia es 'date' ("12 de Enero de 2024"),
+    'month_year' ("Enero 2024"), 'year' (año suelto) o 'none'.
+    """
+    # Normalizar texto para facilitar búsqueda
+    return _find_date(text, text.lower())
+
+
+def _find_date(text, text_lower):
+    # Los patrones 1 y 2 necesitan un mes: si no hay ninguno se omiten (str `in` es C puro)
+    if any(month in text_lower for month in _MONTH_NAMES):
+        # 1. Busqueda explícita de "de [Mes] de [Año]"
+        date_pattern = _DATE_RE.search(text_lower)
+        if date_pattern:
+            return date_pattern.group(3), 'date' # Group 3 is the year
+
+        # 2. Busqueda de "Mes de [Año]" o "Mes [Año]" (Ej: Enero 2024)
+        month_year_pattern = _MONTH_YEAR_RE.search(text_lower)
+        if month_year_pattern:
+            return month_year_pattern.group(3), 'month_year'
+
+    # 3. Fallback: buscar solo el año (4 dígitos 2000-2039)
+    years = _YEAR_RE.findall(text)
+    if years:
+        # Retornar el año mas frecuente o el ultimo mencionado
+        return years[-1], 'year'
+
+    return "SinFecha", 'none'
+
+
+# Caracteres que re.IGNORECASE empareja con letras ASCII pero str.lower() no
+# (İ ı ſ); si aparecen, se usa la búsqueda por expresión regular
+_CASE_SPECIALS = re.compile('[\u0130\u0131\u017f]')
+
+
+class KeywordMatcher:
+    """
+    Encuentra la primera aparición de cada palabra clave (seguida de \\W+) con
+    el mismo resultado que re.search(f"{kw}\\W+", texto, re.IGNORECASE).
+
+    El texto se pasa a minúsculas una sola vez y cada keyword se busca con
+    str.find (búsqueda de subcadenas en C), mucho más rápido que una regex
+    IGNORECASE por keyword sobre textos largos. Las keywords se recorren en
+    orden de prioridad y de forma perezosa: si una ya da un nombre, las
+    siguientes ni se buscan.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = [kw.lower() for kw in keywords]
+        self._patterns = [re.compile(f"{kw}\\W+", re.IGNORECASE) for kw in keywords]
+        self._separator = re.compile(r'\W+')
+
+    def matches(self, text, text_lower=None):
+        """Genera (índice_de_keyword, fin_de_la_coincidencia) en orden de prioridad."""
+        if text_lower is None:
+            text_lower = text.lower()
+        if len(text_lower) != len(text) or (not text.isascii() and _CASE_SPECIALS.search(text)):
+            # Las posiciones no coinciden entre texto y minúsculas: ruta exacta
+            yield from self._regex_matches(text)
+            return
+
+        for index, kw in enumerate(self.keywords):
+            start = text_lower.find(kw)
+            while start != -1:
+                separator = self._separator.match(text, start + len(kw))
+                if separator:
+                    yield index, separator.end()
+                    break
+                start = text_lower.find(kw, start + 1)
+
+    def _regex_matches(self, text):
+        for index, pattern in enumerate(self._patterns):
+            match = pattern.search(text)
+            if match:
+                yield index, match.end()
+
+
+_KEYWORD_MATCHER = KeywordMatcher(KEYWORDS)
+
+
+def _normalize_spaces(text):
+    # Equivale a re.sub(r'\s+', ' ', text) salvo en los extremos (sin efecto en
+    # los resultados) y es varias veces más rápido en textos largos
+    return " ".join(text.split())
+
+
+def find_name(text):
+    # Limpiar texto de espacios multiples y caracteres extraños
+    clean_text = _normalize_spaces(text)
+    return _find_name_clean(clean_text)
+
+
+def _find_name_clean(clean_text, text_lower=None):
+    # Las keywords se evalúan en orden de prioridad sobre su primera aparición
+    for _, end in _KEYWORD_MATCHER.matches(clean_text, text_lower):
+        candidate_parts = []
+
+        # Tokenizar perezosamente solo las palabras DESPUES de la keyword
+        for token in _WORD_RE.finditer(clean_text, end):
+            # Limpiar puntuación del final de la palabra
+            word_clean = token.group().rstrip(',.;:')
+
+            if not word_clean:
+                continue
+
+            # Verificar si es una stopword
+            if word_clean.lower() in STOP_WORDS:
+                break
+
+            # Heurística: Si la palabra empieza con mayúscula o es todo mayús
+            # (Permitimos conectores de nombres como 'de', 'del' si ya tenemos algo)
+            if word_clean[0].isupper() or word_clean.lower() in ('de', 'del', 'y', 'la', 'los'):
+                candidate_parts.append(word_clean)
+            else:
+                # Si encontramos una palabra lowercase que no es conector comun, probablemente terminamos
+                break
+
+            # Limite de longitud maxima del nombre
+            if len(candidate_parts) > 6:
+                break
+
+        # Validar candidato
+        if len(candidate_parts) >= 2:
+            # Checar que no sean puros conectores
+            real_names = [p for p in candidate_parts if p.lower() not in ('de', 'del', 'y')]
+            if len(real_names) >= 1:
+                return " ".join(candidate_parts).title()
+
+    return "Desconocido"
+
+
+def name_from_filename(filename):
+    """
+    Heuristica simple: Si el archivo parece tener un nombre propio
+    Ej: "Vicente Esparza Villalpando.pdf" -> "Vicente Esparza Villalpando"
+    Retorna None si el nombre del archivo no parece un nombre.
+    """
+    # Ignorar numeros y palabras comunes
+    clean_filename = os.path.splitext(filename)[0]
+    clean_filename = re.sub(r'[\d_()]+', ' ', clean_filename).strip()
+    if len(clean_filename.split()) >= 2:
+        return clean_filename.title()
+    return None
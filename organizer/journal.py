@@ -0,0 +1,182 @@
+"""
+Bitácora de trabajos (write-ahead) para reanudar corridas interrumpidas.
+
+Cada archivo (o página, al separar) pasa por los estados:
+    discovered -> extracted -> placing -> placed
+El estado 'placing' se guarda con la ruta de destino *antes* de copiar, así
+tras un cierre inesperado se sabe si la copia terminó (el destino tiene el
+mismo contenido que el origen) o quedó a medias (se ubica de nuevo; ver
+BatchProcessor._resumed_state).
+
+Al terminar una corrida completa sus entradas se eliminan; si se interrumpe
+(cierre, error o "Detener"), la siguiente corrida reanuda desde la bitácora:
+no repite la extracción de los archivos ya analizados ni vuelve a copiar los
+ya ubicados. Al empezar cada corrida se descartan las entradas que ya no se
+pueden reanudar (el origen se movió, se borró o cambió). Se guarda en
+DESTINO/.organizer_journal.sqlite.
+"""
+import os
+import sqlite3
+import time
+import uuid
+
+JOURNAL_FILENAME = ".organizer_journal.sqlite"
+
+# Clave de página para archivos que se procesan completos
+WHOLE_FILE = -1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    source TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    year TEXT,
+    name TEXT,
+    target TEXT,
+    run TEXT NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (source, page)
+);
+CREATE INDEX IF NOT EXISTS jobs_run ON jobs (run);
+"""
+
+
+def default_journal_path(dest_root):
+    return os.path.join(dest_root, JOURNAL_FILENAME)
+
+
+def _signature(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+class JobJournal:
+    def __init__(self, path):
+        self.path = path
+        self.run = None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        # WAL + NORMAL: cada commit sobrevive a un cierre del programa sin fsync por archivo
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+
+    def start_run(self):
+        self.run = uuid.uuid4().hex
+        self.prune()
+        return self.run
+
+    def prune(self):
+        """
+        Elimina las entradas de corridas anteriores cuyo origen ya no existe o
+        cambió (lookup ya no las devolvería). Retorna cuántas se eliminaron.
+        """
+        stale = []
+        rows = self.conn.execute(
+            "SELECT source, page, size, mtime_ns FROM jobs WHERE run != ?", (self.run or "",),
+        ).fetchall()
+        for source, page, size, mtime_ns in rows:
+            try:
+                current = _signature(source)
+            except OSError:
+                current = None
+            if current != (size, mtime_ns):
+                stale.append((source, page))
+        if stale:
+            self.conn.executemany("DELETE FROM jobs WHERE source = ? AND page = ?", stale)
+            self.commit()
+        return len(stale)
+
+    def pending(self):
+        """
+        Cantidad de entradas de corridas anteriores sin terminar; tras
+        start_run, solo las que se pueden reanudar.
+        """
+        return self.conn.execute("SELECT COUNT(*) FROM jobs WHERE run != ?", (self.run or "",)).fetchone()[0]
+
+    def lookup(self, source, page=WHOLE_FILE):
+        """
+        Estado guardado de `source` si el archivo no cambió desde entonces:
+        dict con state/year/name/target, o None.
+        """
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, state, year, name, target FROM jobs WHERE source = ? AND page = ?",
+            (_key(source), page),
+        ).fetchone()
+        if row is None:
+            return None
+        try:
+            if (row[0], row[1]) != _signature(source):
+                return None
+        except OSError:
+            return None
+        return {'state': row[2], 'year': row[3], 'name': row[4], 'target': row[5]}
+
+    def lookup_any(self, source):
+        """True si hay alguna entrada (archivo o página) vigente de `source`."""
+        row = self.conn.execute(
+            "SELECT size, mtime_ns FROM jobs WHERE source = ? LIMIT 1", (_key(source),),
+        ).fetchone()
+        try:
+            return row is not None and (row[0], row[1]) == _signature(source)
+        except OSError:
+            return False
+
+    def discovered(self, source, page=WHOLE_FILE):
+        try:
+            size, mtime_ns = _signature(source)
+        except OSError:
+            # Desapareció: el error se reporta al extraer
+            return
+        self.conn.execute(
+            "INSERT INTO jobs (source, page, size, mtime_ns, state, run, updated) "
+            "VALUES (?, ?, ?, ?, 'discovered', ?, ?) "
+            "ON CONFLICT (source, page) DO UPDATE SET size = excluded.size, "
+            "mtime_ns = excluded.mtime_ns, state = 'discovered', year = NULL, name = NULL, "
+            "target = NULL, run = excluded.run, updated = excluded.updated",
+            (_key(source), page, size, mtime_ns, self.run, time.time()),
+        )
+
+    def resume(self, source, page=WHOLE_FILE):
+        """Adopta en esta corrida una entrada de una corrida interrumpida."""
+        self._update(source, page, "run = ?", (self.run,))
+
+    def release(self, source, page=WHOLE_FILE):
+        """Deja la entrada para una corrida posterior (finish_run no la elimina)."""
+        self._update(source, page, "run = ''", ())
+
+    def extracted(self, source, page, year, name):
+        self._update(source, page, "state = 'extracted', year = ?, name = ?", (year, name))
+
+    def placing(self, source, page, target):
+        # Se confirma antes de escribir en el destino (write-ahead)
+        self._update(source, page, "state = 'placing', target = ?", (target,))
+        self.conn.commit()
+
+    def placed(self, source, page):
+        self._update(source, page, "state = 'placed'", ())
+
+    def _update(self, source, page, assignments, params):
+        self.conn.execute(
+            f"UPDATE jobs SET {assignments}, updated = ? WHERE source = ? AND page = ?",
+            params + (time.time(), _key(source), page),
+        )
+
+    def finish_run(self):
+        """La corrida terminó completa: sus entradas ya no hacen falta."""
+        self.conn.execute("DELETE FROM jobs WHERE run = ?", (self.run,))
+        self.commit()
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.commit()
+        self.conn.close()
+
+
+def _key(source):
+    return os.path.normcase(os.path.abspath(source))
@@ -0,0 +1,152 @@
+"""
+Nombre del destinatario según el diseño de la página.
+
+En una constancia el nombre casi siempre es el texto más grande después del
+título ("CONSTANCIA", "RECONOCIMIENTO"...), aunque no lo preceda ninguna
+palabra clave. layout_name recibe el resultado de PyMuPDF
+page.get_text("dict") y elige, entre las líneas que parecen un nombre
+propio, la de mayor tamaño de letra (y a igual tamaño, la más cercana a la
+zona central superior de la página). Solo la acepta si es claramente más
+grande que el texto normal de la página, para no confundir al destinatario
+con firmantes o pies de página.
+
+No importa PyMuPDF: trabaja sobre el dict, así que se puede probar sin PDFs.
+"""
+import re
+
+# Cambia si se editan las reglas de este módulo (forma parte de RULES_VERSION)
+LAYOUT_VERSION = "1"
+
+# Palabras en minúscula permitidas dentro de un nombre
+CONNECTORS = {"de", "del", "la", "las", "los", "y", "e", "da", "di", "van", "von"}
+
+# Palabras de títulos, instituciones y eventos: una línea que las contiene no es un nombre
+TITLE_WORDS = {
+    "constancia", "certificado", "certificate", "diploma", "reconocimiento", "recognition",
+    "award", "premio", "mención", "mencion", "otorga", "otorgan", "presente", "certifica",
+    "universidad", "university", "instituto", "institute", "facultad", "faculty", "escuela",
+    "school", "colegio", "college", "centro", "departamento", "department", "secretaría",
+    "secretaria", "gobierno", "coordinación", "coordinacion", "dirección", "direccion",
+    "congreso", "congress", "conferencia", "conference", "simposio", "symposium",
+    "seminario", "seminar", "foro", "jornada", "encuentro", "workshop", "diplomado",
+    "programa", "program", "edición", "edicion", "internacional", "international",
+    "nacional", "national", "atentamente", "sincerely",
+}
+
+# El nombre debe medir al menos esto veces el tamaño del texto normal
+SIZE_MARGIN = 1.1
+# Fracción de la altura de página donde suele ir el nombre (desempate por posición)
+NAME_POSITION = 0.45
+MAX_WORDS = 7
+
+_WORD_RE = re.compile(r"[^\W\d_]+(?:[-'’][^\W\d_]+)*\.?")
+
+
+class _Line:
+    def __init__(self, text, size, top, bottom):
+        self.text = text
+        self.size = size
+        self.top = top
+        self.bottom = bottom
+
+
+def text_lines(page_dict):
+    """Líneas de texto de cada bloque como listas de _Line (texto, tamaño mayor, posición)."""
+    blocks = []
+    for block in page_dict.get('blocks', ()):
+        if block.get('type', 0) != 0:
+            continue
+        lines = []
+        for line in block.get('lines', ()):
+            spans = [span for span in line.get('spans', ()) if span.get('text', '').strip()]
+            if not spans:
+                continue
+            text = " ".join("".join(span['text'] for span in spans).split())
+            _, top, _, bottom = line['bbox']
+            lines.append(_Line(text, max(span['size'] for span in spans), top, bottom))
+        if lines:
+            blocks.append(lines)
+    return blocks
+
+
+def looks_like_name(text, stop_words=()):
+    """True si `text` tiene la forma de un nombre propio (2-7 palabras capitalizadas)."""
+    words = text.split()
+    if not 2 <= len(words) <= MAX_WORDS:
+        return False
+    real_words = 0
+    for word in words:
+        word = word.rstrip(',;:')
+        lower = word.lower()
+        if not _WORD_RE.fullmatch(word):
+            return False
+        if lower in CONNECTORS:
+            continue
+        if not word[0].isupper() or lower in TITLE_WORDS or lower in stop_words:
+            return False
+        real_words += 1
+    return real_words >= 2
+
+
+def _is_title(text):
+    return any(word.strip(',.;:').lower() in TITLE_WORDS for word in text.split())
+
+
+def _candidates(blocks, stop_words):
+    """Tramos de líneas consecutivas de un bloque, del mismo tamaño, que forman un nombre."""
+    found = []
+    for lines in blocks:
+        start = 0
+        while start < len(lines):
+            end = start + 1
+            # Un nombre largo puede partirse en varias líneas del mismo tamaño
+            while (end < len(lines) and abs(lines[end].size - lines[start].size) < 0.5 and
+                   looks_like_name(" ".join(l.text for l in lines[start:end + 1]), stop_words)):
+                end += 1
+            run = lines[start:end]
+            text = " ".join(line.text for line in run)
+            if looks_like_name(text, stop_words):
+                found.append((_Line(text, run[0].size, run[0].top, run[-1].bottom), run))
+            start = end
+    return found
+
+
+def _body_size(lines):
+    """Tamaño de letra mediano ponderado por caracteres."""
+    weighted = sorted((line.size, len(line.text)) for line in lines)
+    half = sum(chars for _, chars in weighted) / 2
+    seen = 0
+    for size, chars in weighted:
+        seen += chars
+        if seen >= half:
+            return size
+    return None
+
+
+def layout_name(page_dict, stop_words=()):
+    """
+    Nombre más probable según tamaño de letra y posición, o None.
+    page_dict: resultado de page.get_text("dict").
+    stop_words: palabras que no pueden formar parte de un nombre.
+    """
+    stop_words = {word for word in stop_words if word not in CONNECTORS}
+    blocks = text_lines(page_dict)
+    candidates = _candidates(blocks, stop_words)
+    if not candidates:
+        return None
+
+    height = page_dict.get('height') or 1
+    best, _ = max(candidates, key=lambda c: (
+        round(c[0].size * 2) / 2,
+        -abs((c[0].top + c[0].bottom) / 2 / height - NAME_POSITION),
+    ))
+
+    # Texto normal: ni candidatos ni títulos
+    used = {id(line) for _, run in candidates for line in run}
+    others = [line for lines in blocks for line in lines
+              if id(line) not in used and not _is_title(line.text)]
+    body = _body_size(others) if others else None
+    if body is not None and best.size < body * SIZE_MARGIN:
+        return None
+    words = [word.rstrip(',;:') for word in best.text.split()]
+    return " ".join(words).title()
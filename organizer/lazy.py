@@ -0,0 +1,50 @@
+"""
+Importación diferida de librerías pesadas (PyMuPDF, Pillow, pytesseract...).
+
+lazy_import devuelve el módulo real registrado en sys.modules, pero su código
+solo se ejecuta al acceder al primer atributo (importlib.util.LazyLoader).
+Así abrir la ventana o la ayuda de la línea de comandos no paga los ~300 ms
+de cargar PyMuPDF si todavía no hay ningún archivo que leer.
+"""
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """Como `import name`, pero la carga real ocurre en el primer uso. ImportError si no está instalado."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def optional_import(name):
+    """lazy_import para dependencias opcionales: None si no está instalada."""
+    try:
+        return lazy_import(name)
+    except ImportError:
+        return None
+
+
+def missing_modules(names):
+    """Módulos de `names` que no están instalados (sin importarlos)."""
+    missing = []
+    for name in names:
+        if name in sys.modules:
+            # Ya importado o registrado por lazy_import (que verificó que existe);
+            # find_spec leería su __spec__ y cargaría el módulo diferido
+            continue
+        try:
+            if importlib.util.find_spec(name) is None:
+                missing.append(name)
+        except (ImportError, ValueError):
+            missing.append(name)
+    return missing
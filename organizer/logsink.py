@@ -0,0 +1,64 @@
+"""
+Registro en búfer para la interfaz gráfica.
+
+Los hilos de trabajo solo agregan mensajes a una lista protegida por un lock;
+la ventana los drena en bloque con un temporizador (root.after) y escribe el
+lote completo al archivo de log con una sola llamada. Así el costo por mensaje
+no depende del tamaño del lote ni del contenido del widget.
+
+Los mensajes drenados antes de abrir el archivo (p. ej. la verificación de
+dependencias al iniciar) se guardan y se escriben al abrirlo.
+"""
+import threading
+from collections import deque
+from datetime import datetime
+
+LOG_FILENAME = "organizer.log"
+
+# Mensajes sin archivo que se conservan para el próximo open_file
+EARLY_LINES = 1000
+
+
+class LogBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = []
+        self._early = deque(maxlen=EARLY_LINES)
+        self._file = None
+        self.path = None
+
+    def write(self, message):
+        """Seguro desde cualquier hilo; no toca widgets ni disco."""
+        with self._lock:
+            self._pending.append(message)
+
+    def open_file(self, path):
+        """
+        Agrega el log completo de la sesión a `path` (se crea si no existe),
+        empezando por los mensajes drenados mientras no había archivo.
+        """
+        self.close_file()
+        self._file = open(path, "a", encoding="utf-8")
+        self._file.write(f"=== {datetime.now():%Y-%m-%d %H:%M:%S} ===\n")
+        if self._early:
+            self._file.write("\n".join(self._early) + "\n")
+            self._early.clear()
+        self._file.flush()
+        self.path = path
+
+    def close_file(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+        self.path = None
+
+    def drain(self):
+        """Retorna los mensajes pendientes y los vuelca al archivo de log."""
+        with self._lock:
+            lines, self._pending = self._pending, []
+        if lines and self._file:
+            self._file.write("\n".join(lines) + "\n")
+            self._file.flush()
+        elif lines:
+            self._early.extend(lines)
+        return lines
@@ -0,0 +1,242 @@
+"""
+Plan de ubicación (manifiesto) y su aplicación.
+
+Con `organize --plan RUTA` los archivos se analizan como en una corrida
+normal (en paralelo y con la caché de extracción), pero en el destino no se
+copia nada: cada archivo (o página, al separar) se anota en un manifiesto
+CSV o JSONL con la ruta que tendría en el destino, el año y nombre, cómo se
+obtuvo el texto (method), cómo se encontraron el nombre y el año, y una
+confianza. Así se revisa la clasificación de un archivo grande sin mover
+datos; las filas se pueden corregir a mano (columna target).
+
+apply_manifest hace después solo las operaciones de archivos, sin volver a
+extraer nada: respeta el orden del manifiesto, no sobrescribe (si el destino
+ya está ocupado por otro archivo se usa el siguiente sufijo libre) y omite
+las filas ya aplicadas (el destino tiene el mismo contenido que el origen,
+o el hash del plan si el origen ya se movió), así que se puede repetir tras
+una interrupción.
+"""
+import csv
+import filecmp
+import json
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import file_hash
+from .engine import DEFAULT_PLACEMENT_THREADS
+from .pages import PageWriter
+from .placement import (
+    PLACEMENT_MODES, DestinationIndex, place_file_retrying, placed_message, write_bytes_retrying,
+)
+
+FIELDS = ('source', 'page', 'status', 'target', 'year', 'name', 'confidence', 'method',
+          'name_strategy', 'date_strategy', 'hash')
+
+# place: se ubicaría en target; duplicate: se omite (target es el original);
+# error: no se pudo analizar
+STATUSES = ('place', 'duplicate', 'error')
+
+# high: nombre por palabra clave y fecha explícita ("12 de Enero de 2024", "Enero 2024")
+# medium: nombre por diseño de página
+# low: nombre tomado del archivo o año suelto
+# none: falta el nombre o el año (iría a Desconocido/SinFecha)
+CONFIDENCE_LEVELS = ('high', 'medium', 'low', 'none')
+
+
+def _noop(message):
+    pass
+
+
+def confidence(year, name, name_strategy, date_strategy):
+    if name == "Desconocido" or year == "SinFecha":
+        return 'none'
+    if name_strategy == 'filename' or date_strategy == 'year':
+        return 'low'
+    if name_strategy == 'keyword' and date_strategy in ('date', 'month_year'):
+        return 'high'
+    return 'medium'
+
+
+class ManifestWriter:
+    """
+    Escribe el manifiesto en `path` (.csv, o JSONL con cualquier otra
+    extensión) a medida que llegan los resultados, en orden de entrada.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self.confidence_counts = {}
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._csv = None
+        if path.lower().endswith(".csv"):
+            self._csv = csv.DictWriter(self._file, fieldnames=FIELDS)
+            self._csv.writeheader()
+
+    def add(self, source, status, page=None, target=None, year=None, name=None, method=None,
+            strategies=None, digest=None):
+        """
+        page: índice de página (desde 0) al separar archivos; target: ruta
+        relativa al destino; strategies: (estrategia del nombre, del año);
+        digest: hash SHA-256 del origen, si se calculó (caché o dedup).
+        """
+        name_strategy, date_strategy = strategies or (None, None)
+        level = None
+        if status == 'place':
+            level = confidence(year, name, name_strategy, date_strategy)
+            self.confidence_counts[level] = self.confidence_counts.get(level, 0) + 1
+        row = {
+            'source': os.path.abspath(source),
+            'page': None if page is None else page + 1,
+            'status': status,
+            'target': target.replace(os.sep, '/') if target else None,
+            'year': year, 'name': name, 'confidence': level, 'method': method,
+            'name_strategy': name_strategy, 'date_strategy': date_strategy, 'hash': digest,
+        }
+        if self._csv:
+            self._csv.writerow(row)
+        else:
+            self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self.rows += 1
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+def read_manifest(path):
+    """Filas del manifiesto como dicts (campos vacíos como None, page como int)."""
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for row in rows:
+            row = {key: (None if value == '' else value) for key, value in row.items()}
+            if row.get('page') is not None:
+                row['page'] = int(row['page'])
+            yield row
+
+
+def apply_manifest(path, dest, mode='copy', threads=DEFAULT_PLACEMENT_THREADS, log=_noop):
+    """
+    Ubica en `dest` las filas 'place' del manifiesto con el modo `mode` (ver
+    PLACEMENT_MODES), con `threads` hilos de escritura (0 = uno a uno).
+    Retorna dict con 'placed', 'skipped' (ya ubicados) y 'errors'.
+    """
+    if mode not in PLACEMENT_MODES:
+        raise ValueError(f"Modo de ubicación inválido: {mode}")
+    applier = _Applier(dest, mode, threads, log)
+    try:
+        for row in read_manifest(path):
+            if row['status'] == 'place':
+                applier.apply(row)
+    finally:
+        applier.close()
+    return applier.stats
+
+
+class _Applier:
+    def __init__(self, dest, mode, threads, log):
+        self.dest = dest
+        self.mode = mode
+        self.threads = max(0, threads)
+        self.log = log
+        self.stats = {'placed': 0, 'skipped': 0, 'errors': 0}
+        self._indexes = {}
+        self._pages = PageWriter()
+        self._pool = ThreadPoolExecutor(max_workers=self.threads) if self.threads else None
+        self._pending = deque()
+
+    def apply(self, row):
+        source, page = row['source'], row['page']
+        try:
+            parts = (row['target'] or '').split('/')
+            if len(parts) < 3 or any(part in ('', os.curdir, os.pardir) for part in parts):
+                raise ValueError(f"destino inválido: {row['target']!r}")
+            root = os.path.join(self.dest, *parts[:-3])
+            year, name, filename = parts[-3:]
+            index = self._indexes.get(root)
+            if index is None:
+                index = self._indexes[root] = DestinationIndex(root)
+            # El destino (o, si estaba ocupado por otro archivo, el sufijo que se
+            # usó en una aplicación anterior) puede ser ya esta fila
+            base, ext = os.path.splitext(filename)
+            candidate, counter = filename, 0
+            while index.contains(year, name, candidate):
+                if self._applied(row, os.path.join(root, year, name, candidate)):
+                    self.log(f"  [i] Ya ubicado: {'/'.join(parts[:-1] + [candidate])}")
+                    self.stats['skipped'] += 1
+                    return
+                counter += 1
+                candidate = f"{base}_{counter}{ext}"
+            if candidate != filename:
+                self.log(f"  [!] {row['target']} está ocupado por otro archivo; se usa {candidate}")
+            target = index.reserve(year, name, candidate, create=False)
+            create_dir = index.missing_dir(target)
+            if page is None:
+                work = (place_file_retrying, source, target, self.mode, self.log, create_dir)
+            else:
+                work = (write_bytes_retrying, self._pages.render(source, page - 1), target, create_dir)
+        except Exception as e:
+            self.log(f"  [X] Error ubicando {source}: {e}")
+            self.stats['errors'] += 1
+            return
+        if self._pool is None:
+            self._finish(row, index, year, name, target, *_call(*work))
+            return
+        self._pending.append((row, index, year, name, target, self._pool.submit(_call, *work)))
+        # Como en BatchProcessor: a lo más 2 escrituras en curso por hilo
+        while self._pending and (len(self._pending) > self.threads * 2 or self._pending[0][-1].done()):
+            self._collect()
+
+    def _applied(self, row, target):
+        """True si `target` es el resultado de aplicar esta fila (mismo contenido)."""
+        source, page = row['source'], row['page']
+        try:
+            if page is not None:
+                with open(target, 'rb') as f:
+                    return f.read() == self._pages.render(source, page - 1)
+            if os.path.exists(source):
+                return os.path.samefile(source, target) or filecmp.cmp(source, target, shallow=False)
+            # Movido en una aplicación anterior: solo el hash del plan lo confirma
+            return row.get('hash') is not None and file_hash(target) == row['hash']
+        except Exception:
+            return False
+
+    def _collect(self):
+        row, index, year, name, target, future = self._pending.popleft()
+        self._finish(row, index, year, name, target, *future.result())
+
+    def _finish(self, row, index, year, name, target, used, error):
+        filename = os.path.basename(target)
+        if error is not None:
+            self.log(f"  [X] Error ubicando {row['source']}: {error}")
+            self.stats['errors'] += 1
+            return
+        index.dir_created(target)
+        if row['page'] is None:
+            self.log(f"{placed_message(used, year, name)} ({filename})")
+            self.stats['placed'] += 1
+        else:
+            self.log(f"  -> Página {row['page']} escrita en: {year}/{name}/ ({filename})")
+            self.stats['placed'] += 1
+
+    def close(self):
+        try:
+            while self._pending:
+                self._collect()
+        finally:
+            if self._pool:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pages.close()
+
+
+def _call(func, *args):
+    """(resultado, None) o (None, excepción): los errores se reportan por fila."""
+    try:
+        return func(*args), None
+    except Exception as e:
+        return None, e
@@ -0,0 +1,156 @@
+"""
+Backends de OCR.
+
+- 'tesserocr': usa la API C de Tesseract (paquete opcional tesserocr). Cada
+  proceso mantiene cargado un motor por idioma y le pasa las imágenes en
+  memoria, sin archivos temporales ni procesos nuevos por imagen.
+- 'pytesseract': ejecuta el binario tesseract por cada imagen (comportamiento
+  original; no requiere dependencias extra).
+- 'auto': tesserocr si está instalado, si no pytesseract.
+"""
+import atexit
+import functools
+import os
+
+from . import timing
+from .lazy import lazy_import, optional_import
+
+pytesseract = lazy_import('pytesseract')
+tesserocr = optional_import('tesserocr')
+
+BACKENDS = ('auto', 'tesserocr', 'pytesseract')
+
+
+def _noop(message):
+    pass
+
+
+class LanguageNotAvailable(Exception):
+    """El paquete de idioma pedido no está instalado en Tesseract."""
+
+
+class PytesseractBackend:
+    name = 'pytesseract'
+
+    def image_to_string(self, image, lang):
+        try:
+            return pytesseract.image_to_string(image, lang=lang)
+        except pytesseract.TesseractError as te:
+            if "Failed loading language" in str(te):
+                raise LanguageNotAvailable(lang) from te
+            raise
+
+
+class TesserocrBackend:
+    name = 'tesserocr'
+
+    def __init__(self):
+        if tesserocr is None:
+            raise RuntimeError("tesserocr no está instalado")
+        self._apis = {}
+        atexit.register(self.close)
+
+    def _api(self, lang):
+        api = self._apis.get(lang)
+        if api is None:
+            try:
+                api = tesserocr.PyTessBaseAPI(path=_tessdata_path(), lang=lang)
+            except RuntimeError as e:
+                raise LanguageNotAvailable(lang) from e
+            self._apis[lang] = api
+        return api
+
+    def image_to_string(self, image, lang):
+        api = self._api(lang)
+        api.SetImage(image)
+        return api.GetUTF8Text()
+
+    def close(self):
+        for api in self._apis.values():
+            api.End()
+        self._apis.clear()
+
+
+def _tessdata_path():
+    if os.environ.get("TESSDATA_PREFIX"):
+        return os.environ["TESSDATA_PREFIX"]
+    # Misma instalación que usa pytesseract (ej. C:\Program Files\Tesseract-OCR\tessdata)
+    cmd_dir = os.path.dirname(pytesseract.pytesseract.tesseract_cmd)
+    if cmd_dir and os.path.isdir(os.path.join(cmd_dir, "tessdata")):
+        return os.path.join(cmd_dir, "tessdata")
+    return tesserocr.get_languages()[0]
+
+
+# Un backend por proceso y nombre: los motores de tesserocr quedan cargados
+_backends = {}
+
+
+def get_backend(name='auto'):
+    if name == 'auto':
+        name = 'tesserocr' if tesserocr is not None else 'pytesseract'
+    if name not in _backends:
+        if name == 'tesserocr':
+            _backends[name] = TesserocrBackend()
+        elif name == 'pytesseract':
+            _backends[name] = PytesseractBackend()
+        else:
+            raise ValueError(f"Backend de OCR inválido: {name}")
+    return _backends[name]
+
+
+@functools.lru_cache(maxsize=None)
+def probe_languages(backend='auto'):
+    """
+    Idiomas instalados en Tesseract, consultados una sola vez por proceso.
+    Retorna una tupla, o None si Tesseract no se pudo consultar.
+    """
+    try:
+        if get_backend(backend).name == 'tesserocr':
+            return tuple(tesserocr.get_languages(_tessdata_path())[1])
+        return tuple(pytesseract.get_languages(config=''))
+    except Exception:
+        return None
+
+
+def choose_language(available):
+    """Mejor combinación de idiomas disponible, ej. 'spa+eng'. None si no se sabe."""
+    if available is None:
+        return None
+    preferred = [lang for lang in ('spa', 'eng') if lang in available]
+    if preferred:
+        return "+".join(preferred)
+    others = [lang for lang in available if lang != 'osd']
+    return others[0] if others else None
+
+
+def default_language(backend='auto'):
+    return choose_language(probe_languages(backend))
+
+
+# Idiomas que ya fallaron en este proceso (cuando no se pudo sondear Tesseract)
+_missing_languages = set()
+
+
+def ocr_image(image, log=_noop, backend='auto', lang=None):
+    """
+    OCR con `lang` (ej. 'spa+eng'); si no se indica, se usa el mejor idioma
+    detectado por probe_languages. Si Tesseract no pudo sondearse, se intenta
+    español y, si falta, inglés; el fallo se recuerda para no repetirlo.
+    """
+    engine = get_backend(backend)
+    lang = lang or default_language(backend)
+    if lang is not None:
+        timing.note('ocr_lang', lang)
+        return engine.image_to_string(image, lang)
+
+    if 'spa' not in _missing_languages:
+        try:
+            timing.note('ocr_lang', 'spa')
+            return engine.image_to_string(image, 'spa')
+        except LanguageNotAvailable:
+            _missing_languages.add('spa')
+            log("  [!] Error: Pack de idioma Español ('spa') no instalado en Tesseract.")
+            log("      Se usará 'eng' (Inglés) para el resto de los archivos.")
+    timing.note('ocr_lang', 'eng')
+    timing.note('ocr_fallback', True)
+    return engine.image_to_string(image, 'eng')
@@ -0,0 +1,95 @@
+"""
+Separación de archivos con varias constancias (PDF multipágina, TIFF multicuadro).
+
+En modo por página cada página se analiza por separado (en paralelo, como un
+trabajo más del pool) y se escribe como archivo propio en
+DESTINO/{Año}/{Nombre}/, con el sufijo _p001, _p002... El archivo original no
+se modifica.
+"""
+import io
+import os
+
+from .lazy import lazy_import
+from .placement import safe_dir_name, write_bytes
+
+fitz = lazy_import('fitz')  # PyMuPDF
+Image = lazy_import('PIL.Image')
+
+# Compresiones TIFF que Pillow puede volver a escribir sin cambiar el modo de la imagen
+_TIFF_COMPRESSIONS = ('raw', 'packbits', 'tiff_lzw', 'tiff_deflate', 'tiff_adobe_deflate', 'group4')
+
+
+def _noop(message):
+    pass
+
+
+def page_filename(filename, page_index, total):
+    base, ext = os.path.splitext(filename)
+    width = max(3, len(str(total)))
+    return f"{base}_p{page_index + 1:0{width}d}{ext}"
+
+
+class PageWriter:
+    """
+    Escribe páginas sueltas de un PDF o TIFF. Mantiene abierto el último
+    archivo de origen: las páginas de un mismo archivo llegan seguidas.
+    """
+
+    def __init__(self):
+        self._path = None
+        self._source = None
+
+    def _open(self, path):
+        if path != self._path:
+            self.close()
+            if path.lower().endswith('.pdf'):
+                self._source = fitz.open(path)
+            else:
+                self._source = Image.open(path)
+            self._path = path
+        return self._source
+
+    def write(self, src, page_index, dst):
+        write_bytes(self.render(src, page_index), dst)
+
+    def render(self, src, page_index):
+        """Contenido de la página `page_index` de src como archivo propio (PDF o TIFF)."""
+        source = self._open(src)
+        if isinstance(source, fitz.Document):
+            with fitz.open() as page_doc:
+                page_doc.insert_pdf(source, from_page=page_index, to_page=page_index)
+                return page_doc.tobytes(garbage=3, deflate=True)
+        source.seek(page_index)
+        compression = source.info.get('compression', 'raw')
+        if compression not in _TIFF_COMPRESSIONS or (compression == 'group4' and source.mode != '1'):
+            compression = 'tiff_deflate'
+        buffer = io.BytesIO()
+        source.save(buffer, format='TIFF', compression=compression)
+        return buffer.getvalue()
+
+    def close(self):
+        if self._source is not None:
+            self._source.close()
+        self._path = None
+        self._source = None
+
+
+def place_page(filepath, page, dest_root, year, name, index, writer, log=_noop, on_target=None):
+    """
+    Escribe la página `page` (índice, total) de filepath en
+    dest_root/{year}/{name}/ sin sobrescribir. Retorna la ruta final.
+    on_target: como en move_file.
+    """
+    page_index, total = page
+    filename = page_filename(os.path.basename(filepath), page_index, total)
+    target_path = index.reserve(str(year), safe_dir_name(name), filename)
+    if on_target:
+        on_target(target_path)
+    writer.write(filepath, page_index, target_path)
+    log(page_message(page, year, name))
+    return target_path
+
+
+def page_message(page, year, name):
+    page_index, total = page
+    return f"  -> Página {page_index + 1}/{total} escrita en: {year}/{safe_dir_name(name)}/"
@@ -0,0 +1,397 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import shutil
+import sys
+import time
+import uuid
+
+# Cómo se coloca el archivo en el destino:
+# - 'copy': copia completa (shutil.copy2), el origen queda intacto.
+# - 'move': renombrado en el mismo volumen (sin copiar datos ni sobrescribir);
+#   entre volúmenes se copia y se borra el original.
+# - 'hardlink': enlace duro (mismo volumen); el archivo ocupa espacio una vez.
+# - 'reflink': clon copy-on-write (Btrfs, XFS, APFS...); copia independiente
+#   sin duplicar bloques.
+# Si 'hardlink' o 'reflink' no son posibles, se copia.
+PLACEMENT_MODES = ('copy', 'move', 'hardlink', 'reflink')
+
+_MESSAGES = {
+    'copy': "Copiado a",
+    'move': "Movido a",
+    'hardlink': "Enlazado a",
+    'reflink': "Clonado a",
+}
+
+# ioctl FICLONE de Linux (_IOW(0x94, 9, int))
+_FICLONE = 0x40049409
+
+# Renombrado sin sobrescribir: renameat2 (Linux) y renamex_np (macOS)
+_AT_FDCWD = -100
+_RENAME_NOREPLACE = 1
+_RENAME_EXCL = 0x4
+_libc_handle = None
+
+# Sufijo de los temporales de cada escritura (.{archivo}.{id}.part), ver _write_atomic
+PARTIAL_SUFFIX = ".part"
+
+# Modos que ya avisaron que no están disponibles (se avisa una vez por proceso)
+_fallback_logged = set()
+
+# Reintentos ante errores de E/S transitorios (p. ej. un destino en un recurso
+# compartido SMB); la espera se duplica en cada intento
+PLACE_RETRIES = 3
+RETRY_DELAY = 0.5
+
+# Copias con bloques grandes: menos viajes de ida y vuelta en recursos de red.
+# Linux (sendfile), macOS (fcopyfile) y Windows con Python 3.12+ (CopyFile2)
+# ya copian dentro del sistema operativo con shutil.copy2.
+COPY_BUFFER_SIZE = 8 * 1024 * 1024
+_NATIVE_COPY = (sys.platform.startswith('linux') or sys.platform == 'darwin'
+                or (sys.platform.startswith('win') and sys.version_info >= (3, 12)))
+
+
+def _noop(message):
+    pass
+
+
+def safe_dir_name(name):
+    # Sanitize directory name
+    safe_name = "".join([c for c in name if c.isalpha() or c in (' ', '-', '_')]).strip()
+    if not safe_name:
+        safe_name = "SinNombre"
+    return safe_name
+
+
+def move_file(filepath, dest_root, year, name, log=_noop, mode='copy', index=None,
+              on_target=None):
+    """
+    Coloca el archivo en dest_root/{year}/{name}/ sin sobrescribir, según
+    `mode` (ver PLACEMENT_MODES). Retorna la ruta final del archivo.
+    Con `index` (DestinationIndex de dest_root) no se consulta el disco para
+    elegir el nombre libre ni para crear carpetas ya conocidas.
+    on_target: se llama con la ruta elegida antes de escribirla (bitácora).
+    """
+    if mode not in PLACEMENT_MODES:
+        raise ValueError(f"Modo de ubicación inválido: {mode}")
+    target_path = reserve_target(os.path.basename(filepath), dest_root, year, name, index)
+    if on_target:
+        on_target(target_path)
+    used = place_file(filepath, target_path, mode, log)
+    log(placed_message(used, year, name))
+    return target_path
+
+
+def reserve_target(filename, dest_root, year, name, index=None, create=True):
+    """
+    Ruta libre para `filename` en dest_root/{year}/{name}/. Con `index` no se
+    consulta el disco; con create=False tampoco se crea la carpeta (la crea
+    quien escribe el archivo, ver place_file_retrying).
+    """
+    safe_name = safe_dir_name(name)
+    if index is not None:
+        return index.reserve(str(year), safe_name, filename, create)
+
+    target_dir = os.path.join(dest_root, str(year), safe_name)
+    os.makedirs(target_dir, exist_ok=True)
+    target_path = os.path.join(target_dir, filename)
+
+    # Avoid overwriting
+    counter = 1
+    base, ext = os.path.splitext(filename)
+    while os.path.exists(target_path):
+        target_path = os.path.join(target_dir, f"{base}_{counter}{ext}")
+        counter += 1
+    return target_path
+
+
+def placed_message(mode, year, name):
+    """Línea de log tras ubicar un archivo con `mode` (el realmente usado)."""
+    return f"  -> {_MESSAGES[mode]}: {year}/{safe_dir_name(name)}/"
+
+
+class DestinationIndex:
+    """
+    Índice en memoria de los archivos en dest_root/{Año}/{Nombre}/.
+
+    Se construye con un solo recorrido os.scandir la primera vez que se usa y
+    luego resuelve cada ubicación sin llamadas al disco: conoce los nombres
+    ocupados de cada carpeta, recuerda el siguiente sufijo libre por nombre
+    base (cert_1, cert_2...) y crea cada carpeta una sola vez. Solo ve los
+    cambios que hace este proceso: si un nombre reservado aparece ocupado
+    (place_file no sobrescribe y lanza FileExistsError) hay que descartarlo y
+    crear uno nuevo. Con reserve(create=False) la carpeta nueva la crea quien
+    escribe: missing_dir dice si hace falta y dir_created lo anota.
+    """
+
+    def __init__(self, dest_root):
+        self.dest_root = dest_root
+        self._dirs = None  # (año, nombre) -> nombres de archivo ocupados (normcase)
+        self._next_suffix = {}  # (año, nombre, base, ext) -> siguiente contador a probar
+        self._uncreated = set()  # carpetas reservadas con create=False aún sin crear (normcase)
+
+    def _load(self):
+        self._dirs = {}
+        for year in _subdirs(self.dest_root):
+            for name in _subdirs(year.path):
+                with os.scandir(name.path) as entries:
+                    self._dirs[self._key(year.name, name.name)] = {
+                        os.path.normcase(entry.name) for entry in entries
+                    }
+
+    @staticmethod
+    def _key(year, safe_name):
+        return os.path.normcase(year), os.path.normcase(safe_name)
+
+    def reserve(self, year, safe_name, filename, create=True):
+        """
+        Retorna una ruta libre para `filename` en {year}/{safe_name}/ y la marca
+        como ocupada. create=False: no crear la carpeta si es nueva.
+        """
+        if self._dirs is None:
+            self._load()
+        key = self._key(year, safe_name)
+        target_dir = os.path.join(self.dest_root, year, safe_name)
+        names = self._dirs.get(key)
+        if names is None:
+            if create:
+                os.makedirs(target_dir, exist_ok=True)
+            else:
+                self._uncreated.add(os.path.normcase(target_dir))
+            names = self._dirs[key] = set()
+
+        candidate = filename
+        if os.path.normcase(candidate) in names:
+            base, ext = os.path.splitext(filename)
+            suffix_key = key + (os.path.normcase(base), os.path.normcase(ext))
+            counter = self._next_suffix.get(suffix_key, 1)
+            while os.path.normcase(f"{base}_{counter}{ext}") in names:
+                counter += 1
+            candidate = f"{base}_{counter}{ext}"
+            self._next_suffix[suffix_key] = counter + 1
+        names.add(os.path.normcase(candidate))
+        return os.path.join(target_dir, candidate)
+
+    def contains(self, year, safe_name, filename):
+        """True si `filename` ya existe (o está reservado) en {year}/{safe_name}/."""
+        if self._dirs is None:
+            self._load()
+        return os.path.normcase(filename) in self._dirs.get(self._key(year, safe_name), ())
+
+    def missing_dir(self, target):
+        """True si la carpeta de `target` (reservada con create=False) puede no existir aún."""
+        return os.path.normcase(os.path.dirname(target)) in self._uncreated
+
+    def dir_created(self, target):
+        """Anota que ya se escribió un archivo en la carpeta de `target`."""
+        self._uncreated.discard(os.path.normcase(os.path.dirname(target)))
+
+
+def _subdirs(path):
+    try:
+        with os.scandir(path) as entries:
+            return [entry for entry in entries if entry.is_dir()]
+    except FileNotFoundError:
+        return []
+
+
+def place_file(src, dst, mode='copy', log=_noop):
+    """
+    Crea `dst` a partir de `src` con el modo pedido, sin sobrescribir
+    (FileExistsError si `dst` ya existe). Los datos se escriben en un
+    temporal propio que se renombra a `dst` al terminar: un archivo con el
+    nombre final siempre está completo.
+    Retorna el modo realmente usado ('copy' si hubo que recurrir a copiar).
+    """
+    if mode == 'move':
+        try:
+            rename_noreplace(src, dst)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            # Otro volumen: copiar y luego borrar el original
+            _write_atomic(dst, lambda tmp: copy_file(src, tmp))
+            os.remove(src)
+        return 'move'
+
+    if mode in ('hardlink', 'reflink'):
+        try:
+            if mode == 'hardlink':
+                os.link(src, dst)
+            else:
+                _write_atomic(dst, lambda tmp: _reflink(src, tmp))
+            return mode
+        except FileExistsError:
+            raise
+        except OSError as e:
+            if mode not in _fallback_logged:
+                _fallback_logged.add(mode)
+                log(f"  [i] '{mode}' no disponible ({e.strerror or e}); se copiarán los archivos.")
+
+    _write_atomic(dst, lambda tmp: copy_file(src, tmp))
+    return 'copy'
+
+
+def copy_file(src, dst):
+    """Como shutil.copy2 (datos y metadatos), con bloques de COPY_BUFFER_SIZE si el sistema no copia por su cuenta."""
+    if _NATIVE_COPY:
+        shutil.copy2(src, dst)
+        return
+    with open(src, 'rb') as source, open(dst, 'wb') as target:
+        shutil.copyfileobj(source, target, COPY_BUFFER_SIZE)
+    shutil.copystat(src, dst)
+
+
+def write_bytes(data, dst):
+    """Escribe `data` en `dst` (nuevo) a través de un temporal, sin sobrescribir."""
+    def write(tmp):
+        with open(tmp, 'wb') as f:
+            f.write(data)
+
+    _write_atomic(dst, write)
+
+
+def place_file_retrying(src, dst, mode='copy', log=_noop, create_dir=True,
+                        retries=PLACE_RETRIES, delay=RETRY_DELAY):
+    """
+    place_file para la etapa de ubicación asíncrona: reintenta ante errores
+    de E/S. create_dir: crear antes la carpeta de `dst` (solo si es nueva, ver
+    DestinationIndex.missing_dir: en un recurso de red cada makedirs son
+    varias idas y vueltas).
+    """
+    def action():
+        if create_dir:
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+        return place_file(src, dst, mode, log)
+
+    return _retrying(action, src, retries, delay)
+
+
+def write_bytes_retrying(data, dst, create_dir=True, retries=PLACE_RETRIES, delay=RETRY_DELAY):
+    """write_bytes con reintentos; create_dir como en place_file_retrying."""
+    def action():
+        if create_dir:
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+        write_bytes(data, dst)
+
+    return _retrying(action, None, retries, delay)
+
+
+def _retrying(action, src, retries, delay):
+    # Cada intento borra solo su propio temporal (ver _write_atomic); dst nunca se toca
+    for attempt in range(retries + 1):
+        try:
+            return action()
+        except FileExistsError:
+            # Conflicto de nombre: reintentar no cambia nada
+            raise
+        except OSError:
+            source_gone = src is not None and not os.path.exists(src)
+            if attempt == retries or source_gone:
+                # Sin origen no hay nada que reintentar (o ya se movió completo a dst)
+                raise
+            time.sleep(delay * 2 ** attempt)
+
+
+def partial_paths(dst):
+    """Temporales que dejaron escrituras interrumpidas hacia `dst`."""
+    directory, filename = os.path.split(dst)
+    prefix = f".{filename}."
+    try:
+        with os.scandir(directory or os.curdir) as entries:
+            return [entry.path for entry in entries
+                    if entry.name.startswith(prefix) and entry.name.endswith(PARTIAL_SUFFIX)]
+    except FileNotFoundError:
+        return []
+
+
+def _write_atomic(dst, write):
+    """write(tmp) crea un temporal junto a dst que luego se renombra a dst sin sobrescribir."""
+    directory, filename = os.path.split(dst)
+    tmp = os.path.join(directory, f".{filename}.{uuid.uuid4().hex[:12]}{PARTIAL_SUFFIX}")
+    try:
+        write(tmp)
+        rename_noreplace(tmp, dst)
+    except BaseException:
+        if os.path.lexists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def rename_noreplace(src, dst):
+    """
+    Renombra src a dst de forma atómica; FileExistsError si dst existe (a
+    diferencia de os.replace, que lo sobrescribiría).
+    """
+    if sys.platform.startswith('win'):
+        os.rename(src, dst)  # En Windows nunca sobrescribe
+        return
+    if _rename_exclusive(src, dst):
+        return
+    try:
+        # Sistemas sin renombrado exclusivo: un enlace duro tampoco sobrescribe
+        os.link(src, dst)
+    except FileExistsError:
+        raise
+    except OSError as e:
+        if e.errno == errno.EXDEV:
+            raise
+        # Sin enlaces (p. ej. algunos recursos SMB/FAT): mejor esfuerzo
+        if os.path.lexists(dst):
+            raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), dst)
+        os.rename(src, dst)
+        return
+    os.remove(src)
+
+
+def _rename_exclusive(src, dst):
+    """renameat2(RENAME_NOREPLACE) / renamex_np(RENAME_EXCL); False si el sistema no lo soporta."""
+    libc = _libc()
+    if libc is None:
+        return False
+    if sys.platform.startswith('linux') and hasattr(libc, 'renameat2'):
+        result = libc.renameat2(_AT_FDCWD, os.fsencode(src), _AT_FDCWD, os.fsencode(dst),
+                                _RENAME_NOREPLACE)
+    elif sys.platform == 'darwin' and hasattr(libc, 'renamex_np'):
+        result = libc.renamex_np(os.fsencode(src), os.fsencode(dst), _RENAME_EXCL)
+    else:
+        return False
+    if result == 0:
+        return True
+    code = ctypes.get_errno()
+    if code in (errno.ENOSYS, errno.EINVAL, errno.ENOTSUP, errno.EOPNOTSUPP):
+        return False
+    if code == errno.EEXIST:
+        raise FileExistsError(code, os.strerror(code), dst)
+    raise OSError(code, os.strerror(code), dst)
+
+
+def _libc():
+    global _libc_handle
+    if _libc_handle is None:
+        path = ctypes.util.find_library('c')
+        _libc_handle = ctypes.CDLL(path, use_errno=True) if path else False
+    return _libc_handle or None
+
+
+def _reflink(src, dst):
+    """Clon copy-on-write de src en dst (nuevo); OSError si el sistema no lo soporta."""
+    if sys.platform.startswith('linux'):
+        import fcntl
+
+        with open(src, 'rb') as source, open(dst, 'xb') as target:
+            try:
+                fcntl.ioctl(target.fileno(), _FICLONE, source.fileno())
+            except OSError:
+                target.close()
+                os.remove(dst)
+                raise
+    elif sys.platform == 'darwin':
+        libc = _libc()
+        if libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) != 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code))
+    else:
+        raise OSError(errno.EOPNOTSUPP, os.strerror(errno.EOPNOTSUPP))
+    shutil.copystat(src, dst)
@@ -0,0 +1,319 @@
+"""
+Rasterizado y preprocesado de páginas antes del OCR.
+
+Por defecto las páginas de PDF se renderizan directamente con PyMuPDF
+(get_pixmap) en escala de grises, sin pasar por Poppler ni archivos
+temporales. Se puede recortar una región de interés (fracciones de la
+página) para que Tesseract procese una imagen más pequeña.
+
+Antes de renderizar, pdf_ocr_image clasifica la página (classify_page): si
+solo tiene texto no hace falta OCR, y si es el escaneo de una sola imagen se
+le pasa a Tesseract esa imagen tal como está incrustada.
+
+Ninguna imagen que llega al OCR supera `max_pixels`: los PDF se renderizan a
+un DPI menor si la página es muy grande (pósteres, A3 a 600 DPI...) y los
+JPEG se decodifican directamente a 1/2, 1/4 u 1/8 del tamaño (Image.draft)
+antes de reducirlos, sin cargar nunca la imagen completa en memoria.
+"""
+import io
+import math
+import os
+
+from .lazy import lazy_import
+
+fitz = lazy_import('fitz')  # PyMuPDF
+Image = lazy_import('PIL.Image')
+pdf2image = lazy_import('pdf2image')
+
+RENDERERS = ('pymupdf', 'poppler')
+COLOR_MODES = ('rgb', 'gray', 'binary')
+
+# 16 MP: una página A4 a ~400 DPI; suficiente para el OCR de una constancia
+DEFAULT_MAX_PIXELS = 16_000_000
+
+# Página que se cobra por PDF en estimate_image_bytes (puntos: ancho de carta, alto de A4)
+NOMINAL_PAGE_PT = (612, 842)
+
+# classify_page: una imagen que cubre esta fracción de la página es un escaneo,
+# y desde GLYPH_PATHS trazos del tamaño de una letra puede haber texto en curvas
+PAGE_KINDS = ('text', 'empty', 'image', 'render')
+SCAN_COVERAGE = 0.9
+GLYPH_PATHS = 5
+
+
+class RasterSettings:
+    """
+    dpi: resolución de render de páginas PDF.
+    mode: 'rgb', 'gray' o 'binary' (umbral fijo `threshold`).
+    region: (izq, arriba, der, abajo) en fracciones 0-1 de la página, o None.
+    renderer: 'pymupdf' (directo) o 'poppler' (pdf2image, comportamiento anterior).
+    max_pixels: tamaño máximo (ancho x alto) de la imagen que llega al OCR; None = sin límite.
+    """
+
+    def __init__(self, dpi=200, mode='gray', region=None, renderer='pymupdf', threshold=160,
+                 max_pixels=DEFAULT_MAX_PIXELS):
+        if mode not in COLOR_MODES:
+            raise ValueError(f"Modo de color inválido: {mode}")
+        if renderer not in RENDERERS:
+            raise ValueError(f"Renderizador inválido: {renderer}")
+        if region is not None:
+            region = tuple(float(v) for v in region)
+            left, top, right, bottom = region
+            if not (0 <= left < right <= 1 and 0 <= top < bottom <= 1):
+                raise ValueError(f"Región inválida: {region}")
+        self.dpi = int(dpi)
+        self.mode = mode
+        self.region = region
+        self.renderer = renderer
+        self.threshold = int(threshold)
+        if max_pixels is not None and max_pixels <= 0:
+            raise ValueError(f"Máximo de píxeles inválido: {max_pixels}")
+        self.max_pixels = int(max_pixels) if max_pixels else None
+
+    def key(self):
+        """Identificador estable de la configuración (forma parte de la clave de caché)."""
+        region = ",".join(f"{v:g}" for v in self.region) if self.region else "full"
+        threshold = f"@{self.threshold}" if self.mode == 'binary' else ""
+        return f"{self.renderer}:{self.dpi}:{self.mode}{threshold}:{region}:max{self.max_pixels or 0}"
+
+    @property
+    def bands(self):
+        return 3 if self.mode == 'rgb' else 1
+
+    def pixel_limit(self):
+        """Píxeles permitidos para la página/imagen completa, antes de recortar la región."""
+        if not self.max_pixels:
+            return None
+        if not self.region:
+            return self.max_pixels
+        left, top, right, bottom = self.region
+        return self.max_pixels / ((right - left) * (bottom - top))
+
+
+def parse_region(value):
+    """Convierte 'izq,arriba,der,abajo' (fracciones) en tupla para RasterSettings."""
+    parts = [p for p in value.split(",") if p.strip()]
+    if len(parts) != 4:
+        raise ValueError("La región debe tener 4 valores: izq,arriba,der,abajo")
+    return tuple(float(p) for p in parts)
+
+
+def render_pdf_page(file_path, settings, page_index=0):
+    """Renderiza una página de PDF lista para OCR. Retorna una imagen PIL o None."""
+    if settings.renderer == 'poppler':
+        with fitz.open(file_path) as doc:
+            if page_index >= doc.page_count:
+                return None
+            rect = doc[page_index].rect
+        images = pdf2image.convert_from_path(
+            file_path, dpi=capped_dpi(rect.width, rect.height, settings),
+            first_page=page_index + 1, last_page=page_index + 1,
+            grayscale=settings.mode != 'rgb',
+        )
+        return prepare_image(images[0], settings) if images else None
+
+    with fitz.open(file_path) as doc:
+        if page_index >= doc.page_count:
+            return None
+        return _render_page(doc[page_index], settings)
+
+
+def _render_page(page, settings):
+    dpi = capped_dpi(page.rect.width, page.rect.height, settings)
+    clip = None
+    if settings.region:
+        # Recortar en el render: solo se rasteriza la región de interés
+        left, top, right, bottom = settings.region
+        rect = page.rect
+        clip = fitz.Rect(
+            rect.x0 + rect.width * left, rect.y0 + rect.height * top,
+            rect.x0 + rect.width * right, rect.y0 + rect.height * bottom,
+        )
+    colorspace = fitz.csRGB if settings.mode == 'rgb' else fitz.csGRAY
+    pix = page.get_pixmap(dpi=dpi, colorspace=colorspace, clip=clip, alpha=False)
+    pil_mode = "RGB" if settings.mode == 'rgb' else "L"
+    image = Image.frombytes(pil_mode, (pix.width, pix.height), pix.samples)
+    del pix
+
+    if settings.mode == 'binary':
+        image = _binarize(image, settings.threshold)
+    return image
+
+
+def classify_page(page):
+    """
+    Decide cómo leer una página de PDF con poco texto nativo. Retorna (tipo, xref):
+    - 'text': solo texto nativo (y trazos decorativos); un OCR leería lo mismo.
+    - 'empty': página en blanco, no hay nada que leer.
+    - 'image': escaneo de una sola imagen recta que cubre la página, sin texto
+      nativo; xref es la imagen, que se pasa a Tesseract sin volver a renderizar.
+    - 'render': lo demás (varias imágenes, texto convertido en curvas, texto
+      nativo sobre una imagen de fondo, que la imagen sola no contiene...).
+    """
+    images = page.get_image_info(xrefs=True)
+    if not images:
+        if _glyph_like_paths(page) >= GLYPH_PATHS:
+            return 'render', None
+        return ('text' if page.get_text().strip() else 'empty'), None
+    if len(images) == 1 and not page.rotation:
+        info = images[0]
+        a, b, c, d, _, _ = info['transform']
+        upright = a > 0 and d > 0 and abs(b) < 1e-3 and abs(c) < 1e-3
+        if (upright and info['xref'] and _coverage(info['bbox'], page.rect) >= SCAN_COVERAGE
+                and not page.get_text().strip()):
+            return 'image', info['xref']
+    return 'render', None
+
+
+def _glyph_like_paths(page):
+    """Trazos rellenos del tamaño de una letra: texto convertido a curvas (o adornos)."""
+    count = 0
+    for path in page.get_drawings():
+        rect = path['rect']
+        if 'f' in path['type'] and 0 < rect.width < 72 and 0 < rect.height < 72:
+            count += 1
+            if count >= GLYPH_PATHS:
+                break
+    return count
+
+
+def _coverage(bbox, page_rect):
+    rect = fitz.Rect(bbox) & page_rect
+    if rect.is_empty or page_rect.is_empty:
+        return 0.0
+    return rect.width * rect.height / (page_rect.width * page_rect.height)
+
+
+def pdf_ocr_image(file_path, settings, page_index=0):
+    """
+    Imagen para el OCR de una página de PDF según classify_page.
+    Retorna (tipo, imagen PIL o None); la imagen es None si no hace falta OCR
+    ('text', 'empty') o la página no existe (tipo None).
+    """
+    with fitz.open(file_path) as doc:
+        if page_index >= doc.page_count:
+            return None, None
+        page = doc[page_index]
+        try:
+            kind, xref = classify_page(page)
+        except Exception:
+            kind, xref = 'render', None
+        if kind == 'image':
+            image = _embedded_image(doc, xref, settings)
+            if image is not None:
+                return kind, image
+            kind = 'render'
+        if kind != 'render':
+            return kind, None
+        if settings.renderer == 'pymupdf':
+            return kind, _render_page(page, settings)
+    return kind, render_pdf_page(file_path, settings, page_index)
+
+
+def _embedded_image(doc, xref, settings):
+    """La imagen incrustada `xref` preparada para OCR, o None si conviene renderizar."""
+    data = doc.extract_image(xref)
+    if not data or data.get('smask'):
+        # Con máscara de transparencia la imagen sola no es lo que se ve
+        return None
+    limit = settings.pixel_limit()
+    if data['ext'] != 'jpeg' and limit and data['width'] * data['height'] > limit:
+        # Solo un JPEG se puede decodificar ya reducido; el render respeta max_pixels
+        return None
+    try:
+        return prepare_image(Image.open(io.BytesIO(data['image'])), settings)
+    except Exception:
+        return None
+
+
+def capped_dpi(width_pt, height_pt, settings):
+    """DPI de render para una página de width_pt x height_pt puntos sin pasar de max_pixels."""
+    limit = settings.pixel_limit()
+    pixels = (width_pt * settings.dpi / 72) * (height_pt * settings.dpi / 72)
+    if not limit or pixels <= limit:
+        return settings.dpi
+    return max(1, int(settings.dpi * math.sqrt(limit / pixels)))
+
+
+def prepare_image(image, settings):
+    """
+    Aplica límite de tamaño, región, escala de grises y binarizado a una
+    imagen abierta con Image.open (mejor si aún no se decodificó: los JPEG se
+    decodifican ya reducidos).
+    """
+    image = _downscale(image, settings)
+    if settings.region:
+        left, top, right, bottom = settings.region
+        width, height = image.size
+        image = image.crop((
+            int(width * left), int(height * top), int(width * right), int(height * bottom),
+        ))
+    if settings.mode == 'rgb':
+        return image.convert("RGB") if image.mode not in ("RGB", "L") else image
+    image = image.convert("L")
+    if settings.mode == 'binary':
+        image = _binarize(image, settings.threshold)
+    return image
+
+
+def _binarize(image, threshold):
+    return image.point(lambda p: 255 if p > threshold else 0)
+
+
+def _draft(image, settings, limit):
+    """Pide al decodificador JPEG una escala reducida; no lee los píxeles."""
+    width, height = image.size
+    if image.format != 'JPEG' or width * height <= limit:
+        return
+    scale = math.sqrt(limit / (width * height))
+    image.draft("RGB" if settings.mode == 'rgb' else "L",
+                (math.ceil(width * scale), math.ceil(height * scale)))
+
+
+def _downscale(image, settings):
+    limit = settings.pixel_limit()
+    if not limit:
+        return image
+    _draft(image, settings, limit)
+    width, height = image.size
+    if width * height <= limit:
+        return image
+    if image.mode in ('1', 'P'):
+        image = image.convert("RGB" if settings.mode == 'rgb' else "L")
+    # reduce promedia bloques enteros: rápido y adecuado para OCR
+    return image.reduce(math.ceil(math.sqrt(width * height / limit)))
+
+
+def estimate_image_bytes(file_path, settings, page_index=0):
+    """
+    Memoria aproximada (bytes) de las imágenes que genera el OCR de un
+    archivo. Se llama en el hilo que envía trabajos, así que no abre los PDF
+    (la mayoría tiene texto nativo y ni se rasteriza): se cobra el render de
+    una página NOMINAL_PAGE_PT con la configuración. En las imágenes, que
+    siempre pasan por OCR, se lee solo el encabezado: imagen decodificada más
+    la preparada. 0 si no se puede abrir.
+
+    Limitación: una página de PDF más grande (un póster) se renderiza hasta
+    pixel_limit(), así que puede ocupar hasta pixel_limit() / píxeles de la
+    página nominal veces lo cobrado (~4 con 16 MP a 200 DPI); para acotar
+    esos archivos hay que bajar max_pixels.
+    """
+    if os.path.splitext(file_path)[1].lower() == '.pdf':
+        width, height = NOMINAL_PAGE_PT
+        dpi = capped_dpi(width, height, settings)
+        pixels = (width * dpi / 72) * (height * dpi / 72)
+        # pixmap de PyMuPDF + copia en PIL
+        return int(2 * pixels * settings.bands)
+    try:
+        with Image.open(file_path) as image:
+            if page_index:
+                image.seek(page_index)
+            limit = settings.pixel_limit()
+            if limit:
+                _draft(image, settings, limit)
+            width, height = image.size
+            decoded = width * height * len(image.getbands())
+            output = width * height if not limit else min(width * height, limit)
+            return int(decoded + output * settings.bands)
+    except Exception:
+        return 0
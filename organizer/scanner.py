@@ -0,0 +1,192 @@
+"""
+Búsqueda de archivos de origen.
+
+scan_source recorre la carpeta de origen con os.scandir y entrega las rutas
+a medida que las encuentra (generador), así el pipeline empieza a procesar
+sin esperar el listado completo. El orden es determinista: dentro de cada
+carpeta, primero sus archivos y luego sus subcarpetas, ambos por nombre.
+"""
+import fnmatch
+import os
+from datetime import datetime
+
+from .extraction import VALID_EXTENSIONS
+
+# 'skip': ignorar enlaces simbólicos; 'files': seguir enlaces a archivos
+# (comportamiento de os.listdir); 'follow': seguir también enlaces a carpetas
+SYMLINK_POLICIES = ('skip', 'files', 'follow')
+
+
+def _noop(message):
+    pass
+
+
+class ScanOptions:
+    """
+    include / exclude: patrones glob. Si el patrón contiene '/', se compara con
+    la ruta relativa al origen (ej. 'compras/*'); si no, con el nombre
+    (ej. '*.pdf', 'borrador*'). exclude también poda carpetas completas.
+    max_depth: niveles de subcarpetas a recorrer (0 = solo el origen, None = todos).
+    min_size / max_size: límites en bytes.
+    newer_than / older_than: fecha de modificación (timestamp) mínima / máxima.
+    symlinks: política de enlaces simbólicos (ver SYMLINK_POLICIES).
+    """
+
+    def __init__(self, include=(), exclude=(), max_depth=0, min_size=None, max_size=None,
+                 newer_than=None, older_than=None, symlinks='files'):
+        if symlinks not in SYMLINK_POLICIES:
+            raise ValueError(f"Política de enlaces inválida: {symlinks}")
+        if max_depth is not None and max_depth < 0:
+            raise ValueError(f"Profundidad inválida: {max_depth}")
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.max_depth = max_depth
+        self.min_size = min_size
+        self.max_size = max_size
+        self.newer_than = newer_than
+        self.older_than = older_than
+        self.symlinks = symlinks
+
+    @property
+    def needs_stat(self):
+        return any(v is not None for v in (self.min_size, self.max_size, self.newer_than, self.older_than))
+
+
+def _matches(patterns, name, rel_path):
+    return any(fnmatch.fnmatch(rel_path if '/' in p else name, p) for p in patterns)
+
+
+def _norm(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+def scan_source(source, options=None, exclude_dirs=(), log=_noop):
+    """
+    Genera las rutas de los archivos soportados bajo `source` que pasan los
+    filtros de `options`. Las carpetas en exclude_dirs (p. ej. el destino, si
+    está dentro del origen) no se recorren.
+    """
+    options = options or ScanOptions()
+    skip = {_norm(d) for d in exclude_dirs}
+    follow = options.symlinks == 'follow'
+    if follow:
+        skip |= {os.path.normcase(os.path.realpath(d)) for d in exclude_dirs}
+    visited = set()
+    stack = [(source, "", 0)]
+
+    while stack:
+        path, rel, depth = stack.pop()
+        if follow:
+            # Evitar ciclos de enlaces a carpetas
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if (st.st_dev, st.st_ino) in visited:
+                continue
+            visited.add((st.st_dev, st.st_ino))
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError as e:
+            log(f"  [!] No se pudo leer la carpeta {path}: {e}")
+            continue
+
+        subdirs = []
+        for entry in entries:
+            rel_path = rel + entry.name
+            try:
+                is_link = entry.is_symlink()
+                if is_link and options.symlinks == 'skip':
+                    continue
+                if entry.is_dir():
+                    if is_link and not follow:
+                        continue
+                    if options.max_depth is not None and depth >= options.max_depth:
+                        continue
+                    if _matches(options.exclude, entry.name, rel_path):
+                        continue
+                    if _norm(entry.path) in skip or (follow and os.path.normcase(os.path.realpath(entry.path)) in skip):
+                        continue
+                    subdirs.append((entry.path, rel_path + "/", depth + 1))
+                elif entry.is_file() and _accept_file(entry.name, rel_path, options, entry.stat):
+                    yield entry.path
+            except OSError as e:
+                # Enlace roto, permisos, archivo borrado durante el recorrido...
+                log(f"  [!] No se pudo leer {entry.path}: {e}")
+        stack.extend(reversed(subdirs))
+
+
+def accepts_path(source, path, options=None, exclude_dirs=()):
+    """
+    True si scan_source(source, options, exclude_dirs) entregaría el archivo
+    `path` (profundidad, carpetas excluidas y filtros), sin recorrer el origen.
+    Lo usa organizer.watch para filtrar los eventos de archivos nuevos.
+    """
+    options = options or ScanOptions()
+    rel_path = os.path.relpath(path, source).replace(os.sep, '/')
+    parts = rel_path.split('/')
+    if parts[0] == os.pardir:
+        return False
+    if options.max_depth is not None and len(parts) - 1 > options.max_depth:
+        return False
+    skip = {_norm(d) for d in exclude_dirs}
+    folder, rel = source, ""
+    for part in parts[:-1]:
+        folder = os.path.join(folder, part)
+        rel += part
+        if (_matches(options.exclude, part, rel) or _norm(folder) in skip
+                or (options.symlinks != 'follow' and os.path.islink(folder))):
+            return False
+        rel += "/"
+    try:
+        if options.symlinks == 'skip' and os.path.islink(path):
+            return False
+        return os.path.isfile(path) and _accept_file(parts[-1], rel_path, options, lambda: os.stat(path))
+    except OSError:
+        return False
+
+
+def _accept_file(name, rel_path, options, stat):
+    if not name.lower().endswith(VALID_EXTENSIONS):
+        return False
+    if options.include and not _matches(options.include, name, rel_path):
+        return False
+    if _matches(options.exclude, name, rel_path):
+        return False
+    if not options.needs_stat:
+        return True
+    st = stat()
+    if options.min_size is not None and st.st_size < options.min_size:
+        return False
+    if options.max_size is not None and st.st_size > options.max_size:
+        return False
+    if options.newer_than is not None and st.st_mtime < options.newer_than:
+        return False
+    if options.older_than is not None and st.st_mtime > options.older_than:
+        return False
+    return True
+
+
+def parse_size(value):
+    """'500', '200K', '10M', '1G' -> bytes."""
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    text = value.strip().upper().rstrip('B')
+    factor = units.get(text[-1:], 1)
+    if factor != 1:
+        text = text[:-1]
+    try:
+        size = float(text) * factor
+    except ValueError:
+        raise ValueError(f"Tamaño inválido: {value}")
+    if size < 0:
+        raise ValueError(f"Tamaño inválido: {value}")
+    return int(size)
+
+
+def parse_date(value):
+    """'AAAA-MM-DD' (o 'AAAA-MM-DDTHH:MM') -> timestamp local."""
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise ValueError(f"Fecha inválida (use AAAA-MM-DD): {value}")
@@ -0,0 +1,173 @@
+"""
+Tiempos por archivo y por etapa del pipeline.
+
+Cada trabajo de extracción crea un FileTiming y lo activa con recording();
+el código de extracción marca sus etapas con `with stage('ocr'):` y anota la
+ruta tomada con note() sin recibir parámetros extra. Si no hay registro
+activo, stage() y note() no hacen nada.
+
+TimingReport recibe los registros en el proceso escritor, los exporta a
+JSONL o CSV, resume la corrida y, con perfilado activado, conserva solo los
+perfiles cProfile de los N archivos más lentos.
+"""
+import contextvars
+import csv
+import heapq
+import json
+import os
+import time
+from contextlib import contextmanager
+
+STAGES = ('phash', 'hash', 'cache', 'text', 'rasterize', 'ocr', 'parse', 'layout', 'place')
+CSV_FIELDS = ('file', 'method', 'page_kind', 'name_strategy', 'ocr_lang', 'ocr_fallback', 'total') + STAGES
+
+_current = contextvars.ContextVar('organizer_timing', default=None)
+
+
+class FileTiming:
+    def __init__(self, filepath):
+        self.file = filepath
+        self.stages = {}
+        self.info = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def note(self, key, value):
+        self.info[key] = value
+
+    def as_dict(self):
+        record = {'file': self.file, 'total': sum(self.stages.values()), 'stages': dict(self.stages)}
+        record.update(self.info)
+        return record
+
+
+@contextmanager
+def recording(record):
+    token = _current.set(record)
+    try:
+        yield record
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def stage(name):
+    record = _current.get()
+    if record is None:
+        yield
+    else:
+        with record.stage(name):
+            yield
+
+
+def note(key, value):
+    record = _current.get()
+    if record is not None:
+        record.note(key, value)
+
+
+def percentile(values, pct):
+    """Percentil por rango más cercano; None si no hay valores."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+class TimingReport:
+    """
+    export_path: .jsonl o .csv donde se escribe un registro por archivo (opcional).
+    slowest: cuántos archivos lentos listar en el resumen (y perfiles a conservar).
+    """
+
+    def __init__(self, export_path=None, slowest=5):
+        self.export_path = export_path
+        self.slowest = slowest
+        self._stage_samples = {name: [] for name in STAGES}
+        self._methods = {}
+        self._name_strategies = {}
+        self._page_kinds = {}
+        self._fallbacks = 0
+        self._slowest = []  # heap de (total, archivo, ruta_de_perfil)
+        self._file = None
+        self._csv = None
+        if export_path:
+            self._file = open(export_path, "w", encoding="utf-8", newline="")
+            if export_path.lower().endswith(".csv"):
+                self._csv = csv.DictWriter(self._file, fieldnames=CSV_FIELDS)
+                self._csv.writeheader()
+
+    def add(self, record, profile_path=None):
+        for name, seconds in record['stages'].items():
+            self._stage_samples.setdefault(name, []).append(seconds)
+        method = record.get('method', 'desconocido')
+        self._methods[method] = self._methods.get(method, 0) + 1
+        _count(self._name_strategies, record.get('name_strategy'))
+        _count(self._page_kinds, record.get('page_kind'))
+        if record.get('ocr_fallback'):
+            self._fallbacks += 1
+        self._keep_slowest(record, profile_path)
+
+        if self._csv:
+            row = {'file': record['file'], 'method': method, 'total': round(record['total'], 6),
+                   'name_strategy': record.get('name_strategy', ''),
+                   'page_kind': record.get('page_kind', ''),
+                   'ocr_lang': record.get('ocr_lang', ''), 'ocr_fallback': record.get('ocr_fallback', '')}
+            row.update({name: round(record['stages'].get(name, 0.0), 6) for name in STAGES})
+            self._csv.writerow(row)
+        elif self._file:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _keep_slowest(self, record, profile_path):
+        entry = (record['total'], record['file'], profile_path)
+        if len(self._slowest) < self.slowest:
+            heapq.heappush(self._slowest, entry)
+            return
+        if self.slowest and entry[0] > self._slowest[0][0]:
+            entry = heapq.heapreplace(self._slowest, entry)
+        # El perfil que sale del top N (o que nunca entró) se descarta
+        if entry[2] and os.path.exists(entry[2]):
+            os.remove(entry[2])
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def summary_lines(self):
+        lines = ["--- Tiempos por etapa ---"]
+        for name, samples in self._stage_samples.items():
+            if not samples:
+                continue
+            lines.append(
+                f"  {name:<10} n={len(samples):<6} total={sum(samples):.2f}s "
+                f"p50={percentile(samples, 50) * 1000:.1f}ms p95={percentile(samples, 95) * 1000:.1f}ms"
+            )
+        methods = ", ".join(f"{m}: {n}" for m, n in sorted(self._methods.items()))
+        lines.append(f"  Rutas: {methods or '-'}; OCR con respaldo a 'eng': {self._fallbacks}")
+        if self._page_kinds:
+            lines.append(f"  PDF con poco texto: {_counts_text(self._page_kinds)}")
+        if self._name_strategies:
+            lines.append(f"  Nombre encontrado por: {_counts_text(self._name_strategies)}")
+        if self._slowest:
+            lines.append("  Archivos más lentos:")
+            for total, filepath, profile_path in sorted(self._slowest, reverse=True):
+                suffix = f" (perfil: {profile_path})" if profile_path else ""
+                lines.append(f"    {total:.2f}s {os.path.basename(filepath)}{suffix}")
+        return lines
+
+
+def _count(counts, key):
+    if key:
+        counts[key] = counts.get(key, 0) + 1
+
+
+def _counts_text(counts):
+    return ", ".join(f"{key}: {n}" for key, n in sorted(counts.items()))
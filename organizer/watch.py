@@ -0,0 +1,237 @@
+"""
+Modo vigilancia: procesa los archivos que llegan a la carpeta de origen.
+
+Usa watchdog (inotify en Linux, ReadDirectoryChangesW en Windows) si está
+instalado; si no, sondea la carpeta comparando tamaño y fecha de cada archivo.
+Se vigilan los mismos archivos que entregaría scan_source con las ScanOptions
+dadas (subcarpetas hasta max_depth, patrones, tamaños, fechas).
+Un archivo se procesa cuando deja de cambiar durante `settle` segundos y se
+puede abrir; los archivos de una misma ráfaga se envían juntos en un lote una
+vez que la ráfaga termina (o tras `max_wait` segundos si no para de llegar).
+"""
+import os
+import queue
+import threading
+import time
+
+from .scanner import ScanOptions, accepts_path, scan_source
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
+
+
+# Tamaño de FolderWatcher._handled a partir del cual se poda
+HANDLED_PRUNE_SIZE = 1000
+
+
+def _noop(message):
+    pass
+
+
+def _signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+def _can_open(path):
+    # En Windows un archivo que aún se está copiando no se puede abrir
+    try:
+        with open(path, 'rb'):
+            return True
+    except OSError:
+        return False
+
+
+if Observer is not None:
+    class _QueueHandler(FileSystemEventHandler):
+        def __init__(self, events):
+            self.events = events
+
+        def on_created(self, event):
+            # Una carpeta nueva se revisa completa (puede llegar ya con archivos)
+            self.events.put(event.src_path)
+
+        def on_modified(self, event):
+            if not event.is_directory:
+                self.events.put(event.src_path)
+
+        def on_moved(self, event):
+            self.events.put(event.dest_path)
+
+
+class FolderWatcher:
+    """
+    Vigila `source` y llama on_batch(lista_de_rutas) con los archivos nuevos
+    o modificados una vez que terminaron de escribirse. options y
+    exclude_dirs filtran como en scan_source (por defecto, solo el primer nivel).
+    """
+
+    def __init__(self, source, on_batch, settle=2.0, poll_interval=1.0,
+                 process_existing=False, use_polling=False, max_wait=None, log=_noop,
+                 options=None, exclude_dirs=()):
+        self.source = os.path.abspath(source)
+        self.options = options or ScanOptions()
+        self.exclude_dirs = tuple(exclude_dirs)
+        self.on_batch = on_batch
+        self.settle = settle
+        self.max_wait = max_wait if max_wait is not None else settle * 5
+        self.poll_interval = poll_interval
+        self.process_existing = process_existing
+        self.use_polling = use_polling or Observer is None
+        self.log = log
+        self._events = queue.Queue()
+        self._stop = threading.Event()
+        # ruta -> [firma, momento del último cambio]
+        self._pending = {}
+        # ruta -> firma ya procesada (ignora eventos repetidos sin cambios reales);
+        # se poda en _prune_handled para no crecer con cada archivo que pasa
+        self._handled = {}
+        self._handled_limit = HANDLED_PRUNE_SIZE
+        self._seeded = False
+
+    def stop(self):
+        self._stop.set()
+
+    def initial_batch(self, files):
+        """
+        Entrega los archivos de `files` (p. ej. el lote inicial de scan_source)
+        anotando su firma como procesada. Al empezar, run() procesa entonces
+        los demás archivos del origen, como los que llegaron durante ese lote,
+        en vez de darlos a todos por vistos.
+        """
+        self._seeded = True
+        return self._record(files)
+
+    def _record(self, files):
+        for path in files:
+            sig = _signature(path)
+            if sig is not None:
+                self._handled[os.path.abspath(path)] = sig
+            yield path
+
+    def run(self):
+        existing = self._snapshot()
+        if self.process_existing or self._seeded:
+            for path, sig in existing.items():
+                if self._handled.get(path) != sig:
+                    self._events.put(path)
+        else:
+            self._handled.update(existing)
+
+        observer = None
+        if self.use_polling:
+            self.log(f"Vigilando (sondeo cada {self.poll_interval:g} s): {self.source}")
+            self._known = dict(existing)
+        else:
+            self.log(f"Vigilando: {self.source}")
+            observer = Observer()
+            observer.schedule(_QueueHandler(self._events), self.source,
+                              recursive=self.options.max_depth != 0)
+            observer.start()
+
+        try:
+            while not self._stop.is_set():
+                if self.use_polling:
+                    self._poll()
+                self._collect_events()
+                ready = self._ready_files()
+                if ready:
+                    self.on_batch(ready)
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+
+    def _poll(self):
+        try:
+            current = self._snapshot()
+        except OSError as e:
+            self.log(f"  [!] No se pudo leer la carpeta vigilada: {e}")
+            return
+        for path, sig in current.items():
+            if self._known.get(path) != sig:
+                self._events.put(path)
+        self._known = current
+
+    def _snapshot(self):
+        snapshot = {}
+        for path in scan_source(self.source, self.options, self.exclude_dirs, log=self.log):
+            sig = _signature(path)
+            if sig is not None:
+                snapshot[path] = sig
+        return snapshot
+
+    def _expand(self, path):
+        # Carpeta creada o movida dentro del origen: sus archivos no generan eventos propios
+        if not os.path.isdir(path):
+            return [path]
+        return [os.path.join(root, name) for root, _, names in os.walk(path) for name in names]
+
+    def _collect_events(self):
+        # Espera hasta poll_interval por el primer evento y luego drena el resto
+        timeout = self.poll_interval if not self._pending else min(self.poll_interval, self.settle / 2)
+        try:
+            path = self._events.get(timeout=timeout)
+        except queue.Empty:
+            return
+        now = time.monotonic()
+        while True:
+            for path in self._expand(os.path.abspath(path)):
+                if accepts_path(self.source, path, self.options, self.exclude_dirs):
+                    entry = self._pending.setdefault(path, [None, now])
+                    entry[1] = now
+            try:
+                path = self._events.get_nowait()
+            except queue.Empty:
+                break
+
+    def _ready_files(self):
+        now = time.monotonic()
+        ready = []
+        for path, entry in list(self._pending.items()):
+            sig = _signature(path)
+            if sig is None:
+                # Borrado o renombrado antes de procesarse
+                del self._pending[path]
+                continue
+            if sig != entry[0]:
+                # Sigue creciendo: reiniciar la espera
+                entry[0] = sig
+                entry[1] = now
+                continue
+            if now - entry[1] >= self.settle and _can_open(path):
+                ready.append(path)
+
+        if not ready:
+            return []
+        # Debounce: esperar a que termine la ráfaga completa, salvo que un archivo
+        # listo lleve demasiado tiempo esperando (llegada continua de archivos)
+        last_change = max(entry[1] for entry in self._pending.values())
+        oldest_ready = min(self._pending[path][1] for path in ready)
+        if now - last_change < self.settle and now - oldest_ready < self.max_wait:
+            return []
+
+        batch = []
+        for path in ready:
+            sig = self._pending.pop(path)[0]
+            if self._handled.get(path) == sig:
+                continue
+            self._handled[path] = sig
+            batch.append(path)
+        if len(self._handled) > self._handled_limit:
+            self._prune_handled()
+        return sorted(batch)
+
+    def _prune_handled(self):
+        # Solo sirve recordar archivos que siguen en el origen sin cambios: los
+        # movidos/borrados (p. ej. con --placement move) o modificados se olvidan
+        for path, sig in list(self._handled.items()):
+            if _signature(path) != sig:
+                del self._handled[path]
+        self._handled_limit = max(HANDLED_PRUNE_SIZE, 2 * len(self._handled))
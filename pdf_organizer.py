@@ -1,32 +1,46 @@
 import os
 import sys
-import shutil
-import re
+import queue
+import multiprocessing
+import threading
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-from datetime import datetime
-try:
-    import fitz  # PyMuPDF
-    from PIL import Image
-    import pytesseract
-    from pdf2image import convert_from_path
-except ImportError as e:
-    import tkinter.messagebox
-    import tkinter as tk
+
+from organizer.deps import missing_libraries
+
+# PyMuPDF, Pillow, pytesseract y pdf2image se cargan recién al procesar el
+# primer archivo; aquí solo se verifica que estén instalados
+_missing = missing_libraries()
+if _missing:
     root = tk.Tk()
     root.withdraw()
-    tkinter.messagebox.showerror(
+    messagebox.showerror(
         "Error de Dependencias",
-        f"Falta una librería necesaria: {e.name}\n\n"
+        f"Falta una librería necesaria: {_missing[0]}\n\n"
         "Por favor ejecute el siguiente comando en su terminal para instalar todo:\n"
         "pip install -r requirements.txt"
     )
     sys.exit(1)
 
+from organizer.cache import default_cache_path
+from organizer.deps import configure_dependencies
+from organizer.engine import BatchProcessor, default_workers
+from organizer.extraction import ExtractionSettings, extract_info, find_date, find_name
+from organizer.journal import default_journal_path
+from organizer.logsink import LOG_FILENAME, LogBuffer
+from organizer.placement import move_file
+from organizer.scanner import ScanOptions, scan_source
+from organizer.watch import FolderWatcher
+
 # --- Configuration ---
 # You might need to set the tesseract path explicitly if it's not in PATH
 # pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 
+# El log en pantalla se refresca en bloque cada LOG_FLUSH_MS y conserva solo
+# las últimas MAX_LOG_LINES líneas; el log completo va a Destino/organizer.log
+LOG_FLUSH_MS = 100
+MAX_LOG_LINES = 2000
+
 class PDFOrganizerApp:
     def __init__(self, root):
         self.root = root
@@ -51,13 +65,30 @@ class PDFOrganizerApp:
             self.dest_dir.set(os.path.abspath(default_dest))
 
         self.status_var = tk.StringVar(value="Listo")
+        self.workers_var = tk.IntVar(value=default_workers())
+        self.watch_var = tk.BooleanVar(value=False)
+        self.dedup_var = tk.BooleanVar(value=False)
+        self.recursive_var = tk.BooleanVar(value=False)
+        self.split_var = tk.BooleanVar(value=False)
         self.files_processed = 0
         self.errors = 0
+        self.duplicates = 0
+        self.events = queue.Queue()
+        self.log_buffer = LogBuffer()
+        self.ocr_lang = None
+        self.deps_status = None
+        self.deps_ready = threading.Event()
+        self.processor = None
+        self.watcher = None
+        self.worker_thread = None
         
         self.create_widgets()
         
-        # Check dependencies after UI load so we can show messageboxes
+        # Poppler/Tesseract se sondean en segundo plano (normalmente desde la
+        # caché de deps.json) para que la ventana responda de inmediato
+        threading.Thread(target=self.probe_dependencies, daemon=True).start()
         self.root.after(100, self.check_dependencies)
+        self.root.after(LOG_FLUSH_MS, self.flush_log)
 
     def create_widgets(self):
         # Header
@@ -80,12 +111,22 @@ class PDFOrganizerApp:
         ttk.Entry(input_frame, textvariable=self.dest_dir, width=50).grid(row=1, column=1, padx=5)
         ttk.Button(input_frame, text="Buscar...", command=self.browse_dest).grid(row=1, column=2)
 
+        # Worker count
+        ttk.Label(input_frame, text="Procesos:").grid(row=2, column=0, sticky=tk.W, pady=5)
+        ttk.Spinbox(input_frame, from_=1, to=64, textvariable=self.workers_var, width=5).grid(row=2, column=1, sticky=tk.W, padx=5)
+        ttk.Checkbutton(input_frame, text="Incluir subcarpetas", variable=self.recursive_var).grid(row=2, column=1, sticky=tk.E, padx=5)
+        ttk.Checkbutton(input_frame, text="Una constancia por p\u00e1gina", variable=self.split_var).grid(row=3, column=1, sticky=tk.E, padx=5)
+
         # Actions
         action_frame = ttk.Frame(self.root, padding="10")
         action_frame.pack(fill=tk.X, padx=10)
         
         self.start_btn = ttk.Button(action_frame, text="Iniciar Organizaci\u00f3n", command=self.start_processing)
         self.start_btn.pack(side=tk.RIGHT)
+        self.stop_btn = ttk.Button(action_frame, text="Detener", command=self.stop_processing, state='disabled')
+        self.stop_btn.pack(side=tk.RIGHT, padx=5)
+        ttk.Checkbutton(action_frame, text="Seguir vigilando la carpeta de origen", variable=self.watch_var).pack(side=tk.LEFT)
+        ttk.Checkbutton(action_frame, text="Omitir duplicados", variable=self.dedup_var).pack(side=tk.LEFT, padx=5)
 
         # Log/Status Area
         log_frame = ttk.LabelFrame(self.root, text="Estado", padding="10")
@@ -109,11 +150,29 @@ class PDFOrganizerApp:
             self.dest_dir.set(directory)
 
     def log(self, message):
+        # Seguro desde cualquier hilo: el mensaje se muestra en el próximo flush_log
+        self.log_buffer.write(message)
+
+    post_log = log
+
+    def flush_log(self):
+        self.flush_log_now()
+        self.root.after(LOG_FLUSH_MS, self.flush_log)
+
+    def flush_log_now(self):
+        lines = self.log_buffer.drain()
+        if lines:
+            self.show_lines(lines[-MAX_LOG_LINES:])
+
+    def show_lines(self, lines):
         self.log_text.config(state='normal')
-        self.log_text.insert(tk.END, message + "\n")
+        self.log_text.insert(tk.END, "\n".join(lines) + "\n")
+        # Anillo acotado: descartar las líneas más antiguas
+        line_count = int(self.log_text.index('end-1c').split('.')[0]) - 1
+        if line_count > MAX_LOG_LINES:
+            self.log_text.delete('1.0', f"{line_count - MAX_LOG_LINES + 1}.0")
         self.log_text.see(tk.END)
         self.log_text.config(state='disabled')
-        self.root.update_idletasks()
 
     def start_processing(self):
         source = self.source_dir.get()
@@ -125,322 +184,157 @@ class PDFOrganizerApp:
         if not dest:
             messagebox.showerror("Error", "Seleccione una carpeta de destino.")
             return
+        try:
+            workers = int(self.workers_var.get())
+        except (tk.TclError, ValueError):
+            messagebox.showerror("Error", "El n\u00famero de procesos debe ser un entero.")
+            return
 
         self.start_btn.config(state='disabled')
+        self.stop_btn.config(state='normal')
+        try:
+            os.makedirs(dest, exist_ok=True)
+            self.log_buffer.open_file(os.path.join(dest, LOG_FILENAME))
+        except OSError as e:
+            self.log(f"[!] No se pudo abrir el archivo de log: {e}")
         self.log("Iniciando proceso...")
         self.files_processed = 0
         self.errors = 0
+        self.duplicates = 0
+        self.status_var.set("Procesando...")
         
-        # Start processing in a loop (for simplicity, running on main thread for now, 
-        # normally would thread this but let's keep it simple as requested)
-        self.process_files(source, dest)
-        
+        # El procesamiento corre en un hilo aparte para no congelar la ventana;
+        # los resultados llegan por self.events y se drenan con root.after
+        self.worker_thread = threading.Thread(
+            target=self.process_files,
+            args=(source, dest, workers, self.watch_var.get(), self.dedup_var.get(),
+                  self.recursive_var.get(), self.split_var.get()),
+            daemon=True
+        )
+        self.worker_thread.start()
+        self.root.after(100, self.drain_events)
+
+    def stop_processing(self):
+        self.stop_btn.config(state='disabled')
+        self.status_var.set("Deteniendo...")
+        if self.watcher:
+            self.watcher.stop()
+        if self.processor:
+            self.processor.cancel()
+
+    def drain_events(self):
+        finished = False
+        while True:
+            try:
+                kind, payload = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'stats':
+                self.files_processed += payload['processed']
+                self.errors += payload['errors']
+                self.duplicates += payload['duplicates']
+            elif kind == 'watching':
+                self.status_var.set("Vigilando carpeta de origen...")
+            elif kind == 'done':
+                finished = True
+
+        if finished:
+            self.finish_processing()
+        else:
+            self.root.after(100, self.drain_events)
+
+    def finish_processing(self):
         self.log(f"--- Proceso Finalizado ---")
         self.log(f"Procesados: {self.files_processed}")
         self.log(f"Errores/No identificados: {self.errors}")
+        if self.duplicates:
+            self.log(f"Duplicados omitidos: {self.duplicates}")
+        if self.log_buffer.path:
+            self.log(f"Log completo en: {self.log_buffer.path}")
+        self.flush_log_now()
+        self.log_buffer.close_file()
+        self.status_var.set("Listo")
         messagebox.showinfo("Completado", f"Proceso finalizado.\nArchivos: {self.files_processed}\nErrores: {self.errors}")
         self.start_btn.config(state='normal')
+        self.stop_btn.config(state='disabled')
 
-    def process_files(self, source, dest):
-        valid_extensions = ('.pdf', '.jpg', '.jpeg', '.png', '.bmp', '.tiff')
-        
-        for filename in os.listdir(source):
-            if filename.lower().endswith(valid_extensions):
-                filepath = os.path.join(source, filename)
-                self.log(f"Analizando: {filename}...")
-                
-                try:
-                    info = self.extract_info(filepath)
-                    if info:
-                        year = info.get('year', 'Desconocido')
-                        name = info.get('name', 'Desconocido')
-                        self.move_file(filepath, dest, year, name)
-                        self.files_processed += 1
-                    else:
-                        self.log(f"  [!] No se pudo extraer informaci\u00f3n de {filename}")
-                        self.errors += 1
-                        
-                except Exception as e:
-                    self.log(f"  [X] Error procesando {filename}: {e}")
-                    self.errors += 1
+    def process_files(self, source, dest, workers=None, watch=False, dedup=False, recursive=False,
+                      split_pages=False):
+        # Corre en el hilo de trabajo: no tocar widgets aqu\u00ed
+        try:
+            self.deps_ready.wait()
+            self.processor = BatchProcessor(
+                dest, workers=workers, log=self.post_log,
+                cache_path=default_cache_path(dest),
+                settings=ExtractionSettings(ocr_lang=self.ocr_lang),
+                dedup='exact' if dedup else 'off',
+                split_pages=split_pages,
+                journal_path=default_journal_path(dest),
+            )
+            with self.processor:
+                # Los archivos se procesan a medida que se encuentran
+                options = ScanOptions(max_depth=None if recursive else 0)
+                files = scan_source(source, options, exclude_dirs=[dest], log=self.post_log)
+                if watch:
+                    # El vigilante anota el lote inicial para luego tomar lo que llegue mientras tanto
+                    self.watcher = FolderWatcher(source, self.run_batch, log=self.post_log,
+                                                 options=options, exclude_dirs=[dest])
+                    files = self.watcher.initial_batch(files)
+                self.run_batch(files)
+                if watch and not self.processor.cancelled:
+                    self.events.put(('watching', None))
+                    self.watcher.run()
+        except Exception as e:
+            self.post_log(f"  [X] Error procesando lote: {e}")
+        finally:
+            self.watcher = None
+            self.events.put(('done', None))
+
+    def run_batch(self, files):
+        self.events.put(('stats', self.processor.run(files)))
 
     def move_file(self, filepath, dest_root, year, name):
-        # Sanitize directory name
-        safe_name = "".join([c for c in name if c.isalpha() or c in (' ', '-', '_')]).strip()
-        if not safe_name:
-            safe_name = "SinNombre"
-            
-        target_dir = os.path.join(dest_root, str(year), safe_name)
-        os.makedirs(target_dir, exist_ok=True)
-        
-        filename = os.path.basename(filepath)
-        target_path = os.path.join(target_dir, filename)
-        
-        # Avoid overwriting
-        counter = 1
-        base, ext = os.path.splitext(filename)
-        while os.path.exists(target_path):
-            target_path = os.path.join(target_dir, f"{base}_{counter}{ext}")
-            counter += 1
-            
-        shutil.copy2(filepath, target_path)
-        self.log(f"  -> Copiado a: {year}/{safe_name}/")
+        return move_file(filepath, dest_root, year, name, self.log)
 
     def extract_info(self, file_path):
         """
         Extracts Name and Date/Year from PDF or Image.
         Returns dict: {'name': str, 'year': str} or None if failed.
         """
-        text = ""
-        ext = os.path.splitext(file_path)[1].lower()
-        
-        # A. Handle PDF
-        if ext == '.pdf':
-            # 1. Try PyMuPDF (Text based)
-            try:
-                doc = fitz.open(file_path)
-                for page in doc:
-                    text += page.get_text()
-                doc.close()
-            except Exception as e:
-                self.log(f"  Error leyendo PDF: {e}")
-                return None
-
-            # 2. If Text is empty, try OCR (Image based)
-            if not text or len(text.strip()) < 50:
-                self.log("  Texto insuficiente en PDF, intentando OCR...")
-                try:
-                    images = convert_from_path(file_path, first_page=1, last_page=1)
-                    if images:
-                        try:
-                            text = pytesseract.image_to_string(images[0], lang='spa')
-                        except pytesseract.TesseractError as te:
-                            if "Failed loading language 'spa'" in str(te):
-                                self.log("  [!] Error: Pack de idioma Español ('spa') no instalado en Tesseract.")
-                                self.log("      Intentando con 'eng' (Inglés)...")
-                                text = pytesseract.image_to_string(images[0], lang='eng')
-                            else:
-                                raise te
-                except Exception as e:
-                    if "poppler" in str(e).lower() or "page count" in str(e).lower():
-                        self.log("  [X] Error Crítico: Poppler no está instalado o en el PATH.")
-                        self.log("      Se requiere Poppler para procesar PDFs escaneados.")
-                    else:
-                        self.log(f"  Fallo en OCR de PDF: {e}")
-
-        # B. Handle Images
-        elif ext in ('.jpg', '.jpeg', '.png', '.bmp', '.tiff'):
-            self.log("  Imagen detectada, ejecutando OCR...")
-            try:
-                with Image.open(file_path) as image:
-                    try:
-                        text = pytesseract.image_to_string(image, lang='spa')
-                    except pytesseract.TesseractError as te:
-                        if "Failed loading language 'spa'" in str(te):
-                            self.log("  [!] Error: Idioma Español faltante en Tesseract. Usando Inglés...")
-                            text = pytesseract.image_to_string(image, lang='eng')
-                        else:
-                            raise te
-            except Exception as e:
-                self.log(f"  Fallo al leer imagen: {e}")
-                return None
-                
-        if not text:
-            return None
-            
-        # Clean text
-        text = text.replace('\n', ' ').strip()
-        
-        # Calling extraction logic
-        name = self.find_name(text)
-        year = self.find_date(text)
-        
-        return {'name': name, 'year': year}
+        return extract_info(file_path, self.log)
 
     def find_date(self, text):
-        # Normalizar texto para facilitar búsqueda
-        text_lower = text.lower()
-        
-        # 1. Busqueda explícita de "de [Mes] de [Año]"
-        months = r"(enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|octubre|noviembre|diciembre)"
-        
-        # Pattern: 12 de Enero de 2024 / 12 de Enero del 2024
-        date_pattern = re.search(f"\\b\\d{{1,2}}\\s+de\\s+{months}\\s+de(l)?\\s+(20[0-3][0-9])\\b", text_lower)
-        if date_pattern:
-            return date_pattern.group(3) # Group 3 is the year
-            
-        # 2. Busqueda de "Mes de [Año]" o "Mes [Año]" (Ej: Enero 2024)
-        month_year_pattern = re.search(f"{months}\\s+(?:de(l)?\\s+)?(20[0-3][0-9])\\b", text_lower)
-        if month_year_pattern:
-            return month_year_pattern.group(3)
-
-        # 3. Fallback: buscar solo el año (4 dígitos 2000-2039)
-        years = re.findall(r'\b(20[0-3][0-9])\b', text)
-        if years:
-            # Retornar el año mas frecuente o el ultimo mencionado
-            return years[-1]
-            
-        return "SinFecha"
+        return find_date(text)
 
     def find_name(self, text):
-        # Limpiar texto de espacios multiples y caracteres extraños
-        clean_text = re.sub(r'\s+', ' ', text)
-        
-    def find_name(self, text):
-        # Limpiar texto de espacios multiples y caracteres extraños
-        clean_text = re.sub(r'\s+', ' ', text)
-        
-        # Palabras clave que preceden al nombre (Spanish + English)
-        keywords = [
-            "otorga a", "otorga el presente", "certifica a", "certifica que", 
-            "reconocimiento a", "presente a", "favor de", "constancia a",
-            "presente diploma a", "se hace constar que", "certificamos a",
-            "certifies that", "presented to", "awarded to", "reviewer certificate",
-            "thank you", "recognition of"
-        ]
-        
-        # Palabras que marcan el FIN del nombre (Stopwords)
-        stop_words = {
-            "por", "en", "con", "el", "la", "los", "las", "se", "ha", "haber",
-            "asistencia", "participación", "participacion", "curso", "taller",
-            "fecha", "dado", "expide", "aguascalientes", "enero", "febrero",
-            "marzo", "abril", "mayo", "junio", "julio", "agosto", "septiembre",
-            "octubre", "noviembre", "diciembre",
-            "for", "of", "and", "in", "to", "date", "given"
-        }
-        
-        for kw in keywords:
-            # Buscar la keyword case-insensitive
-            match = re.search(f"{kw}\\W+", clean_text, re.IGNORECASE)
-            if match:
-                # Obtener el texto DESPUES de la keyword
-                rest_of_text = clean_text[match.end():]
-                
-                # Tokenizar palabras
-                words = rest_of_text.split()
-                candidate_parts = []
-                
-                for word in words:
-                    # Limpiar puntuación del final de la palabra
-                    word_clean = word.rstrip(',.;:')
-                    
-                    if not word_clean:
-                        continue
-                        
-                    # Verificar si es una stopword
-                    if word_clean.lower() in stop_words:
-                        break
-                        
-                    # Heurística: Si la palabra empieza con mayúscula o es todo mayús
-                    # (Permitimos conectores de nombres como 'de', 'del' si ya tenemos algo)
-                    if word_clean[0].isupper() or word_clean.lower() in ('de', 'del', 'y', 'la', 'los'):
-                        candidate_parts.append(word_clean)
-                    else:
-                        # Si encontramos una palabra lowercase que no es conector comun, probablemente terminamos
-                        break
-                        
-                    # Limite de longitud maxima del nombre
-                    if len(candidate_parts) > 6:
-                        break
-                
-                # Validar candidato
-                if len(candidate_parts) >= 2:
-                    # Checar que no sean puros conectores
-                    real_names = [p for p in candidate_parts if p.lower() not in ('de', 'del', 'y')]
-                    if len(real_names) >= 1:
-                        return " ".join(candidate_parts).title()
-        
-        return "Desconocido"
+        return find_name(text)
 
-    def process_files(self, source, dest):
-        valid_extensions = ('.pdf', '.jpg', '.jpeg', '.png', '.bmp', '.tiff')
-        
-        for filename in os.listdir(source):
-            if filename.lower().endswith(valid_extensions):
-                filepath = os.path.join(source, filename)
-                self.log(f"Analizando: {filename}...")
-                
-                try:
-                    info = self.extract_info(filepath)
-                    if info:
-                        year = info.get('year', 'Desconocido')
-                        name = info.get('name', 'Desconocido')
-                        
-                        # Fallback: Si el nombre es Desconocido, intentar extraerlo del nombre del archivo
-                        if name == "Desconocido":
-                            # Heuristica simple: Si el archivo parece tener un nombre propio
-                            # Ej: "Vicente Esparza Villalpando.pdf" -> "Vicente Esparza Villalpando"
-                            # Ignorar numeros y palabras comunes
-                            clean_filename = os.path.splitext(filename)[0]
-                            clean_filename = re.sub(r'[\d_()]+', ' ', clean_filename).strip()
-                            if len(clean_filename.split()) >= 2:
-                                name = clean_filename.title()
-                                self.log(f"  [i] Nombre extraído del archivo: {name}")
-
-                        self.move_file(filepath, dest, year, name)
-                        self.files_processed += 1
-                    else:
-                        self.log(f"  [!] No se pudo extraer informaci\u00f3n de {filename}")
-                        self.errors += 1
-                        
-                except Exception as e:
-                    self.log(f"  [X] Error procesando {filename}: {e}")
-                    self.errors += 1
+    def probe_dependencies(self):
+        # Corre en un hilo aparte; check_dependencies muestra el resultado
+        try:
+            self.deps_status = configure_dependencies(self.post_log)
+        except Exception as e:
+            self.post_log(f"[!] No se pudieron verificar las dependencias: {e}")
+            self.deps_status = {'tesseract': True, 'ocr_lang': None}
+        self.ocr_lang = self.deps_status['ocr_lang']
+        self.deps_ready.set()
 
     def check_dependencies(self):
-        # 0. Check for Local Poppler (User requested specific path)
-        # Look for the directory structure "poppler-XX/Library/bin" or "poppler-XX/bin"
-        local_poppler_found = False
-        cwd = os.getcwd()
-        possible_patterns = [
-            os.path.join(cwd, "poppler-25.12.0", "Library", "bin"),
-            os.path.join(cwd, "poppler-25.12.0", "bin"),
-        ]
-        
-        # Also check generalized pattern in case version changes
-        for item in os.listdir(cwd):
-            if "poppler" in item.lower() and os.path.isdir(item):
-                 possible_patterns.append(os.path.join(cwd, item, "Library", "bin"))
-                 possible_patterns.append(os.path.join(cwd, item, "bin"))
-
-        for path in possible_patterns:
-            if os.path.exists(path):
-                self.log(f"  [i] Poppler local detectado: {path}")
-                os.environ["PATH"] += os.pathsep + path
-                local_poppler_found = True
-                break
-
-        # 1. Check Tesseract
-        tesseract_path = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
-        if os.path.exists(tesseract_path):
-            pytesseract.pytesseract.tesseract_cmd = tesseract_path
-        else:
-            # Check if it's in PATH by running a blind command
-            try:
-                pytesseract.get_tesseract_version()
-            except:
-                messagebox.showwarning(
-                    "Dependencia faltante: Tesseract", 
-                    "No se detectó Tesseract-OCR. La lectura de archivos escaneados fallará.\n"
-                    "Por favor instale Tesseract o verifique que esté en el PATH."
-                )
-
-        # 2. Check Poppler (needed for pdf2image)
-        try:
-            from pdf2image.exceptions import PDFInfoNotInstalledError
-            try:
-                from pdf2image import pdfinfo_from_path
-                # We can't easily dry-run without a file, but importing usually checks for poppler in PATH
-                # If we found it locally, we assume it works.
-                if not local_poppler_found:
-                   # Try a dummy check if possible, mostly implicit
-                   pass
-            except ImportError:
-                pass
-        except ImportError:
-            pass
+        if not self.deps_ready.is_set():
+            self.root.after(100, self.check_dependencies)
+            return
+        status = self.deps_status
+        if not status['tesseract']:
+            messagebox.showwarning(
+                "Dependencia faltante: Tesseract", 
+                "No se detectó Tesseract-OCR. La lectura de archivos escaneados fallará.\n"
+                "Por favor instale Tesseract o verifique que esté en el PATH."
+            )
             
 if __name__ == "__main__":
+    # Necesario para el pool de procesos en ejecutables congelados de Windows
+    multiprocessing.freeze_support()
+
     if sys.platform.startswith('win'):
         # Fix for high DPI displays on Windows
         try:
@@ -0,0 +1,76 @@
+import sys
+import os
+import shutil
+import fitz  # PyMuPDF
+import unittest
+from unittest.mock import patch
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from organizer.cache import ExtractionCache, default_cache_path, file_hash
+from organizer.engine import BatchProcessor
+
+TEXT = """
+Certifica a:
+Juan Perez
+
+Por su asistencia al curso de actualizacion docente.
+Aguascalientes, Ags, a 15 de Enero de 2024.
+"""
+
+class TestExtractionCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_cache"
+        self.dest = os.path.join(self.test_dir, "dest")
+        os.makedirs(self.test_dir, exist_ok=True)
+        doc = fitz.open()
+        page = doc.new_page()
+        page.insert_text((50, 50), TEXT, fontsize=12)
+        self.path = os.path.join(self.test_dir, "cert.pdf")
+        doc.save(self.path)
+        doc.close()
+
+    def run_batch(self):
+        processor = BatchProcessor(self.dest, workers=1, cache_path=default_cache_path(self.dest))
+        return processor.run([self.path])
+
+    def test_rerun_skips_extraction(self):
+        self.assertEqual(self.run_batch()['cache_hits'], 0)
+        with patch('organizer.engine.extract_text') as mock_extract:
+            stats = self.run_batch()
+            mock_extract.assert_not_called()
+        self.assertEqual(stats['cache_hits'], 1)
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "2024", "Juan Perez", "cert_1.pdf")))
+
+    def test_rules_change_reparses_cached_text(self):
+        self.run_batch()
+        with patch('organizer.engine.RULES_VERSION', "otra"), \
+             patch('organizer.engine.extract_text') as mock_extract:
+            stats = self.run_batch()
+            mock_extract.assert_not_called()
+        self.assertEqual(stats['cache_hits'], 0)
+        self.assertEqual(stats['processed'], 1)
+
+    def test_pipeline_change_extracts_again(self):
+        self.run_batch()
+        with patch('organizer.cache.PIPELINE_VERSION', "otra"):
+            stats = self.run_batch()
+        self.assertEqual(stats['cache_hits'], 0)
+        self.assertEqual(stats['processed'], 1)
+
+    def test_prune(self):
+        cache = ExtractionCache(default_cache_path(self.dest), max_entries=2)
+        for i in range(5):
+            cache.put(f"hash{i}", "texto", "Nombre", "2024")
+        self.assertEqual(cache.prune(), 3)
+        self.assertIsNone(cache.get("hash0"))
+        self.assertIsNotNone(cache.get("hash4"))
+        cache.close()
+
+    def test_file_hash(self):
+        self.assertEqual(len(file_hash(self.path)), 64)
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import sys
+import os
+import shutil
+import subprocess
+import fitz  # PyMuPDF
+import unittest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from organizer.cli import main
+from organizer.manifest import read_manifest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class TestCommandLine(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_cli"
+        self.source = os.path.join(self.test_dir, "src")
+        self.dest = os.path.join(self.test_dir, "dest")
+        os.makedirs(self.source, exist_ok=True)
+
+        doc = fitz.open()
+        page = doc.new_page()
+        page.insert_text((50, 50), "Se otorga el presente reconocimiento a\nMARIA LOPEZ GARCIA\nPor su brillante participacion.\nMarzo 2023", fontsize=12)
+        doc.save(os.path.join(self.source, "sample.pdf"))
+        doc.close()
+
+    def test_no_gui_modules(self):
+        code = "import sys, organizer.cli; sys.exit('tkinter' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT)
+        self.assertEqual(result.returncode, 0)
+
+    def test_dry_run(self):
+        rc = main(["organize", self.source, self.dest, "--workers", "1", "--dry-run"])
+        self.assertEqual(rc, 0)
+        self.assertFalse(os.path.exists(self.dest))
+
+    def test_organize(self):
+        rc = main(["organize", self.source, self.dest, "--workers", "1"])
+        self.assertEqual(rc, 0)
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "2023", "Maria Lopez Garcia", "sample.pdf")))
+
+    def test_plan_and_apply(self):
+        plan = os.path.join(self.test_dir, "plan.csv")
+        methods = []
+        for _ in range(2):
+            # La segunda vez el resultado sale de la caché, con la misma confianza
+            rc = main(["organize", self.source, self.dest, "--workers", "1", "--plan", plan])
+            self.assertEqual(rc, 0)
+            [row] = read_manifest(plan)
+            self.assertEqual(row['target'], "2023/Maria Lopez Garcia/sample.pdf")
+            self.assertEqual(row['confidence'], 'high')
+            methods.append(row['method'])
+        self.assertEqual(methods, ['native', 'cache'])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "2023")))
+
+        rc = main(["apply", plan, self.dest])
+        self.assertEqual(rc, 0)
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "2023", "Maria Lopez Garcia", "sample.pdf")))
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+if __name__ == '__main__':
+    unittest.main()
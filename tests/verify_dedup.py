@@ -0,0 +1,96 @@
+import sys
+import os
+import shutil
+import fitz  # PyMuPDF
+import unittest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from organizer.dedup import hamming, perceptual_hash
+from organizer.engine import BatchProcessor
+
+TEMPLATE = """
+Certifica a:
+{name}
+
+Por su asistencia al curso de actualizacion docente.
+Aguascalientes, Ags, a 15 de Enero de 2024.
+"""
+
+class TestDedup(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_dedup"
+        self.source = os.path.join(self.test_dir, "src")
+        self.dest = os.path.join(self.test_dir, "dest")
+        os.makedirs(self.source, exist_ok=True)
+
+    def create_pdf(self, filename, name, title=""):
+        doc = fitz.open()
+        page = doc.new_page()
+        page.insert_text((50, 50), TEMPLATE.format(name=name), fontsize=12)
+        # Los metadatos cambian los bytes del archivo pero no el render
+        doc.set_metadata({"title": title})
+        path = os.path.join(self.source, filename)
+        doc.save(path)
+        doc.close()
+        return path
+
+    def placed_files(self):
+        return sorted(
+            os.path.relpath(os.path.join(root, f), self.dest).replace(os.sep, "/")
+            for root, _, files in os.walk(self.dest) for f in files
+            if not f.startswith(".")
+        )
+
+    def test_exact_duplicates(self):
+        original = self.create_pdf("a.pdf", "Juan Perez")
+        for copy in ("b.pdf", "c.pdf"):
+            shutil.copy2(original, os.path.join(self.source, copy))
+        other = self.create_pdf("d.pdf", "Ana Lopez")
+        files = [original, os.path.join(self.source, "b.pdf"), os.path.join(self.source, "c.pdf"), other]
+
+        stats = BatchProcessor(self.dest, workers=2, dedup='exact').run(files)
+        self.assertEqual(stats['processed'], 2)
+        self.assertEqual(stats['duplicates'], 2)
+        self.assertEqual(stats['errors'], 0)
+        self.assertEqual(self.placed_files(), ["2024/Ana Lopez/d.pdf", "2024/Juan Perez/a.pdf"])
+
+        # Entre corridas: el índice persiste en el destino
+        resent = os.path.join(self.source, "reenviado.pdf")
+        shutil.copy2(original, resent)
+        stats = BatchProcessor(self.dest, workers=1, dedup='exact').run([resent])
+        self.assertEqual(stats['duplicates'], 1)
+
+        # Si el archivo ubicado se borró, se vuelve a ubicar
+        os.remove(os.path.join(self.dest, "2024", "Juan Perez", "a.pdf"))
+        stats = BatchProcessor(self.dest, workers=1, dedup='exact').run([resent])
+        self.assertEqual(stats['processed'], 1)
+        self.assertIn("2024/Juan Perez/reenviado.pdf", self.placed_files())
+
+    def test_perceptual_duplicates(self):
+        first = self.create_pdf("a.pdf", "Juan Perez", title="original")
+        reexport = self.create_pdf("b.pdf", "Juan Perez", title="reexportado")
+        other = self.create_pdf("c.pdf", "Ana Lopez", title="original")
+        self.assertLessEqual(hamming(perceptual_hash(first), perceptual_hash(reexport)), 4)
+
+        stats = BatchProcessor(self.dest, workers=1, dedup='exact').run([first, reexport])
+        self.assertEqual(stats['duplicates'], 0)
+        shutil.rmtree(self.dest)
+
+        stats = BatchProcessor(self.dest, workers=1, dedup='perceptual').run([first, reexport, other])
+        self.assertEqual(stats['duplicates'], 1)
+        # Misma plantilla con otro nombre: no es duplicado
+        self.assertEqual(self.placed_files(), ["2024/Ana Lopez/c.pdf", "2024/Juan Perez/a.pdf"])
+
+    def test_dry_run(self):
+        original = self.create_pdf("a.pdf", "Juan Perez")
+        copy = os.path.join(self.source, "b.pdf")
+        shutil.copy2(original, copy)
+        stats = BatchProcessor(self.dest, workers=1, dry_run=True, dedup='exact').run([original, copy])
+        self.assertEqual(stats['duplicates'], 1)
+        self.assertFalse(os.path.exists(self.dest))
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+if __name__ == '__main__':
+    unittest.main()
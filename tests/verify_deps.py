@@ -0,0 +1,89 @@
+import sys
+import os
+import shutil
+import subprocess
+import unittest
+from unittest import mock
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from organizer import deps
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_cli_import_does_not_load_heavy_libraries(self):
+        code = (
+            "import sys, organizer.cli\n"
+            "heavy = ('pymupdf', 'PIL._imaging', 'pytesseract.pytesseract', 'pdf2image.pdf2image')\n"
+            "print(','.join(m for m in heavy if m in sys.modules))\n"
+        )
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                             text=True, check=True).stdout.strip()
+        self.assertEqual(out, "")
+
+    def test_startup_check_does_not_load_heavy_libraries(self):
+        # Lo que hace pdf_organizer al arrancar, con las librerías ya registradas como diferidas
+        code = (
+            "import sys, organizer.cli\n"
+            "from organizer.deps import missing_libraries\n"
+            "assert missing_libraries() == []\n"
+            "heavy = ('pymupdf', 'PIL._imaging', 'pytesseract.pytesseract', 'pdf2image.pdf2image')\n"
+            "print(','.join(m for m in heavy if m in sys.modules))\n"
+        )
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                             text=True, check=True).stdout.strip()
+        self.assertEqual(out, "")
+
+    def test_lazy_module_loads_on_use(self):
+        from organizer.extraction import fitz
+        self.assertTrue(hasattr(fitz, "open"))
+
+    def test_missing_libraries(self):
+        self.assertEqual(deps.missing_libraries(), [])
+        self.assertEqual(deps.missing_modules(['no_existe_modulo_xyz']), ['no_existe_modulo_xyz'])
+
+
+class TestDependencyCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_deps"
+        os.makedirs(self.test_dir, exist_ok=True)
+        self.cache_path = os.path.join(self.test_dir, "deps.json")
+
+    def configure(self, backend='pytesseract'):
+        with mock.patch('organizer.deps.pytesseract.get_tesseract_version') as version, \
+             mock.patch('organizer.deps.probe_languages', return_value=('eng', 'spa')) as probe:
+            status = deps.configure_dependencies(ocr_backend=backend, cache_path=self.cache_path)
+        return status, version.call_count + probe.call_count
+
+    def test_second_launch_skips_probing(self):
+        status, calls = self.configure()
+        self.assertEqual(status['ocr_lang'], 'spa+eng')
+        self.assertGreater(calls, 0)
+        self.assertTrue(os.path.exists(self.cache_path))
+
+        cached, calls = self.configure()
+        self.assertEqual(calls, 0)
+        self.assertEqual(cached, status)
+
+    def test_changed_environment_probes_again(self):
+        self.configure()
+        _, calls = self.configure(backend='auto')
+        self.assertGreater(calls, 0)
+
+        with mock.patch('organizer.deps.DEPS_CACHE_MAX_AGE', -1):
+            _, calls = self.configure(backend='auto')
+        self.assertGreater(calls, 0)
+
+    def test_corrupt_cache_is_ignored(self):
+        with open(self.cache_path, "w") as f:
+            f.write("{no es json")
+        status, calls = self.configure()
+        self.assertGreater(calls, 0)
+        self.assertEqual(status['ocr_lang'], 'spa+eng')
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import sys
+import os
+import shutil
+import fitz  # PyMuPDF
+import unittest
+from unittest.mock import patch
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from organizer import engine
+from organizer.engine import BatchProcessor
+from organizer.placement import DestinationIndex
+from organizer.raster import estimate_image_bytes
+
+TEXT = """
+Certifica a:
+Juan Perez
+
+Por su asistencia al curso de actualizacion docente.
+Aguascalientes, Ags, a 15 de Enero de 2024.
+"""
+
+_real_extract_job = engine._extract_job
+
+
+def _crashing_job(filepath, *args):
+    # Simula un fallo nativo (segfault de PyMuPDF/Tesseract, OOM killer) en el proceso hijo
+    if os.path.basename(filepath) == "crash.pdf":
+        os._exit(1)
+    return _real_extract_job(filepath, *args)
+
+
+class TestBatchProcessor(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_engine"
+        self.dest = os.path.join(self.test_dir, "dest")
+        os.makedirs(self.test_dir, exist_ok=True)
+
+    def create_pdf(self, folder, filename, text):
+        os.makedirs(folder, exist_ok=True)
+        doc = fitz.open()
+        page = doc.new_page()
+        page.insert_text((50, 50), text, fontsize=12)
+        path = os.path.join(folder, filename)
+        doc.save(path)
+        doc.close()
+        return path
+
+    def test_ordered_collisions(self):
+        # Mismo nombre de archivo desde varias carpetas: los sufijos siguen el orden de entrada
+        files = [
+            self.create_pdf(os.path.join(self.test_dir, f"src{i}"), "cert.pdf", TEXT)
+            for i in range(4)
+        ]
+        processor = BatchProcessor(self.dest, workers=2)
+        stats = processor.run(files)
+
+        self.assertEqual(stats['processed'], 4)
+        self.assertEqual(stats['errors'], 0)
+        target_dir = os.path.join(self.dest, "2024", "Juan Perez")
+        self.assertEqual(
+            sorted(os.listdir(target_dir)),
+            ["cert.pdf", "cert_1.pdf", "cert_2.pdf", "cert_3.pdf"]
+        )
+
+    def test_background_placement_keeps_order(self):
+        files = [
+            self.create_pdf(os.path.join(self.test_dir, f"src{i}"), "cert.pdf", TEXT + f"Folio {i}")
+            for i in range(6)
+        ]
+        processor = BatchProcessor(self.dest, workers=1, placement_threads=3)
+        stats = processor.run(files)
+
+        self.assertEqual(stats['processed'], 6)
+        self.assertEqual(stats['errors'], 0)
+        target_dir = os.path.join(self.dest, "2024", "Juan Perez")
+        for i, filepath in enumerate(files):
+            target = os.path.join(target_dir, "cert.pdf" if i == 0 else f"cert_{i}.pdf")
+            with open(filepath, "rb") as a, open(target, "rb") as b:
+                self.assertEqual(a.read(), b.read())
+
+    def test_background_placement_creates_folders_once(self):
+        files = [
+            self.create_pdf(os.path.join(self.test_dir, f"src{i}"), "cert.pdf", TEXT + f"Folio {i}")
+            for i in range(4)
+        ]
+        with BatchProcessor(self.dest, workers=1, placement_threads=2) as processor:
+            processor.run(files[:1])
+            # La carpeta ya existe: las escrituras en ella no vuelven a llamar a makedirs
+            with patch("organizer.placement.os.makedirs", wraps=os.makedirs) as makedirs:
+                stats = processor.run(files[1:])
+        self.assertEqual(stats['processed'], 3)
+        makedirs.assert_not_called()
+
+    def test_index_kept_across_batches(self):
+        for threads in (0, 2):
+            dest = os.path.join(self.test_dir, f"dest{threads}")
+            folder = os.path.join(self.test_dir, f"src{threads}")
+            files = [self.create_pdf(folder, f"cert{i}.pdf", TEXT) for i in range(3)]
+            target_dir = os.path.join(dest, "2024", "Juan Perez")
+            with patch.object(DestinationIndex, "_load", autospec=True,
+                              side_effect=DestinationIndex._load) as load:
+                with BatchProcessor(dest, workers=1, placement_threads=threads) as processor:
+                    processor.run(files[:1])
+                    # Otro proceso ocupa un nombre que el índice cree libre
+                    with open(os.path.join(target_dir, "cert1.pdf"), "wb") as f:
+                        f.write(b"ajeno")
+                    stats = processor.run(files[1:])
+            self.assertEqual(stats['errors'], 0)
+            self.assertEqual(stats['processed'], 2)
+            # Un solo recorrido del destino, más uno al encontrar el nombre ocupado
+            self.assertEqual(load.call_count, 2)
+            self.assertEqual(sorted(os.listdir(target_dir)),
+                             ["cert0.pdf", "cert1.pdf", "cert1_1.pdf", "cert2.pdf"])
+            with open(os.path.join(target_dir, "cert1.pdf"), "rb") as f:
+                self.assertEqual(f.read(), b"ajeno")
+
+    def test_worker_crash_does_not_abort_run(self):
+        folder = os.path.join(self.test_dir, "src")
+        files = [self.create_pdf(folder, f"cert{i:02d}.pdf", TEXT) for i in range(20)]
+        files.insert(3, self.create_pdf(folder, "crash.pdf", TEXT))
+        messages = []
+        # Más archivos que la ventana de envío (workers * 4)
+        with patch("organizer.engine._extract_job", _crashing_job):
+            processor = BatchProcessor(self.dest, workers=2, log=messages.append)
+            stats = processor.run(files)
+
+        self.assertEqual(stats['processed'] + stats['errors'], len(files))
+        # Solo fallan el archivo que mató al proceso y los que estaban en vuelo con él
+        self.assertGreaterEqual(stats['errors'], 1)
+        self.assertLessEqual(stats['errors'], 2 * 4 + 1)
+        self.assertIn("cert19.pdf", os.listdir(os.path.join(self.dest, "2024", "Juan Perez")))
+        self.assertTrue(any("se reinicia el pool" in m for m in messages))
+
+    def test_memory_budget_limits_in_flight(self):
+        files = [
+            self.create_pdf(os.path.join(self.test_dir, "src"), f"cert{i}.pdf", TEXT)
+            for i in range(4)
+        ]
+        # Cada archivo supera el presupuesto: se procesan de a uno
+        processor = BatchProcessor(self.dest, workers=2, memory_budget=1)
+        stats = processor.run(files)
+
+        self.assertEqual(stats['processed'], 4)
+        self.assertEqual(processor.peak_image_bytes,
+                         estimate_image_bytes(files[0], processor.settings.raster))
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+if __name__ == '__main__':
+    unittest.main()
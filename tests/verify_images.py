@@ -4,13 +4,10 @@ import unittest
 from unittest.mock import patch, MagicMock
 from PIL import Image
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from pdf_organizer import PDFOrganizerApp
-import tkinter as tk
+from organizer.extraction import extract_info
 
 class TestImagePipeline(unittest.TestCase):
     def setUp(self):
-        self.root = tk.Tk()
-        self.app = PDFOrganizerApp(self.root)
         self.test_dir = "test_images"
         os.makedirs(self.test_dir, exist_ok=True)
         
@@ -20,12 +17,11 @@ class TestImagePipeline(unittest.TestCase):
         img.save(self.dummy_image_path)
 
     def tearDown(self):
-        self.root.destroy()
         import shutil
         if os.path.exists(self.test_dir):
             shutil.rmtree(self.test_dir)
 
-    @patch('pdf_organizer.pytesseract.image_to_string')
+    @patch('organizer.ocr.pytesseract.image_to_string')
     def test_image_extraction(self, mock_ocr):
         # Setup mock return value
         mock_ocr.return_value = """
@@ -36,7 +32,7 @@ class TestImagePipeline(unittest.TestCase):
         """
         
         # Run extraction
-        info = self.app.extract_info(self.dummy_image_path)
+        info = extract_info(self.dummy_image_path)
         
         # Verify OCR was called
         mock_ocr.assert_called()
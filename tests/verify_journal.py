@@ -0,0 +1,195 @@
+import sys
+import os
+import shutil
+import fitz  # PyMuPDF
+import unittest
+from unittest.mock import patch
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from organizer import engine, placement
+from organizer.engine import BatchProcessor
+from organizer.journal import JobJournal, default_journal_path
+from organizer.placement import place_file
+
+TEMPLATE = """
+Certifica a:
+{name}
+
+Por su asistencia al curso de actualizacion docente.
+Aguascalientes, Ags, a 15 de Enero de 2024.
+"""
+
+NAMES = ["Juan Perez", "Ana Lopez", "Luis Gomez", "Eva Ruiz"]
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_journal"
+        self.source = os.path.join(self.test_dir, "src")
+        self.dest = os.path.join(self.test_dir, "dest")
+        self.journal = default_journal_path(self.dest)
+        os.makedirs(self.source, exist_ok=True)
+        self.files = []
+        for i, name in enumerate(NAMES):
+            doc = fitz.open()
+            doc.new_page().insert_text((50, 50), TEMPLATE.format(name=name), fontsize=12)
+            path = os.path.join(self.source, f"cert{i}.pdf")
+            doc.save(path)
+            doc.close()
+            self.files.append(path)
+
+    def placed_files(self):
+        return sorted(f for _, _, files in os.walk(self.dest) for f in files if not f.startswith("."))
+
+    def processor(self, **kwargs):
+        return BatchProcessor(self.dest, workers=1, journal_path=self.journal, **kwargs)
+
+    def test_resume_after_cancel(self):
+        processor = self.processor()
+        copied = []
+
+        def log(message):
+            if message.startswith("  -> Copiado"):
+                copied.append(message)
+                if len(copied) == 2:
+                    processor.cancel()
+
+        processor.log = log
+        stats = processor.run(self.files)
+        self.assertEqual(stats['processed'], 2)
+
+        with patch("organizer.engine.extract_text", wraps=engine.extract_text) as extract:
+            stats = self.processor().run(self.files)
+        # Solo se extraen los dos archivos que faltaban; nada se copia dos veces
+        self.assertEqual(extract.call_count, 2)
+        self.assertEqual(stats['processed'], 4)
+        self.assertEqual(self.placed_files(), ["cert0.pdf", "cert1.pdf", "cert2.pdf", "cert3.pdf"])
+
+        # La corrida terminó completa: la bitácora queda vacía
+        journal = JobJournal(self.journal)
+        self.assertEqual(journal.pending(), 0)
+        journal.close()
+
+    def test_crash_during_copy(self):
+        real_copy = placement.copy_file
+
+        def crash_on_third(src, dst):
+            if src == self.files[2]:
+                with open(dst, "wb") as f:
+                    f.write(b"%PDF parcial")
+                raise KeyboardInterrupt
+            real_copy(src, dst)
+
+        with patch("organizer.placement.copy_file", side_effect=crash_on_third):
+            with self.assertRaises(KeyboardInterrupt):
+                self.processor().run(self.files)
+
+        with patch("organizer.engine.extract_text", wraps=engine.extract_text) as extract:
+            stats = self.processor().run(self.files)
+        self.assertEqual(extract.call_count, 1)
+        self.assertEqual(stats['processed'], 4)
+        # La copia a medias quedó en un temporal: se descarta y se copia en la misma ruta (sin _1)
+        target = os.path.join(self.dest, "2024", "Luis Gomez", "cert2.pdf")
+        self.assertEqual(os.path.getsize(target), os.path.getsize(self.files[2]))
+        self.assertEqual(os.listdir(os.path.dirname(target)), ["cert2.pdf"])
+        self.assertEqual(self.placed_files(), ["cert0.pdf", "cert1.pdf", "cert2.pdf", "cert3.pdf"])
+
+    def test_move_keeps_source_if_target_differs(self):
+        # Un archivo del mismo tamaño pero otro contenido en el destino reservado
+        # (preasignado, escritura rota o de otro proceso) no cuenta como copia terminada
+        def crash_on_third(src, dst, mode='copy', log=None):
+            if src == self.files[2]:
+                with open(dst, "wb") as f:
+                    f.write(b"\0" * os.path.getsize(src))
+                raise KeyboardInterrupt
+            return place_file(src, dst, mode)
+
+        with patch("organizer.placement.place_file", side_effect=crash_on_third):
+            with self.assertRaises(KeyboardInterrupt):
+                self.processor(placement='move').run(self.files)
+
+        with open(self.files[2], "rb") as f:
+            original = f.read()
+        stats = self.processor(placement='move').run(self.files[2:])
+        self.assertEqual(stats['processed'], 2)
+        folder = os.path.join(self.dest, "2024", "Luis Gomez")
+        with open(os.path.join(folder, "cert2.pdf"), "rb") as f:
+            self.assertEqual(f.read(), b"\0" * len(original))
+        with open(os.path.join(folder, "cert2_1.pdf"), "rb") as f:
+            self.assertEqual(f.read(), original)
+        self.assertFalse(os.path.exists(self.files[2]))
+
+    def test_locked_files_do_not_abort_resume(self):
+        real_rename = placement.rename_noreplace
+
+        def crash_on_third(src, dst):
+            if src == self.files[2]:
+                # Copia completa, pero el original sigue ahí
+                shutil.copy2(src, dst)
+                raise KeyboardInterrupt
+            real_rename(src, dst)
+
+        with patch("organizer.placement.rename_noreplace", side_effect=crash_on_third):
+            with self.assertRaises(KeyboardInterrupt):
+                self.processor(placement='move').run(self.files)
+        folder = os.path.join(self.dest, "2024", "Luis Gomez")
+        partial = os.path.join(folder, ".cert2.pdf.0123456789ab.part")
+        with open(partial, "wb") as f:
+            f.write(b"%PDF parcial")
+
+        real_remove = os.remove
+        # Primero no se puede borrar el temporal y después el original (bloqueados en un recurso compartido)
+        for locked in (partial, self.files[2]):
+            def remove(path, locked=locked):
+                if path == locked:
+                    raise PermissionError(13, "Archivo bloqueado", path)
+                real_remove(path)
+
+            with patch("organizer.engine.os.remove", side_effect=remove):
+                stats = self.processor(placement='move').run(self.files[2:3])
+            self.assertEqual((stats['processed'], stats['errors']), (0, 1))
+
+        stats = self.processor(placement='move').run(self.files[2:3])
+        self.assertEqual((stats['processed'], stats['errors']), (1, 0))
+        self.assertFalse(os.path.exists(self.files[2]))
+        self.assertEqual(os.listdir(folder), ["cert2.pdf"])
+
+    def test_changed_file_is_reprocessed(self):
+        processor = self.processor()
+        processor.log = lambda message: message.startswith("  -> Copiado") and processor.cancel()
+        processor.run(self.files)
+
+        # El archivo cambió desde la corrida interrumpida: se procesa de nuevo
+        with open(self.files[0], "ab") as f:
+            f.write(b"\n")
+        with patch("organizer.engine.extract_text", wraps=engine.extract_text) as extract:
+            self.processor().run(self.files)
+        self.assertEqual(extract.call_count, 4)
+
+    def test_stale_entries_are_pruned(self):
+        processor = self.processor()
+        processor.log = lambda message: message.startswith("  -> Copiado") and processor.cancel()
+        processor.run(self.files)
+
+        # Lotes del modo vigilancia: el aviso sale una vez, no en cada corrida
+        messages = []
+        processor = self.processor(log=messages.append)
+        with processor:
+            processor.run([])
+            processor.run([])
+        self.assertEqual(len([m for m in messages if "Reanudando" in m]), 1)
+
+        # Los orígenes ya no están (movidos o borrados): nada que reanudar
+        for path in self.files:
+            os.remove(path)
+        messages = []
+        self.processor(log=messages.append).run([])
+        self.assertFalse([m for m in messages if "Reanudando" in m])
+        journal = JobJournal(self.journal)
+        self.assertEqual(journal.pending(), 0)
+        journal.close()
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import sys
+import os
+import shutil
+import fitz  # PyMuPDF
+import unittest
+from unittest.mock import patch
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from organizer.engine import BatchProcessor
+from organizer.extraction import STOP_WORDS, extract_info, pdf_layout_name
+from organizer.layout import layout_name, looks_like_name
+from organizer.timing import TimingReport
+
+
+def line(text, size, top):
+    return {'bbox': (50, top, 400, top + size),
+            'spans': [{'text': text, 'size': size}]}
+
+
+def page(*blocks):
+    return {'height': 800, 'blocks': [{'type': 0, 'lines': list(lines)} for lines in blocks]}
+
+
+class TestLayoutName(unittest.TestCase):
+    def test_largest_name_below_title(self):
+        page_dict = page(
+            [line("CONSTANCIA", 36, 80)],
+            [line("ANA SOFÍA TORRES", 24, 300)],
+            [line("Por su participación en el taller de lectura", 11, 400),
+             line("realizado en la ciudad de León.", 11, 415)],
+            [line("Dr. Pedro Ramírez", 11, 700)],
+        )
+        self.assertEqual(layout_name(page_dict, STOP_WORDS), "Ana Sofía Torres")
+
+    def test_name_split_over_lines(self):
+        page_dict = page(
+            [line("JUAN CARLOS", 22, 300), line("DE LA CRUZ", 22, 325)],
+            [line("Por su asistencia al curso de actualización docente", 10, 400)],
+        )
+        self.assertEqual(layout_name(page_dict, STOP_WORDS), "Juan Carlos De La Cruz")
+
+    def test_signatories_at_body_size_are_ignored(self):
+        page_dict = page(
+            [line("Por su asistencia al curso de actualización docente", 11, 300)],
+            [line("Dr. Pedro Ramírez", 11, 700)],
+        )
+        self.assertIsNone(layout_name(page_dict, STOP_WORDS))
+
+    def test_looks_like_name(self):
+        self.assertTrue(looks_like_name("María de la Luz Pérez"))
+        self.assertFalse(looks_like_name("Universidad Autónoma"))
+        self.assertFalse(looks_like_name("Curso 2024"))
+        self.assertFalse(looks_like_name("Taller de lectura", STOP_WORDS))
+
+
+class TestLayoutPipeline(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_layout"
+        self.dest = os.path.join(self.test_dir, "dest")
+        os.makedirs(self.test_dir, exist_ok=True)
+
+    def create_pdf(self, filename, lines):
+        doc = fitz.open()
+        pdf_page = doc.new_page()
+        for y, text, size in lines:
+            pdf_page.insert_text((50, y), text, fontsize=size)
+        path = os.path.join(self.test_dir, filename)
+        doc.save(path)
+        doc.close()
+        return path
+
+    def test_name_without_keyword(self):
+        path = self.create_pdf("0001.pdf", [
+            (80, "RECONOCIMIENTO", 32),
+            (300, "MARIA FERNANDA LOPEZ", 26),
+            (400, "Por su destacada participacion en el taller de lectura,", 11),
+            (415, "Aguascalientes, Ags, a 15 de marzo de 2024.", 11),
+        ])
+        self.assertEqual(pdf_layout_name(path), "Maria Fernanda Lopez")
+
+        timings = TimingReport()
+        processor = BatchProcessor(self.dest, workers=1, timings=timings)
+        stats = processor.run([path])
+
+        self.assertEqual(stats['errors'], 0)
+        self.assertTrue(os.path.isdir(os.path.join(self.dest, "2024", "Maria Fernanda Lopez")))
+        self.assertIn("  Nombre encontrado por: layout: 1", timings.summary_lines())
+
+    @patch('organizer.extraction._ocr_pdf_page')
+    def test_short_native_text_skips_ocr(self, mock_ocr):
+        path = self.create_pdf("corta.pdf", [
+            (80, "CONSTANCIA", 30), (300, "LUIS GOMEZ", 24), (400, "Marzo 2024", 12),
+        ])
+        info = extract_info(path)
+        mock_ocr.assert_not_called()
+        self.assertEqual(info['year'], "2024")
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,8 +2,11 @@ import sys
 import os
 import fitz  # PyMuPDF
 import unittest
+from unittest.mock import patch
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from pdf_organizer import PDFOrganizerApp
+from organizer import extraction
+from organizer.extraction import read_pdf_text
 import tkinter as tk
 
 class MockApp:
@@ -85,6 +88,60 @@ class TestPDFExtraction(unittest.TestCase):
         print(f"Sample English -> Name: {name}")
         self.assertEqual(name, "John Doe")
 
+    def create_long_pdf(self, filename, first_page_text, pages):
+        doc = fitz.open()
+        page = doc.new_page()
+        page.insert_text((50, 50), first_page_text, fontsize=12)
+        for i in range(1, pages):
+            page = doc.new_page()
+            page.insert_text((50, 50), f"Pagina de relleno {i}", fontsize=12)
+        path = os.path.join(self.test_dir, filename)
+        doc.save(path)
+        doc.close()
+        return path
+
+    def test_early_exit(self):
+        text = """
+        Certifica a:
+        Juan Perez
+
+        Por su asistencia al curso.
+        Aguascalientes, Ags, a 15 de Enero de 2024.
+        """
+        path = self.create_long_pdf("long.pdf", text, 300)
+        read = read_pdf_text(path)
+        self.assertIn("Juan Perez", read)
+        self.assertNotIn("relleno", read)
+
+    def test_page_limit(self):
+        # Sin fecha explícita no hay salida temprana: se detiene en max_pages
+        path = self.create_long_pdf("nodate.pdf", "Documento sin datos", 50)
+        read = read_pdf_text(path, max_pages=3)
+        self.assertIn("relleno 2", read)
+        self.assertNotIn("relleno 3", read)
+
+    def test_unlimited_pages_scanned_linearly(self):
+        # Sin límite de páginas cada página se revisa una vez, no todo lo leído
+        path = self.create_long_pdf("all.pdf", "Documento sin datos", 300)
+        scanned = []
+        real_find_name = extraction.find_name
+        with patch("organizer.extraction.find_name",
+                   side_effect=lambda text: scanned.append(len(text)) or real_find_name(text)):
+            read = read_pdf_text(path, max_pages=None)
+        self.assertIn("relleno 299", read)
+        self.assertEqual(len(scanned), 300)
+        self.assertLess(max(scanned), 2 * extraction.PAGE_OVERLAP)
+
+    def test_name_split_across_pages(self):
+        doc = fitz.open()
+        doc.new_page().insert_text((50, 50), "Constancia de participacion.\nCertifica a:", fontsize=12)
+        doc.new_page().insert_text((50, 50), "Juan Perez\n15 de Enero de 2024", fontsize=12)
+        doc.new_page().insert_text((50, 50), "Pagina de relleno", fontsize=12)
+        path = os.path.join(self.test_dir, "split.pdf")
+        doc.save(path)
+        doc.close()
+        self.assertNotIn("relleno", read_pdf_text(path))
+
     def tearDown(self):
         # Clean up
         import shutil
@@ -0,0 +1,73 @@
+import sys
+import os
+import shutil
+import threading
+import unittest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from organizer.logsink import LogBuffer
+
+class TestLogBuffer(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_logsink"
+        os.makedirs(self.test_dir, exist_ok=True)
+        self.path = os.path.join(self.test_dir, "organizer.log")
+
+    def test_threads_and_file(self):
+        buffer = LogBuffer()
+        buffer.open_file(self.path)
+
+        def produce(worker):
+            for i in range(500):
+                buffer.write(f"{worker}:{i}")
+
+        threads = [threading.Thread(target=produce, args=(w,)) for w in range(4)]
+        for t in threads:
+            t.start()
+        drained = []
+        while any(t.is_alive() for t in threads):
+            drained.extend(buffer.drain())
+        for t in threads:
+            t.join()
+        drained.extend(buffer.drain())
+        buffer.close_file()
+
+        self.assertEqual(len(drained), 2000)
+        # El orden de cada productor se conserva
+        self.assertEqual([m for m in drained if m.startswith("0:")], [f"0:{i}" for i in range(500)])
+        with open(self.path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines[0].startswith("==="))
+        self.assertEqual(lines[1:], drained)
+        self.assertEqual(buffer.drain(), [])
+        self.assertIsNone(buffer.path)
+
+    def test_without_file(self):
+        buffer = LogBuffer()
+        buffer.write("hola")
+        self.assertEqual(buffer.drain(), ["hola"])
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_early_lines_reach_file(self):
+        buffer = LogBuffer()
+        buffer.write("Tesseract: OK")
+        self.assertEqual(buffer.drain(), ["Tesseract: OK"])
+        buffer.open_file(self.path)
+        buffer.write("Iniciando proceso...")
+        buffer.drain()
+        buffer.close_file()
+        with open(self.path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[1:], ["Tesseract: OK", "Iniciando proceso..."])
+
+        # Ya escritas: no se repiten en la siguiente sesión
+        buffer.open_file(self.path)
+        buffer.close_file()
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(len(f.read().splitlines()), 4)
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+if __name__ == '__main__':
+    unittest.main()
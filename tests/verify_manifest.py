@@ -0,0 +1,139 @@
+import sys
+import os
+import shutil
+import fitz  # PyMuPDF
+import unittest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from organizer.engine import BatchProcessor
+from organizer.manifest import ManifestWriter, apply_manifest, confidence, read_manifest
+
+KEYWORD = """
+Certifica a:
+Juan Perez
+
+Por su asistencia al curso de actualizacion docente.
+Aguascalientes, Ags, a 15 de Enero de 2024.
+"""
+
+LOOSE_YEAR = """
+Certifica a:
+Ana Lopez
+
+Por su participacion en el ciclo escolar 2023.
+"""
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_manifest"
+        self.source = os.path.join(self.test_dir, "src")
+        self.dest = os.path.join(self.test_dir, "dest")
+        os.makedirs(self.source, exist_ok=True)
+
+    def create_pdf(self, filename, text):
+        doc = fitz.open()
+        page = doc.new_page()
+        page.insert_text((50, 50), text, fontsize=12)
+        path = os.path.join(self.source, filename)
+        doc.save(path)
+        doc.close()
+        return path
+
+    def plan(self, files, filename="plan.csv", workers=1):
+        path = os.path.join(self.test_dir, filename)
+        manifest = ManifestWriter(path)
+        try:
+            stats = BatchProcessor(self.dest, workers=workers, dry_run=True, manifest=manifest).run(files)
+        finally:
+            manifest.close()
+        return path, stats
+
+    def test_confidence(self):
+        self.assertEqual(confidence("2024", "Juan Perez", 'keyword', 'date'), 'high')
+        self.assertEqual(confidence("2024", "Juan Perez", 'layout', 'month_year'), 'medium')
+        self.assertEqual(confidence("2024", "Juan Perez", 'filename', 'date'), 'low')
+        self.assertEqual(confidence("2024", "Juan Perez", 'keyword', 'year'), 'low')
+        self.assertEqual(confidence("SinFecha", "Juan Perez", 'keyword', 'none'), 'none')
+
+    def test_plan_then_apply(self):
+        # Un archivo previo en destino: el plan ya reserva el siguiente sufijo
+        existing = os.path.join(self.dest, "2024", "Juan Perez")
+        os.makedirs(existing)
+        first = self.create_pdf("cert.pdf", KEYWORD)
+        shutil.copy2(first, os.path.join(existing, "cert.pdf"))
+        files = [first, self.create_pdf("ana.pdf", LOOSE_YEAR)]
+
+        for filename in ("plan.csv", "plan.jsonl"):
+            path, stats = self.plan(files, filename, workers=2)
+            self.assertEqual(stats['processed'], 2)
+            rows = list(read_manifest(path))
+            self.assertEqual([row['target'] for row in rows],
+                             ["2024/Juan Perez/cert_1.pdf", "2023/Ana Lopez/ana.pdf"])
+            self.assertEqual([row['confidence'] for row in rows], ['high', 'low'])
+            self.assertEqual(rows[0]['source'], os.path.abspath(first))
+            self.assertEqual(rows[0]['method'], 'native')
+            self.assertEqual(rows[1]['date_strategy'], 'year')
+            self.assertIsNone(rows[0]['page'])
+        # Planear no escribe en el destino
+        self.assertEqual(sorted(os.listdir(self.dest)), ["2024"])
+        self.assertEqual(os.listdir(existing), ["cert.pdf"])
+
+        stats = apply_manifest(path, self.dest, threads=2)
+        self.assertEqual(stats, {'placed': 2, 'skipped': 0, 'errors': 0})
+        self.assertTrue(os.path.exists(os.path.join(existing, "cert_1.pdf")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "2023", "Ana Lopez", "ana.pdf")))
+
+        # Repetir la aplicación no duplica archivos
+        stats = apply_manifest(path, self.dest, threads=0)
+        self.assertEqual(stats, {'placed': 0, 'skipped': 2, 'errors': 0})
+        self.assertEqual(sorted(os.listdir(existing)), ["cert.pdf", "cert_1.pdf"])
+
+    def test_apply_does_not_overwrite(self):
+        path, _ = self.plan([self.create_pdf("cert.pdf", KEYWORD)])
+        # Otro archivo ocupó el destino después de planear
+        occupied = os.path.join(self.dest, "2024", "Juan Perez")
+        os.makedirs(occupied)
+        with open(os.path.join(occupied, "cert.pdf"), "wb") as f:
+            f.write(b"otro")
+
+        stats = apply_manifest(path, self.dest, mode='move', threads=0)
+        self.assertEqual(stats['placed'], 1)
+        self.assertEqual(sorted(os.listdir(occupied)), ["cert.pdf", "cert_1.pdf"])
+        with open(os.path.join(occupied, "cert.pdf"), "rb") as f:
+            self.assertEqual(f.read(), b"otro")
+        self.assertFalse(os.path.exists(os.path.join(self.source, "cert.pdf")))
+
+        # Ya movido (origen ausente): el hash del plan reconoce la copia con sufijo
+        stats = apply_manifest(path, self.dest, mode='move', threads=0)
+        self.assertEqual(stats, {'placed': 0, 'skipped': 1, 'errors': 0})
+
+    def test_same_size_file_is_not_taken_as_applied(self):
+        source = self.create_pdf("cert.pdf", KEYWORD)
+        path, _ = self.plan([source])
+        occupied = os.path.join(self.dest, "2024", "Juan Perez")
+        os.makedirs(occupied)
+        with open(os.path.join(occupied, "cert.pdf"), "wb") as f:
+            f.write(b"\0" * os.path.getsize(source))
+
+        stats = apply_manifest(path, self.dest, threads=0)
+        self.assertEqual(stats, {'placed': 1, 'skipped': 0, 'errors': 0})
+        with open(source, "rb") as a, open(os.path.join(occupied, "cert_1.pdf"), "rb") as b:
+            self.assertEqual(a.read(), b.read())
+        stats = apply_manifest(path, self.dest, threads=0)
+        self.assertEqual(stats, {'placed': 0, 'skipped': 1, 'errors': 0})
+
+    def test_apply_rejects_paths_outside_dest(self):
+        path = os.path.join(self.test_dir, "plan.jsonl")
+        manifest = ManifestWriter(path)
+        manifest.add(self.create_pdf("cert.pdf", KEYWORD), 'place', target="../2024/Juan/cert.pdf",
+                     year="2024", name="Juan")
+        manifest.close()
+        stats = apply_manifest(path, self.dest, threads=0)
+        self.assertEqual(stats['errors'], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.test_dir, "2024")))
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import sys
+import os
+import re
+import random
+import unittest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from organizer.extraction import KEYWORDS, STOP_WORDS, find_date, find_name, parse_text
+
+# Implementación anterior (una búsqueda por keyword), usada como referencia
+def reference_find_name(text):
+    clean_text = re.sub(r'\s+', ' ', text)
+    for kw in KEYWORDS:
+        match = re.search(f"{kw}\\W+", clean_text, re.IGNORECASE)
+        if match:
+            words = clean_text[match.end():].split()
+            candidate_parts = []
+            for word in words:
+                word_clean = word.rstrip(',.;:')
+                if not word_clean:
+                    continue
+                if word_clean.lower() in STOP_WORDS:
+                    break
+                if word_clean[0].isupper() or word_clean.lower() in ('de', 'del', 'y', 'la', 'los'):
+                    candidate_parts.append(word_clean)
+                else:
+                    break
+                if len(candidate_parts) > 6:
+                    break
+            if len(candidate_parts) >= 2:
+                real_names = [p for p in candidate_parts if p.lower() not in ('de', 'del', 'y')]
+                if len(real_names) >= 1:
+                    return " ".join(candidate_parts).title()
+    return "Desconocido"
+
+def reference_find_date(text):
+    text_lower = text.lower()
+    months = r"(enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|octubre|noviembre|diciembre)"
+    date_pattern = re.search(f"\\b\\d{{1,2}}\\s+de\\s+{months}\\s+de(l)?\\s+(20[0-3][0-9])\\b", text_lower)
+    if date_pattern:
+        return date_pattern.group(3)
+    month_year_pattern = re.search(f"{months}\\s+(?:de(l)?\\s+)?(20[0-3][0-9])\\b", text_lower)
+    if month_year_pattern:
+        return month_year_pattern.group(3)
+    years = re.findall(r'\b(20[0-3][0-9])\b', text)
+    if years:
+        return years[-1]
+    return "SinFecha"
+
+VOCABULARY = KEYWORDS + [
+    "Juan", "PEREZ", "María", "de", "la", "Lopez", "por", "su", "asistencia", "al",
+    "curso", "Enero", "marzo", "de", "del", "2024", "2019", "1999", "15", ",", ":",
+    "Aguascalientes,", "Dr.", "y", "the", "JOHN", "Doe", "12th", "\n", "  ", "presente", "\xa0", "\t", "Ünal", "İlker",
+]
+
+class TestCompiledMatcher(unittest.TestCase):
+    def test_same_results_as_reference(self):
+        rng = random.Random(1234)
+        for _ in range(1000):
+            text = " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(1, 60)))
+            text = rng.choice(["", " ", "\n"]) + text + rng.choice(["", " ", "\n"])
+            self.assertEqual(find_name(text), reference_find_name(text), text)
+            self.assertEqual(find_date(text), reference_find_date(text), text)
+            self.assertEqual(
+                parse_text(text),
+                {'name': reference_find_name(text), 'year': reference_find_date(text)},
+                text,
+            )
+
+    def test_overlapping_keywords(self):
+        # "otorga el presente" no produce nombre; "presente a" sí, aunque se traslapan
+        text = "Se otorga el presente a Juan Perez por su asistencia"
+        self.assertEqual(find_name(text), "Juan Perez")
+        self.assertEqual(find_name(text), reference_find_name(text))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import sys
+import os
+import unittest
+from unittest.mock import patch
+from PIL import Image
+import pytesseract
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from organizer import ocr
+from organizer.ocr import LanguageNotAvailable, choose_language, get_backend, ocr_image
+
+def fake_ocr(image, lang):
+    if lang == 'spa':
+        raise pytesseract.TesseractError(1, "Failed loading language 'spa'")
+    return f"texto {lang}"
+
+class TestOcrBackends(unittest.TestCase):
+    def setUp(self):
+        self.image = Image.new('L', (20, 20), color=255)
+
+    def test_backend_is_reused(self):
+        self.assertIs(get_backend('pytesseract'), get_backend('pytesseract'))
+        with self.assertRaises(ValueError):
+            get_backend('otro')
+
+    @patch('organizer.ocr.pytesseract.image_to_string', side_effect=fake_ocr)
+    def test_missing_language(self, mock_ocr):
+        with self.assertRaises(LanguageNotAvailable):
+            get_backend('pytesseract').image_to_string(self.image, 'spa')
+
+    def test_choose_language(self):
+        self.assertEqual(choose_language(('eng', 'osd', 'spa')), 'spa+eng')
+        self.assertEqual(choose_language(('eng', 'osd')), 'eng')
+        self.assertIsNone(choose_language(None))
+
+    @patch('organizer.ocr.pytesseract.image_to_string', side_effect=fake_ocr)
+    def test_explicit_language(self, mock_ocr):
+        text = ocr_image(self.image, backend='pytesseract', lang='eng')
+        self.assertEqual(text, "texto eng")
+        mock_ocr.assert_called_once()
+
+    @patch('organizer.ocr.default_language', return_value=None)
+    @patch('organizer.ocr.pytesseract.image_to_string', side_effect=fake_ocr)
+    def test_english_fallback_once(self, mock_ocr, mock_lang):
+        # Sin sondeo: 'spa' se intenta una sola vez por proceso
+        ocr._missing_languages.clear()
+        messages = []
+        self.assertEqual(ocr_image(self.image, messages.append, backend='pytesseract'), "texto eng")
+        self.assertEqual(ocr_image(self.image, messages.append, backend='pytesseract'), "texto eng")
+        self.assertEqual([call.kwargs['lang'] for call in mock_ocr.call_args_list], ['spa', 'eng', 'eng'])
+        self.assertEqual(sum("'spa'" in m for m in messages), 1)
+        ocr._missing_languages.clear()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import sys
+import os
+import shutil
+import fitz  # PyMuPDF
+import unittest
+from unittest.mock import patch
+from PIL import Image
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from organizer.cache import default_cache_path
+from organizer.engine import BatchProcessor
+
+TEMPLATE = """
+Certifica a:
+{name}
+
+Por su asistencia al curso de actualizacion docente.
+Aguascalientes, Ags, a 15 de Enero de {year}.
+"""
+
+NAMES = [("Juan Perez", "2024"), ("Ana Lopez", "2023"), ("Juan Perez", "2024")]
+
+class TestSplitPages(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_pages"
+        self.source = os.path.join(self.test_dir, "src")
+        self.dest = os.path.join(self.test_dir, "dest")
+        os.makedirs(self.source, exist_ok=True)
+
+    def create_export(self):
+        doc = fitz.open()
+        for name, year in NAMES:
+            page = doc.new_page()
+            page.insert_text((50, 50), TEMPLATE.format(name=name, year=year), fontsize=12)
+        path = os.path.join(self.source, "congreso.pdf")
+        doc.save(path)
+        doc.close()
+        return path
+
+    def test_pdf_pages(self):
+        export = self.create_export()
+        cache_path = default_cache_path(self.dest)
+        stats = BatchProcessor(self.dest, workers=2, cache_path=cache_path, split_pages=True).run([export])
+        self.assertEqual(stats['processed'], 3)
+        self.assertEqual(stats['errors'], 0)
+
+        first = os.path.join(self.dest, "2024", "Juan Perez", "congreso_p001.pdf")
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "2023", "Ana Lopez", "congreso_p002.pdf")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "2024", "Juan Perez", "congreso_p003.pdf")))
+        with fitz.open(first) as doc:
+            self.assertEqual(doc.page_count, 1)
+            self.assertIn("Juan Perez", doc[0].get_text())
+        # El original queda intacto
+        self.assertTrue(os.path.exists(export))
+
+        # Cada página tiene su propia entrada de caché
+        stats = BatchProcessor(self.dest, workers=1, cache_path=cache_path, split_pages=True).run([export])
+        self.assertEqual(stats['cache_hits'], 3)
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "2024", "Juan Perez", "congreso_p001_1.pdf")))
+
+    def test_without_split(self):
+        export = self.create_export()
+        stats = BatchProcessor(self.dest, workers=1).run([export])
+        self.assertEqual(stats['processed'], 1)
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "2024", "Juan Perez", "congreso.pdf")))
+
+    def test_tiff_frames(self):
+        frames = [Image.new("L", (40, 20), color) for color in (0, 128, 255)]
+        path = os.path.join(self.source, "escaneo.tiff")
+        frames[0].save(path, save_all=True, append_images=frames[1:])
+
+        def fake_ocr(image, *args, **kwargs):
+            # El color del cuadro identifica la página
+            name, year = NAMES[{0: 0, 128: 1, 255: 2}[image.getpixel((0, 0))]]
+            return TEMPLATE.format(name=name, year=year)
+
+        with patch("organizer.extraction.ocr_image", side_effect=fake_ocr):
+            stats = BatchProcessor(self.dest, workers=1, split_pages=True).run([path])
+        self.assertEqual(stats['processed'], 3)
+        target = os.path.join(self.dest, "2023", "Ana Lopez", "escaneo_p002.tiff")
+        with Image.open(target) as image:
+            self.assertEqual(getattr(image, "n_frames", 1), 1)
+            self.assertEqual(image.getpixel((0, 0)), 128)
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+if __name__ == '__main__':
+    unittest.main()
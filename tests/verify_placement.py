@@ -0,0 +1,173 @@
+import sys
+import os
+import errno
+import shutil
+import unittest
+from unittest.mock import patch
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from organizer import placement
+from organizer.placement import DestinationIndex, move_file, place_file_retrying
+
+class TestPlacementModes(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_placement"
+        self.dest = os.path.join(self.test_dir, "dest")
+        os.makedirs(self.test_dir, exist_ok=True)
+        self.source = os.path.join(self.test_dir, "cert.pdf")
+        with open(self.source, "wb") as f:
+            f.write(b"%PDF-1.4 contenido de prueba")
+
+    def read(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def test_copy(self):
+        target = move_file(self.source, self.dest, "2024", "Juan Perez")
+        self.assertEqual(target, os.path.join(self.dest, "2024", "Juan Perez", "cert.pdf"))
+        self.assertTrue(os.path.exists(self.source))
+        self.assertEqual(self.read(target), self.read(self.source))
+
+    def test_move(self):
+        messages = []
+        target = move_file(self.source, self.dest, "2024", "Juan Perez", messages.append, mode='move')
+        self.assertFalse(os.path.exists(self.source))
+        self.assertEqual(self.read(target), b"%PDF-1.4 contenido de prueba")
+        self.assertIn("  -> Movido a: 2024/Juan Perez/", messages)
+
+    def test_move_across_volumes(self):
+        real_rename = placement.rename_noreplace
+
+        def rename(src, dst):
+            if src == self.source:
+                raise OSError(errno.EXDEV, "cross-device")
+            real_rename(src, dst)
+
+        with patch("organizer.placement.rename_noreplace", side_effect=rename):
+            target = move_file(self.source, self.dest, "2024", "Juan Perez", mode='move')
+        self.assertFalse(os.path.exists(self.source))
+        self.assertEqual(self.read(target), b"%PDF-1.4 contenido de prueba")
+
+    def test_move_collision(self):
+        first = move_file(self.source, self.dest, "2024", "Juan Perez")
+        second = move_file(self.source, self.dest, "2024", "Juan Perez", mode='move')
+        self.assertTrue(os.path.exists(first))
+        self.assertTrue(second.endswith("cert_1.pdf"))
+
+    def test_hardlink(self):
+        target = move_file(self.source, self.dest, "2024", "Juan Perez", mode='hardlink')
+        self.assertTrue(os.path.samefile(self.source, target))
+
+    def test_hardlink_fallback(self):
+        messages = []
+        with patch("organizer.placement.os.link", side_effect=OSError(errno.EXDEV, "cross-device")):
+            target = move_file(self.source, self.dest, "2024", "Juan Perez", messages.append, mode='hardlink')
+        self.assertFalse(os.path.samefile(self.source, target))
+        self.assertEqual(self.read(target), self.read(self.source))
+        self.assertIn("  -> Copiado a: 2024/Juan Perez/", messages)
+
+    def test_reflink(self):
+        # Clon o copia según el sistema de archivos: el resultado es una copia independiente
+        target = move_file(self.source, self.dest, "2024", "Juan Perez", mode='reflink')
+        self.assertEqual(self.read(target), self.read(self.source))
+        self.assertFalse(os.path.samefile(self.source, target))
+        self.assertEqual(os.listdir(os.path.dirname(target)), ["cert.pdf"])
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            move_file(self.source, self.dest, "2024", "Juan Perez", mode='symlink')
+
+    def test_index_matches_probing(self):
+        # Archivos previos en destino, incluido un hueco en los sufijos
+        existing = os.path.join(self.dest, "2024", "Juan Perez")
+        os.makedirs(existing)
+        for filename in ("cert.pdf", "cert_1.pdf", "cert_3.pdf"):
+            shutil.copy2(self.source, os.path.join(existing, filename))
+
+        index = DestinationIndex(self.dest)
+        with patch("organizer.placement.os.path.exists", wraps=os.path.exists) as exists, \
+                patch("organizer.placement.os.makedirs", wraps=os.makedirs) as makedirs:
+            targets = [move_file(self.source, self.dest, "2024", "Juan Perez", index=index)
+                       for _ in range(3)]
+            targets += [move_file(self.source, self.dest, "2025", "Ana", index=index)
+                        for _ in range(2)]
+        names = [os.path.relpath(t, self.dest).replace(os.sep, "/") for t in targets]
+        self.assertEqual(names, [
+            "2024/Juan Perez/cert_2.pdf", "2024/Juan Perez/cert_4.pdf", "2024/Juan Perez/cert_5.pdf",
+            "2025/Ana/cert.pdf", "2025/Ana/cert_1.pdf",
+        ])
+        # Ningún sondeo de nombres de archivo; solo se crea la carpeta nueva, una vez
+        self.assertFalse([c for c in exists.call_args_list if "cert" in str(c.args[0])])
+        created = [c.args[0] for c in makedirs.call_args_list]
+        self.assertEqual(created.count(os.path.join(self.dest, "2025", "Ana")), 1)
+        self.assertNotIn(existing, created)
+        for target in targets:
+            self.assertTrue(os.path.exists(target))
+
+    def test_retry_after_transient_error(self):
+        target = os.path.join(self.dest, "2024", "Juan Perez", "cert.pdf")
+        calls = []
+        real_copy = placement.copy_file
+
+        def flaky(src, dst):
+            calls.append(dst)
+            if len(calls) == 1:
+                with open(dst, "wb") as f:
+                    f.write(b"%PDF-1.4 conte")  # copia a medias
+                raise OSError(errno.EIO, "network name no longer available")
+            real_copy(src, dst)
+
+        with patch("organizer.placement.copy_file", side_effect=flaky):
+            used = place_file_retrying(self.source, target, delay=0)
+        self.assertEqual(used, 'copy')
+        self.assertEqual(len(calls), 2)
+        # Cada intento escribe en su propio temporal, nunca en el destino final
+        self.assertNotIn(target, calls)
+        self.assertEqual(self.read(target), self.read(self.source))
+        self.assertEqual(os.listdir(os.path.dirname(target)), ["cert.pdf"])
+
+    def test_never_overwrites(self):
+        target = os.path.join(self.dest, "2024", "Juan Perez", "cert.pdf")
+        os.makedirs(os.path.dirname(target))
+        with open(target, "wb") as f:
+            f.write(b"de otro proceso")
+        for mode in ('copy', 'move'):
+            with self.assertRaises(FileExistsError):
+                place_file_retrying(self.source, target, mode, delay=0)
+            self.assertEqual(self.read(target), b"de otro proceso")
+            self.assertTrue(os.path.exists(self.source))
+        self.assertEqual(os.listdir(os.path.dirname(target)), ["cert.pdf"])
+
+    def test_index_tracks_new_folders(self):
+        index = DestinationIndex(self.dest)
+        target = index.reserve("2024", "Juan Perez", "cert.pdf", create=False)
+        self.assertFalse(os.path.exists(os.path.dirname(target)))
+        self.assertTrue(index.missing_dir(target))
+        place_file_retrying(self.source, target, create_dir=index.missing_dir(target), delay=0)
+        index.dir_created(target)
+        second = index.reserve("2024", "Juan Perez", "cert.pdf", create=False)
+        self.assertFalse(index.missing_dir(second))
+        with patch("organizer.placement.os.makedirs") as makedirs:
+            place_file_retrying(self.source, second, create_dir=False, delay=0)
+        makedirs.assert_not_called()
+        self.assertEqual(sorted(os.listdir(os.path.dirname(target))), ["cert.pdf", "cert_1.pdf"])
+
+    def test_retry_gives_up(self):
+        target = os.path.join(self.dest, "2024", "Juan Perez", "cert.pdf")
+        with patch("organizer.placement.place_file", side_effect=OSError(errno.EIO, "io")) as place:
+            with self.assertRaises(OSError):
+                place_file_retrying(self.source, target, retries=2, delay=0)
+        self.assertEqual(place.call_count, 3)
+        # Un conflicto de nombre no se reintenta
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copy2(self.source, target)
+        with patch("organizer.placement.place_file", side_effect=FileExistsError) as place:
+            with self.assertRaises(FileExistsError):
+                place_file_retrying(self.source, target, delay=0)
+        self.assertEqual(place.call_count, 1)
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import sys
+import os
+import shutil
+import fitz  # PyMuPDF
+import unittest
+from unittest.mock import patch
+from PIL import Image
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from organizer.extraction import ExtractionSettings, extract_info
+from organizer.raster import (
+    RasterSettings, classify_page, estimate_image_bytes, pdf_ocr_image, prepare_image, render_pdf_page,
+)
+
+class TestRasterization(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_raster"
+        os.makedirs(self.test_dir, exist_ok=True)
+        # PDF "escaneado": sin texto nativo, solo una imagen
+        image_path = os.path.join(self.test_dir, "scan.png")
+        Image.new('RGB', (200, 280), color='white').save(image_path)
+        doc = fitz.open()
+        page = doc.new_page(width=200, height=280)
+        page.insert_image(page.rect, filename=image_path)
+        self.pdf_path = os.path.join(self.test_dir, "scan.pdf")
+        doc.save(self.pdf_path)
+        doc.close()
+
+    def test_gray_render(self):
+        image = render_pdf_page(self.pdf_path, RasterSettings(dpi=144))
+        self.assertEqual(image.mode, "L")
+        self.assertEqual(image.size, (400, 560))
+
+    def test_region_render(self):
+        settings = RasterSettings(dpi=144, region=(0, 0.25, 1, 0.75))
+        image = render_pdf_page(self.pdf_path, settings)
+        self.assertEqual(image.size, (400, 280))
+
+    def test_render_capped_to_max_pixels(self):
+        image = render_pdf_page(self.pdf_path, RasterSettings(dpi=144, max_pixels=100_000))
+        self.assertLessEqual(image.size[0] * image.size[1], 100_000)
+        self.assertGreater(image.size[0] * image.size[1], 90_000)
+
+    def test_jpeg_decoded_downscaled(self):
+        path = os.path.join(self.test_dir, "big.jpg")
+        Image.new('RGB', (1600, 1200), color='white').save(path)
+        settings = RasterSettings(max_pixels=200_000)
+        with Image.open(path) as original:
+            prepared = prepare_image(original, settings)
+            # draft: el JPEG se decodificó a la mitad, sin cargarlo completo
+            self.assertEqual(original.size, (800, 600))
+        self.assertEqual(prepared.size, (400, 300))
+        self.assertEqual(prepared.mode, "L")
+        self.assertLess(estimate_image_bytes(path, settings), 1600 * 1200)
+        self.assertEqual(estimate_image_bytes(path, RasterSettings(max_pixels=None)),
+                         1600 * 1200 * 3 + 1600 * 1200)
+
+    def test_pdf_estimate_does_not_open_file(self):
+        # Se calcula en el hilo que envía trabajos: sin abrir el PDF
+        with patch("organizer.raster.fitz.open", side_effect=AssertionError("abrió el PDF")):
+            small = estimate_image_bytes(self.pdf_path, RasterSettings(dpi=100))
+            default = estimate_image_bytes(self.pdf_path, RasterSettings())
+            capped = estimate_image_bytes(self.pdf_path, RasterSettings(dpi=600, max_pixels=1_000_000))
+        self.assertEqual(default, int(2 * (612 * 200 / 72) * (842 * 200 / 72)))
+        self.assertLess(small, default)
+        self.assertLessEqual(capped, 2 * 1_000_000)
+
+    def create_page(self, build, rotation=0):
+        doc = fitz.open()
+        page = doc.new_page(width=300, height=400)
+        build(page)
+        page.set_rotation(rotation)
+        path = os.path.join(self.test_dir, "page.pdf")
+        doc.save(path)
+        doc.close()
+        return path
+
+    def classify(self, path):
+        with fitz.open(path) as doc:
+            return classify_page(doc[0])[0]
+
+    def test_scan_uses_embedded_image(self):
+        jpeg = os.path.join(self.test_dir, "scan.jpg")
+        Image.new('RGB', (600, 800), color='white').save(jpeg)
+
+        def build(page):
+            page.insert_image(page.rect, filename=jpeg)
+
+        path = self.create_page(build)
+        kind, image = pdf_ocr_image(path, RasterSettings(dpi=72))
+        self.assertEqual(kind, 'image')
+        # Resolución nativa de la imagen, no la del render a 72 DPI
+        self.assertEqual((image.size, image.mode), ((600, 800), "L"))
+        self.assertEqual(self.classify(self.create_page(build, rotation=90)), 'render')
+
+    @patch('organizer.ocr.pytesseract.image_to_string')
+    def test_text_over_background_image_is_rendered(self, mock_ocr):
+        # Constancia con fondo a página completa y el nombre como texto nativo:
+        # la imagen sola no tiene el nombre, hay que renderizar la página
+        jpeg = os.path.join(self.test_dir, "fondo.jpg")
+        Image.new('RGB', (600, 800), color='white').save(jpeg)
+
+        def build(page):
+            page.insert_image(page.rect, filename=jpeg)
+            page.insert_text((20, 40), "Otorga a: Juan Perez", fontsize=10)
+
+        path = self.create_page(build)
+        self.assertEqual(self.classify(path), 'render')
+        mock_ocr.return_value = "Otorga a: Juan Perez 15 de Enero de 2024"
+        extract_info(path, settings=ExtractionSettings(raster=RasterSettings(dpi=72)))
+        image = mock_ocr.call_args[0][0]
+        self.assertEqual(image.size, (300, 400))
+        # El render contiene el texto superpuesto (píxeles oscuros), no solo el fondo blanco
+        self.assertLess(min(image.getdata()), 128)
+
+    def test_page_kinds(self):
+        def text_only(page):
+            page.draw_rect(fitz.Rect(5, 5, 295, 395), color=(0, 0, 0))
+            page.insert_text((20, 40), "Juan", fontsize=12)
+
+        def outlined(page):
+            for i in range(10):
+                page.draw_rect(fitz.Rect(20 + i * 12, 40, 30 + i * 12, 52), fill=(0, 0, 0))
+
+        def two_images(page):
+            page.insert_image(fitz.Rect(0, 0, 150, 200), filename=os.path.join(self.test_dir, "scan.png"))
+            page.insert_image(fitz.Rect(150, 200, 300, 400), filename=os.path.join(self.test_dir, "scan.png"))
+
+        self.assertEqual(pdf_ocr_image(self.create_page(text_only), RasterSettings()), ('text', None))
+        self.assertEqual(self.classify(self.create_page(lambda page: None)), 'empty')
+        self.assertEqual(self.classify(self.create_page(outlined)), 'render')
+        self.assertEqual(self.classify(self.create_page(two_images)), 'render')
+
+    def test_binary_prepare(self):
+        image = Image.new('RGB', (10, 10), color=(120, 200, 90))
+        prepared = prepare_image(image, RasterSettings(mode='binary'))
+        self.assertEqual(prepared.mode, "L")
+        self.assertTrue(set(prepared.tobytes()) <= {0, 255})
+
+    def test_settings_key(self):
+        self.assertNotEqual(RasterSettings().key(), RasterSettings(dpi=300).key())
+        self.assertNotEqual(RasterSettings().key(), RasterSettings(max_pixels=None).key())
+        with self.assertRaises(ValueError):
+            RasterSettings(region=(0.5, 0, 0.2, 1))
+
+    @patch('organizer.ocr.pytesseract.image_to_string')
+    def test_scanned_pdf_uses_pymupdf(self, mock_ocr):
+        mock_ocr.return_value = "Certifica a: ANNA SMITH Febrero 2024"
+        info = extract_info(self.pdf_path, settings=ExtractionSettings(raster=RasterSettings(dpi=72)))
+        image = mock_ocr.call_args[0][0]
+        self.assertEqual(image.size, (200, 280))
+        self.assertEqual(info, {'name': "Anna Smith", 'year': "2024"})
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import sys
+import os
+import shutil
+import time
+import types
+import fitz  # PyMuPDF
+import unittest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from organizer.engine import BatchProcessor
+from organizer.scanner import ScanOptions, accepts_path, parse_size, scan_source
+
+TEXT = """
+Certifica a:
+Juan Perez
+
+Por su asistencia al curso de actualizacion docente.
+Aguascalientes, Ags, a 15 de Enero de 2024.
+"""
+
+class TestScanner(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = os.path.abspath("test_scanner")
+        self.source = os.path.join(self.test_dir, "src")
+        for rel in ("a.pdf", "b.jpg", "notas.txt", "ventas/c.pdf", "ventas/borrador_d.pdf",
+                    "ventas/2023/e.png", "compras/f.pdf"):
+            self.touch(rel)
+
+    def touch(self, rel, size=10):
+        path = os.path.join(self.source, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+        return path
+
+    def scan(self, **kwargs):
+        exclude_dirs = kwargs.pop("exclude_dirs", ())
+        return [os.path.relpath(p, self.source).replace(os.sep, "/")
+                for p in scan_source(self.source, ScanOptions(**kwargs), exclude_dirs)]
+
+    def test_flat_by_default(self):
+        self.assertIsInstance(scan_source(self.source), types.GeneratorType)
+        self.assertEqual(self.scan(), ["a.pdf", "b.jpg"])
+
+    def test_recursive_order(self):
+        self.assertEqual(self.scan(max_depth=None), [
+            "a.pdf", "b.jpg", "compras/f.pdf",
+            "ventas/borrador_d.pdf", "ventas/c.pdf", "ventas/2023/e.png",
+        ])
+        self.assertEqual(self.scan(max_depth=1)[-1], "ventas/c.pdf")
+
+    def test_globs(self):
+        self.assertEqual(self.scan(max_depth=None, include=["*.pdf"], exclude=["borrador*"]),
+                         ["a.pdf", "compras/f.pdf", "ventas/c.pdf"])
+        # Un patrón con '/' se compara con la ruta relativa y poda la carpeta completa
+        self.assertEqual(self.scan(max_depth=None, exclude=["ventas/2023"]), [
+            "a.pdf", "b.jpg", "compras/f.pdf", "ventas/borrador_d.pdf", "ventas/c.pdf",
+        ])
+        self.assertEqual(self.scan(max_depth=None, include=["ventas/*"]),
+                         ["ventas/borrador_d.pdf", "ventas/c.pdf", "ventas/2023/e.png"])
+
+    def test_accepts_path_matches_scan(self):
+        # El modo vigilancia filtra cada archivo nuevo igual que el recorrido completo
+        every = [os.path.join(root, name) for root, _, names in os.walk(self.source) for name in names]
+        for kwargs in ({}, {'max_depth': 1}, {'max_depth': None, 'exclude': ["ventas/2023", "borrador*"]},
+                       {'max_depth': None, 'include': ["ventas/*"]}):
+            expected = set(scan_source(self.source, ScanOptions(**kwargs)))
+            accepted = {p for p in every if accepts_path(self.source, p, ScanOptions(**kwargs))}
+            self.assertEqual(accepted, expected)
+        self.assertFalse(accepts_path(self.source, os.path.join(self.source, "compras", "f.pdf"),
+                                      ScanOptions(max_depth=None), exclude_dirs=[os.path.join(self.source, "compras")]))
+
+    def test_size_and_mtime(self):
+        self.touch("grande.pdf", size=parse_size("2K"))
+        self.assertEqual(self.scan(min_size=1024), ["grande.pdf"])
+        self.assertEqual(self.scan(max_size=100), ["a.pdf", "b.jpg"])
+
+        old = os.path.join(self.source, "a.pdf")
+        past = time.time() - 10 * 86400
+        os.utime(old, (past, past))
+        self.assertEqual(self.scan(newer_than=time.time() - 86400), ["b.jpg", "grande.pdf"])
+        self.assertEqual(self.scan(older_than=time.time() - 86400), ["a.pdf"])
+
+    @unittest.skipUnless(hasattr(os, "symlink") and sys.platform != "win32", "requiere enlaces simbólicos")
+    def test_symlinks(self):
+        outside = os.path.join(self.test_dir, "externo")
+        os.makedirs(outside)
+        open(os.path.join(outside, "f.pdf"), "wb").close()
+        os.symlink(outside, os.path.join(self.source, "enlace"))
+        os.symlink(os.path.join(self.source, "a.pdf"), os.path.join(self.source, "z.pdf"))
+        # Ciclo: una carpeta que apunta a su padre
+        os.symlink(self.source, os.path.join(self.source, "compras", "ciclo"))
+
+        files = self.scan(max_depth=None, include=["*.pdf"])
+        self.assertIn("z.pdf", files)
+        self.assertNotIn("enlace/f.pdf", files)
+        self.assertNotIn("z.pdf", self.scan(symlinks='skip'))
+
+        followed = self.scan(max_depth=None, include=["*.pdf"], symlinks='follow')
+        self.assertIn("enlace/f.pdf", followed)
+        # Cada carpeta se recorre una sola vez
+        self.assertNotIn("compras/ciclo/a.pdf", followed)
+
+    def test_destination_inside_source(self):
+        dest = os.path.join(self.source, "organizados")
+        self.touch("organizados/2024/Juan Perez/a.pdf")
+        self.assertNotIn("organizados/2024/Juan Perez/a.pdf",
+                         self.scan(max_depth=None, exclude_dirs=[dest]))
+
+    def test_preserve_structure(self):
+        shutil.rmtree(self.source)
+        os.makedirs(os.path.join(self.source, "ventas"))
+        doc = fitz.open()
+        doc.new_page().insert_text((50, 50), TEXT, fontsize=12)
+        doc.save(os.path.join(self.source, "ventas", "cert.pdf"))
+        doc.close()
+
+        dest = os.path.join(self.test_dir, "dest")
+        files = scan_source(self.source, ScanOptions(max_depth=None))
+        stats = BatchProcessor(dest, workers=1, relative_root=self.source).run(files)
+        self.assertEqual(stats['processed'], 1)
+        self.assertTrue(os.path.exists(os.path.join(dest, "ventas", "2024", "Juan Perez", "cert.pdf")))
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+if __name__ == '__main__':
+    unittest.main()
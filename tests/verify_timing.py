@@ -0,0 +1,80 @@
+import sys
+import os
+import csv
+import json
+import shutil
+import fitz  # PyMuPDF
+import unittest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from organizer.engine import BatchProcessor
+from organizer.timing import STAGES, TimingReport
+
+TEXT = """
+Certifica a:
+Juan Perez
+
+Por su asistencia al curso de actualizacion docente.
+Aguascalientes, Ags, a 15 de Enero de 2024.
+"""
+
+class TestTimings(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_timing"
+        self.source = os.path.join(self.test_dir, "src")
+        self.dest = os.path.join(self.test_dir, "dest")
+        os.makedirs(self.source, exist_ok=True)
+        self.files = []
+        for i in range(3):
+            doc = fitz.open()
+            page = doc.new_page()
+            page.insert_text((50, 50), TEXT, fontsize=12)
+            path = os.path.join(self.source, f"cert{i}.pdf")
+            doc.save(path)
+            doc.close()
+            self.files.append(path)
+
+    def test_jsonl_records(self):
+        export = os.path.join(self.test_dir, "timings.jsonl")
+        report = TimingReport(export)
+        BatchProcessor(self.dest, workers=2, timings=report).run(self.files)
+        report.close()
+
+        with open(export, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([r['file'] for r in records], self.files)
+        for record in records:
+            self.assertEqual(record['method'], 'native')
+            self.assertIn('text', record['stages'])
+            self.assertIn('parse', record['stages'])
+            self.assertIn('place', record['stages'])
+            self.assertAlmostEqual(record['total'], sum(record['stages'].values()))
+        self.assertTrue(any("Rutas: native: 3" in line for line in report.summary_lines()))
+
+    def test_csv_export(self):
+        export = os.path.join(self.test_dir, "timings.csv")
+        report = TimingReport(export)
+        BatchProcessor(self.dest, workers=1, dry_run=True, timings=report).run(self.files)
+        report.close()
+
+        with open(export, encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 3)
+        self.assertTrue(set(STAGES) <= set(rows[0]))
+        # En simulación no se copia nada
+        self.assertEqual(float(rows[0]['place']), 0.0)
+
+    def test_profile_slowest(self):
+        profile_dir = os.path.join(self.test_dir, "profiles")
+        report = TimingReport(slowest=1)
+        BatchProcessor(self.dest, workers=1, timings=report, profile_dir=profile_dir).run(self.files)
+        profiles = os.listdir(profile_dir)
+        self.assertEqual(len(profiles), 1)
+        self.assertTrue(profiles[0].endswith(".prof"))
+        self.assertTrue(any("perfil:" in line for line in report.summary_lines()))
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import sys
+import os
+import shutil
+import threading
+import time
+import unittest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from organizer.scanner import ScanOptions
+from organizer import watch
+from organizer.watch import FolderWatcher
+
+class TestFolderWatcher(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = os.path.abspath("test_watch")
+        os.makedirs(self.test_dir, exist_ok=True)
+        with open(os.path.join(self.test_dir, "existente.pdf"), "wb") as f:
+            f.write(b"%PDF viejo")
+        self.batches = []
+        self.watcher = FolderWatcher(
+            self.test_dir, self.batches.append, settle=0.2, poll_interval=0.05, use_polling=True
+        )
+        self.thread = threading.Thread(target=self.watcher.run, daemon=True)
+        self.thread.start()
+        time.sleep(0.2)
+
+    def wait_for_batches(self, count, timeout=5):
+        deadline = time.time() + timeout
+        while len(self.batches) < count and time.time() < deadline:
+            time.sleep(0.05)
+
+    def test_new_files_only(self):
+        for name in ("a.pdf", "b.png", "notas.txt"):
+            with open(os.path.join(self.test_dir, name), "wb") as f:
+                f.write(b"datos")
+        self.wait_for_batches(1)
+
+        # Los archivos de la misma ráfaga llegan en un solo lote; el existente y el .txt se ignoran
+        self.assertEqual(len(self.batches), 1)
+        self.assertEqual(
+            [os.path.basename(p) for p in self.batches[0]], ["a.pdf", "b.png"]
+        )
+
+    def test_files_arriving_during_initial_batch(self):
+        self.watcher.stop()
+        self.thread.join(timeout=5)
+        batches = []
+        watcher = FolderWatcher(self.test_dir, batches.append, settle=0.2, poll_interval=0.05,
+                                use_polling=True)
+        initial = os.path.join(self.test_dir, "existente.pdf")
+        for path in watcher.initial_batch([initial]):
+            # Llega otro archivo mientras se procesa el lote inicial
+            with open(os.path.join(self.test_dir, "durante.pdf"), "wb") as f:
+                f.write(b"datos")
+        self.thread = threading.Thread(target=watcher.run, daemon=True)
+        self.watcher = watcher
+        self.thread.start()
+        deadline = time.time() + 5
+        while not batches and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertEqual([[os.path.basename(p) for p in batch] for batch in batches], [["durante.pdf"]])
+
+    def restart(self, **kwargs):
+        self.watcher.stop()
+        self.thread.join(timeout=5)
+        self.batches = []
+        self.watcher = FolderWatcher(
+            self.test_dir, self.batches.append, settle=0.2, poll_interval=0.05, use_polling=True, **kwargs
+        )
+        self.thread = threading.Thread(target=self.watcher.run, daemon=True)
+        self.thread.start()
+        time.sleep(0.2)
+
+    def test_recursive_with_filters(self):
+        dest = os.path.join(self.test_dir, "destino")
+        self.restart(options=ScanOptions(max_depth=None, exclude=("borrador*",)), exclude_dirs=[dest])
+        for rel in ("ventas/2024/a.pdf", "ventas/borrador.pdf", "destino/2024/b.pdf"):
+            os.makedirs(os.path.dirname(os.path.join(self.test_dir, rel)), exist_ok=True)
+            with open(os.path.join(self.test_dir, rel), "wb") as f:
+                f.write(b"datos")
+        self.wait_for_batches(1)
+        time.sleep(0.3)
+        self.assertEqual([[os.path.relpath(p, self.test_dir).replace(os.sep, "/") for p in batch]
+                          for batch in self.batches], [["ventas/2024/a.pdf"]])
+
+    def test_handled_is_pruned(self):
+        watch.HANDLED_PRUNE_SIZE, old = 2, watch.HANDLED_PRUNE_SIZE
+        try:
+            self.restart()
+            for i in range(4):
+                path = os.path.join(self.test_dir, f"{i}.pdf")
+                with open(path, "wb") as f:
+                    f.write(b"datos")
+                self.wait_for_batches(i + 1)
+                # Como con --placement move: el archivo sale del origen
+                os.remove(path)
+        finally:
+            watch.HANDLED_PRUNE_SIZE = old
+        self.assertEqual(len(self.batches), 4)
+        # Los que ya salieron del origen se olvidan; el que sigue ahí, no
+        handled = {os.path.basename(p) for p in self.watcher._handled}
+        self.assertNotIn("0.pdf", handled)
+        self.assertIn("existente.pdf", handled)
+
+    def tearDown(self):
+        self.watcher.stop()
+        self.thread.join(timeout=5)
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+if __name__ == '__main__':
+    unittest.main()